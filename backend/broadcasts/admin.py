@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Broadcast, BroadcastDelivery
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('mentor', 'kind', 'status', 'total', 'sent', 'failed', 'blocked', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'mentor')
+    readonly_fields = ('created_at', 'finished_at')
+
+
+@admin.register(BroadcastDelivery)
+class BroadcastDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('broadcast', 'student', 'status', 'error', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('student__username', 'student__full_name', 'telegram_id')
+    raw_id_fields = ('broadcast', 'student')
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('mentors', '0002_mentor_language'),
+        ('students', '0012_student_bot_blocked_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('message', 'Mentor Message'), ('quiz', 'Ranked Quiz Notification')], default='message', max_length=10)),
+                ('texts', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('blocked', models.PositiveIntegerField(default=0)),
+                ('report_chat_id', models.BigIntegerField(blank=True, null=True)),
+                ('report_message_id', models.BigIntegerField(blank=True, null=True)),
+                ('report_lang', models.CharField(default='ru', max_length=5)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcasts', to='mentors.mentor')),
+            ],
+            options={
+                'verbose_name': 'Broadcast',
+                'verbose_name_plural': 'Broadcasts',
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('telegram_id', models.BigIntegerField()),
+                ('language', models.CharField(default='ru', max_length=5)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed'), ('blocked', 'Bot Blocked')], default='pending', max_length=10)),
+                ('error', models.CharField(blank=True, max_length=200)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='broadcasts.broadcast')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_deliveries', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Broadcast Delivery',
+                'verbose_name_plural': 'Broadcast Deliveries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='broadcast',
+            index=models.Index(fields=['status'], name='broadcasts__status_febe86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='broadcastdelivery',
+            index=models.Index(fields=['broadcast', 'status'], name='broadcasts__broadca_714699_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='broadcastdelivery',
+            constraint=models.UniqueConstraint(fields=('broadcast', 'student'), name='unique_broadcast_student'),
+        ),
+    ]
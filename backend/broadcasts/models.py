@@ -0,0 +1,79 @@
+from django.db import models
+from backend.mentors.models import Mentor
+from backend.students.models import Student
+
+
+class Broadcast(models.Model):
+    """
+    A message sent to all students of a mentor.
+
+    Sent in the background by bot/workers/broadcast.py. Each recipient has a
+    BroadcastDelivery row, so a broadcast interrupted by a restart resumes
+    with the deliveries that are still pending.
+    """
+    KIND_CHOICES = [
+        ('message', 'Mentor Message'),
+        ('quiz', 'Ranked Quiz Notification'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ]
+
+    mentor = models.ForeignKey(Mentor, on_delete=models.CASCADE, related_name='broadcasts')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='message')
+    # Message rendered once per language: {"ru": "...", "en": "..."}
+    texts = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    blocked = models.PositiveIntegerField(default=0)
+    # Progress message in the mentor's chat, edited while sending
+    report_chat_id = models.BigIntegerField(null=True, blank=True)
+    report_message_id = models.BigIntegerField(null=True, blank=True)
+    report_lang = models.CharField(max_length=5, default='ru')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Broadcast"
+        verbose_name_plural = "Broadcasts"
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f"{self.mentor} - {self.get_kind_display()} ({self.sent}/{self.total})"
+
+
+class BroadcastDelivery(models.Model):
+    """One recipient of a broadcast (Telegram ID and language resolved when the broadcast is created)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('blocked', 'Bot Blocked'),
+    ]
+
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='deliveries')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='broadcast_deliveries')
+    telegram_id = models.BigIntegerField()
+    language = models.CharField(max_length=5, default='ru')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error = models.CharField(max_length=200, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Broadcast Delivery"
+        verbose_name_plural = "Broadcast Deliveries"
+        constraints = [
+            models.UniqueConstraint(fields=['broadcast', 'student'], name='unique_broadcast_student'),
+        ]
+        indexes = [
+            models.Index(fields=['broadcast', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.broadcast_id} -> {self.telegram_id}: {self.status}"
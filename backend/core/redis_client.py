@@ -0,0 +1,65 @@
+"""
+Shared Redis connection settings.
+
+Uses the same REDIS_URL / USE_REDIS environment variables as the bot's FSM
+storage (see run_bot.py). Every caller must treat Redis as optional:
+get_redis() returns None when Redis is disabled or unreachable.
+"""
+import logging
+import os
+
+logger = logging.getLogger('studymate')
+
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+USE_REDIS = os.getenv('USE_REDIS', 'true').lower() == 'true'
+
+_clients = {}
+_client_failed = False
+
+
+def _connection_kwargs() -> dict:
+    """Extra connection options (Heroku Redis uses self-signed certs)"""
+    if REDIS_URL.startswith('rediss://'):
+        return {
+            'ssl_cert_reqs': None,
+            'ssl_check_hostname': False,
+            'ssl_ca_certs': None,
+        }
+    return {}
+
+
+def get_redis(decode_responses: bool = True):
+    """
+    Get a shared synchronous Redis client.
+    decode_responses=False gives a client returning bytes (for binary values).
+    Returns None if Redis is disabled or the first connection attempt failed.
+    """
+    global _client_failed
+
+    if not USE_REDIS or _client_failed:
+        return None
+    client = _clients.get(decode_responses)
+    if client is not None:
+        return client
+
+    try:
+        from redis import Redis
+        client = Redis.from_url(REDIS_URL, decode_responses=decode_responses, **_connection_kwargs())
+        client.ping()
+    except Exception as e:
+        logger.warning(f"Redis unavailable ({e}), continuing without it")
+        _client_failed = True
+        return None
+
+    _clients[decode_responses] = client
+    return client
+
+
+def create_async_redis(decode_responses: bool = True):
+    """
+    New asyncio Redis client (redis.asyncio) for code running in the bot's
+    event loop. Unlike get_redis() it is not shared and doesn't check the
+    connection: callers that need Redis fail when it is unreachable.
+    """
+    from redis.asyncio import Redis
+    return Redis.from_url(REDIS_URL, decode_responses=decode_responses, **_connection_kwargs())
@@ -42,6 +42,9 @@ INSTALLED_APPS = [
     'backend.questions',
     'backend.downloads',
     'backend.quizzes',
+    'backend.broadcasts',
+    'backend.search',
+    'backend.warehouse',
 ]
 
 MIDDLEWARE = [
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Download
+from .models import Download, DownloadDaily, DailyActiveStudent
 
 
 @admin.register(Download)
@@ -8,3 +8,17 @@ class DownloadAdmin(admin.ModelAdmin):
     list_filter = ('material__topic__mentor', 'downloaded_at')
     search_fields = ('student__username', 'material__title')
     readonly_fields = ('downloaded_at',)
+
+
+@admin.register(DownloadDaily)
+class DownloadDailyAdmin(admin.ModelAdmin):
+    list_display = ('material', 'date', 'downloads', 'students')
+    list_filter = ('material__topic__mentor', 'date')
+    search_fields = ('material__title',)
+
+
+@admin.register(DailyActiveStudent)
+class DailyActiveStudentAdmin(admin.ModelAdmin):
+    list_display = ('student', 'mentor', 'date')
+    list_filter = ('mentor', 'date')
+    raw_id_fields = ('student',)
@@ -0,0 +1,34 @@
+"""
+Recompute daily download rollups (DownloadDaily, DailyActiveStudent).
+
+The bot keeps recent days up to date on its own; use this after importing or
+deleting downloads.
+
+    python manage.py rollup_downloads            # every day with downloads
+    python manage.py rollup_downloads --days 7   # the last 7 days
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.downloads.rollups import rollup_days, rollup_all
+
+
+class Command(BaseCommand):
+    help = "Recompute daily download rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Only the last N days (including today)")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['days']:
+            today = timezone.localdate()
+            rows = rollup_days(today - timedelta(days=i) for i in range(options['days']))
+        else:
+            rows = rollup_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"{rows} material-day rows in {(time.monotonic() - started) * 1000:.0f} ms"
+        ))
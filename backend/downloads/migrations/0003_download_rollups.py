@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def populate_rollups(apps, schema_editor):
+    """Roll up all existing downloads per local day."""
+    Download = apps.get_model('downloads', 'Download')
+    DownloadDaily = apps.get_model('downloads', 'DownloadDaily')
+    DailyActiveStudent = apps.get_model('downloads', 'DailyActiveStudent')
+
+    rows = Download.objects.annotate(day=TruncDate('downloaded_at'))
+    DownloadDaily.objects.bulk_create([
+        DownloadDaily(material_id=row['material_id'], date=row['day'],
+                      downloads=row['downloads'], students=row['students'])
+        for row in rows.values('day', 'material_id').annotate(
+            downloads=models.Count('id'), students=models.Count('student', distinct=True)
+        ).order_by()
+    ], batch_size=500)
+    DailyActiveStudent.objects.bulk_create([
+        DailyActiveStudent(mentor_id=mentor_id, student_id=student_id, date=day)
+        for day, mentor_id, student_id in rows.values_list(
+            'day', 'material__topic__mentor_id', 'student_id'
+        ).distinct().order_by()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('downloads', '0002_download_downloads_d_materia_2f7d44_idx_and_more'),
+        ('materials', '0002_material_materials_m_topic_i_c03f8e_idx'),
+        ('mentors', '0002_mentor_language'),
+        ('students', '0012_student_bot_blocked_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='download',
+            name='downloaded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='DailyActiveStudent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_active_students', to='mentors.mentor')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='active_days', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Daily Active Student',
+                'verbose_name_plural': 'Daily Active Students',
+                'indexes': [models.Index(fields=['date'], name='downloads_d_date_f32f25_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mentor', 'date', 'student'), name='unique_mentor_active_student_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DownloadDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('downloads', models.PositiveIntegerField(default=0)),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_downloads', to='materials.material')),
+            ],
+            options={
+                'verbose_name': 'Daily Downloads',
+                'verbose_name_plural': 'Daily Downloads',
+                'indexes': [models.Index(fields=['date'], name='downloads_d_date_a8573c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('material', 'date'), name='unique_material_download_day')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
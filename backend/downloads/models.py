@@ -1,12 +1,18 @@
 from django.db import models
+from django.utils import timezone
+from backend.mentors.models import Mentor
 from backend.students.models import Student
 from backend.materials.models import Material
 
 
 class Download(models.Model):
+    """
+    Raw download event. Written in batches by bot/workers/downloads.py,
+    so downloaded_at is the time of the download, not of the insert.
+    """
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='downloads')
     material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='downloads')
-    downloaded_at = models.DateTimeField(auto_now_add=True)
+    downloaded_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         verbose_name = "Download"
@@ -18,3 +24,44 @@ class Download(models.Model):
 
     def __str__(self):
         return f"{self.student} - {self.material.title}"
+
+
+class DownloadDaily(models.Model):
+    """Downloads of a material per local day (see backend/downloads/rollups.py)"""
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='daily_downloads')
+    date = models.DateField()
+    downloads = models.PositiveIntegerField(default=0)
+    students = models.PositiveIntegerField(default=0)  # distinct students
+
+    class Meta:
+        verbose_name = "Daily Downloads"
+        verbose_name_plural = "Daily Downloads"
+        constraints = [
+            models.UniqueConstraint(fields=['material', 'date'], name='unique_material_download_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.material_id} {self.date}: {self.downloads}"
+
+
+class DailyActiveStudent(models.Model):
+    """A student downloaded at least one material of the mentor on this local day"""
+    mentor = models.ForeignKey(Mentor, on_delete=models.CASCADE, related_name='daily_active_students')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='active_days')
+    date = models.DateField()
+
+    class Meta:
+        verbose_name = "Daily Active Student"
+        verbose_name_plural = "Daily Active Students"
+        constraints = [
+            models.UniqueConstraint(fields=['mentor', 'date', 'student'], name='unique_mentor_active_student_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f"{self.mentor_id} {self.date}: {self.student_id}"
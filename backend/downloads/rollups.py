@@ -0,0 +1,68 @@
+"""
+Daily download rollups.
+
+DownloadDaily (downloads and distinct students per material and day) and
+DailyActiveStudent (students active per mentor and day) are recomputed from
+raw Download rows for whole days, so a rollup is idempotent and can be rerun
+at any time. Days are local dates (settings.TIME_ZONE).
+
+The bot rolls up the days it flushed downloads for (bot/workers/downloads.py);
+`manage.py rollup_downloads` rebuilds history.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from backend.downloads.models import Download, DownloadDaily, DailyActiveStudent
+
+
+def rollup_days(dates) -> int:
+    """Recompute rollups for the given local dates. Returns number of DownloadDaily rows written."""
+    dates = set(dates)
+    if not dates:
+        return 0
+
+    # One range scan over the raw rows (downloaded_at index), grouped by local date
+    start = timezone.make_aware(datetime.combine(min(dates), time.min))
+    end = timezone.make_aware(datetime.combine(max(dates) + timedelta(days=1), time.min))
+    rows = Download.objects.filter(downloaded_at__gte=start, downloaded_at__lt=end).annotate(
+        day=TruncDate('downloaded_at')
+    )
+
+    daily = [
+        DownloadDaily(material_id=row['material_id'], date=row['day'],
+                      downloads=row['downloads'], students=row['students'])
+        for row in rows.values('day', 'material_id').annotate(
+            downloads=Count('id'), students=Count('student', distinct=True)
+        ).order_by()
+        if row['day'] in dates
+    ]
+    active = [
+        DailyActiveStudent(mentor_id=mentor_id, student_id=student_id, date=day)
+        for day, mentor_id, student_id in rows.values_list(
+            'day', 'material__topic__mentor_id', 'student_id'
+        ).distinct().order_by()
+        if day in dates
+    ]
+
+    with transaction.atomic():
+        DownloadDaily.objects.filter(date__in=dates).delete()
+        DailyActiveStudent.objects.filter(date__in=dates).delete()
+        DownloadDaily.objects.bulk_create(daily, batch_size=500)
+        DailyActiveStudent.objects.bulk_create(active, batch_size=500)
+    return len(daily)
+
+
+def rollup_all() -> int:
+    """Rebuild rollups for every day with downloads"""
+    dates = set(
+        Download.objects.annotate(day=TruncDate('downloaded_at'))
+        .values_list('day', flat=True).distinct().order_by()
+    )
+    with transaction.atomic():
+        DownloadDaily.objects.all().delete()
+        DailyActiveStudent.objects.all().delete()
+        return rollup_days(dates)
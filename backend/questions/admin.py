@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import Question
 
 
@@ -7,11 +8,11 @@ class QuestionAdmin(admin.ModelAdmin):
     list_display = ('short_text', 'student_info', 'mentor', 'has_reply', 'is_answered', 'created_at')
     list_filter = ('mentor', 'is_answered', 'created_at')
     search_fields = ('text', 'reply_text', 'student__first_name', 'student__last_name', 'student__username', 'student_telegram_id')
-    readonly_fields = ('created_at', 'replied_at', 'student', 'student_telegram_id', 'message_id')
+    readonly_fields = ('created_at', 'notified_at', 'replied_at', 'student', 'student_telegram_id', 'message_id')
     actions = ['mark_as_answered']
     fieldsets = (
         ('Question', {
-            'fields': ('mentor', 'student', 'student_telegram_id', 'text', 'created_at', 'message_id')
+            'fields': ('mentor', 'student', 'student_telegram_id', 'text', 'created_at', 'notified_at', 'message_id')
         }),
         ('Reply', {
             'fields': ('reply_text', 'replied_at', 'is_answered')
@@ -39,4 +40,4 @@ class QuestionAdmin(admin.ModelAdmin):
 
     @admin.action(description='Mark selected as answered')
     def mark_as_answered(self, request, queryset):
-        queryset.update(is_answered=True)
+        queryset.update(is_answered=True, updated_at=timezone.now())
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:20
+
+from django.db import migrations, models
+
+
+def mark_existing_notified(apps, schema_editor):
+    """Questions created before digests were sent right away."""
+    Question = apps.get_model('questions', 'Question')
+    Question.objects.filter(notified_at__isnull=True).update(notified_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentors', '0002_mentor_language'),
+        ('questions', '0006_question_student_telegram_id'),
+        ('students', '0012_student_bot_blocked_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='question',
+            name='questions_q_mentor__cc3f34_idx',
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Mentor Notified'),
+        ),
+        migrations.RunPython(mark_existing_notified, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['mentor', 'is_answered', 'created_at'], name='questions_q_mentor__1afd8b_idx'),
+        ),
+    ]
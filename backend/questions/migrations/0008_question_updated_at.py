@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:10
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def set_updated_at(apps, schema_editor):
+    """Last known change of existing questions: the last reply or creation."""
+    Question = apps.get_model('questions', 'Question')
+    Question.objects.update(updated_at=Coalesce('replied_at', 'created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0007_question_notified_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['updated_at'], name='questions_q_updated_20e473_idx'),
+        ),
+    ]
@@ -13,14 +13,20 @@ class Question(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     replied_at = models.DateTimeField(null=True, blank=True, verbose_name="Last Reply Time")
     message_id = models.BigIntegerField(null=True, blank=True, verbose_name="Student's Message ID")
+    # Set when the question was sent to the mentor (alone or in a digest)
+    notified_at = models.DateTimeField(null=True, blank=True, verbose_name="Mentor Notified")
+    # Any change by the student or mentor (incremental warehouse export)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Anonymous Question"
         verbose_name_plural = "Anonymous Questions"
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['mentor', 'is_answered']),
+            # Unanswered inbox: filter + order by created_at from one index
+            models.Index(fields=['mentor', 'is_answered', 'created_at']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
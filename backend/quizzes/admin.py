@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Quiz, QuizQuestion, QuizAttempt, QuizAnswer
+from .models import Quiz, QuizQuestion, QuestionContent, QuizAttempt, QuizAnswer
 
 
 @admin.register(Quiz)
@@ -17,11 +17,31 @@ class QuizAdmin(admin.ModelAdmin):
     attempts_count.short_description = 'Attempts'
 
 
+@admin.register(QuestionContent)
+class QuestionContentAdmin(admin.ModelAdmin):
+    list_display = ('question_text_short', 'correct_answer', 'quizzes_count', 'created_at')
+    search_fields = ('question_text',)
+    readonly_fields = ('content_hash',)
+
+    def question_text_short(self, obj):
+        return obj.question_text[:50] + '...' if len(obj.question_text) > 50 else obj.question_text
+    question_text_short.short_description = 'Question'
+
+    def quizzes_count(self, obj):
+        return obj.quiz_links.count()
+    quizzes_count.short_description = 'Quizzes'
+
+    def has_change_permission(self, request, obj=None):
+        # Shared by several quizzes: edit questions through the bot (copy-on-write)
+        return False
+
+
 @admin.register(QuizQuestion)
 class QuizQuestionAdmin(admin.ModelAdmin):
     list_display = ('quiz', 'order', 'question_text_short', 'correct_answer')
     list_filter = ('quiz',)
     ordering = ('quiz', 'order')
+    raw_id_fields = ('content',)
 
     def question_text_short(self, obj):
         return obj.question_text[:50] + '...' if len(obj.question_text) > 50 else obj.question_text
@@ -46,6 +66,7 @@ class QuizAnswerAdmin(admin.ModelAdmin):
     list_display = ('get_student', 'get_quiz', 'question_short', 'selected_answer', 'correct_answer', 'is_correct')
     list_filter = ('attempt__quiz', 'attempt__student', 'is_correct')
     ordering = ('attempt', 'question__order')
+    list_select_related = ('attempt__student', 'attempt__quiz', 'question__content')
 
     def get_student(self, obj):
         return obj.attempt.student
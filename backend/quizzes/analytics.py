@@ -0,0 +1,155 @@
+"""
+Per-question item analytics (batch job).
+
+Analytics are kept per bank question (QuestionContent), so they accumulate
+over every quiz that reuses the question. Refreshing a quiz streams all
+answers of first attempts of the quizzes sharing its questions in one query
+into NumPy arrays (attempts x bank questions) and computes every statistic
+for all of them at once:
+
+- p-value: share of correct answers (difficulty)
+- discrimination: point-biserial correlation between answering the question
+  correctly and the rest of the attempt's score
+- option distribution and timeout rate
+
+Correctness is evaluated against the answer key of the bank question the
+quiz question currently links to, so fixing a wrong key (which re-links the
+question) is reflected on the next refresh.
+
+NumPy is imported lazily: without it analytics are simply not computed.
+"""
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import F
+
+from backend.quizzes.models import QuizQuestion, QuizAnswer, QuizStats, QuestionAnalytics
+
+logger = logging.getLogger('studymate')
+
+OPTIONS = ['A', 'B', 'C', 'D', '-']
+_OPTION_INDEX = {option: i for i, option in enumerate(OPTIONS)}
+_OTHER = len(OPTIONS)  # Unexpected values, counted as responses only
+
+
+def compute_quiz_analytics(quiz_id: int) -> int:
+    """
+    Recompute QuestionAnalytics for the bank questions of a quiz (and of the
+    quizzes sharing them). Returns number of bank questions written
+    (0 if NumPy is unavailable).
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        logger.warning("NumPy is not installed, question analytics are disabled")
+        return 0
+
+    links = QuizQuestion.objects.select_related(None)
+    content_ids = links.filter(quiz_id=quiz_id).values('content_id')
+    quiz_ids = links.filter(content_id__in=content_ids).values('quiz_id')
+    questions = list(
+        links.filter(quiz_id__in=quiz_ids).values_list('id', 'content_id', 'content__correct_answer').order_by()
+    )
+    stats_version = QuizStats.objects.filter(quiz_id=quiz_id).values_list('version', flat=True).first()
+    if not questions:
+        return 0
+
+    # Columns are bank questions; quiz questions map onto them
+    contents = {}
+    for _, content_id, correct in questions:
+        contents.setdefault(content_id, correct)
+    content_index = {content_id: i for i, content_id in enumerate(contents)}
+    question_index = {qid: content_index[content_id] for qid, content_id, _ in questions}
+    correct_option = np.array([_OPTION_INDEX.get(c.upper(), -1) for c in contents.values()], dtype=np.int8)
+
+    # One streamed query, columns collected into flat arrays
+    attempt_index = {}
+    rows_attempt, rows_question, rows_option = [], [], []
+    answers = QuizAnswer.objects.filter(
+        attempt__quiz_id__in=quiz_ids,
+        attempt__is_first_attempt=True
+    ).values_list('attempt_id', 'question_id', 'selected_answer').order_by().iterator(chunk_size=5000)
+    for attempt_id, question_id, selected in answers:
+        col = question_index.get(question_id)
+        if col is None:
+            continue
+        rows_attempt.append(attempt_index.setdefault(attempt_id, len(attempt_index)))
+        rows_question.append(col)
+        rows_option.append(_OPTION_INDEX.get((selected or '').upper(), _OTHER))
+
+    n_questions, n_attempts = len(contents), len(attempt_index)
+    a_idx = np.asarray(rows_attempt, dtype=np.int64)
+    q_idx = np.asarray(rows_question, dtype=np.int64)
+    opt = np.asarray(rows_option, dtype=np.int8)
+
+    # Option distribution per question
+    counts = np.zeros((n_questions, len(OPTIONS) + 1), dtype=np.int64)
+    np.add.at(counts, (q_idx, opt), 1)
+    responses = counts.sum(axis=1)
+
+    # attempts x questions matrices: answered mask and correctness (0/1)
+    answered = np.zeros((n_attempts, n_questions), dtype=bool)
+    correct = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    answered[a_idx, q_idx] = True
+    correct[a_idx, q_idx] = (opt == correct_option[q_idx])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = answered.sum(axis=0).astype(np.float64)
+        p_value = correct.sum(axis=0) / n
+
+        # Point-biserial: Pearson r between item correctness and rest score,
+        # over the attempts that saw the question
+        rest = correct.sum(axis=1, keepdims=True) - correct
+        mask = answered.astype(np.float64)
+        mean_x = (correct * mask).sum(axis=0) / n
+        mean_y = (rest * mask).sum(axis=0) / n
+        dx = (correct - mean_x) * mask
+        dy = (rest - mean_y) * mask
+        cov = (dx * dy).sum(axis=0)
+        discrimination = cov / np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+
+        timeout_rate = counts[:, _OPTION_INDEX['-']] / responses
+
+    def value(array, i):
+        v = array[i]
+        return None if not np.isfinite(v) else round(float(v), 4)
+
+    rows = [
+        QuestionAnalytics(
+            content_id=content_id,
+            responses=int(responses[i]),
+            p_value=value(p_value, i),
+            discrimination=value(discrimination, i),
+            option_counts={option: int(counts[i, j]) for j, option in enumerate(OPTIONS)},
+            timeout_rate=value(timeout_rate, i),
+        )
+        for i, content_id in enumerate(contents)
+    ]
+
+    with transaction.atomic():
+        QuestionAnalytics.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['content'],
+            update_fields=['responses', 'p_value', 'discrimination', 'option_counts', 'timeout_rate', 'computed_at']
+        )
+        if stats_version is not None:
+            QuizStats.objects.filter(quiz_id=quiz_id).update(analytics_version=stats_version)
+
+    return len(rows)
+
+
+def refresh_stale_analytics(limit: int = 20) -> int:
+    """Recompute analytics of quizzes that changed since the last run. Returns number of quizzes."""
+    stale = list(
+        QuizStats.objects.exclude(analytics_version=F('version'))
+        .filter(first_attempts__gt=0)
+        .order_by('updated_at')
+        .values_list('quiz_id', flat=True)[:limit]
+    )
+    for quiz_id in stale:
+        started = time.monotonic()
+        count = compute_quiz_analytics(quiz_id)
+        logger.info(f"Question analytics for quiz {quiz_id}: {count} questions in {time.monotonic() - started:.2f}s")
+    return len(stale)
@@ -0,0 +1,93 @@
+"""
+Quiz results export (gzip-compressed CSV).
+
+Finished attempts are read with values_list() and iterator(), so rows come
+from a server-side cursor on PostgreSQL (chunked fetches on SQLite) as plain
+tuples, with the quiz title and student names joined in the same query. Each
+row is written through gzip to a file on disk as it arrives, so memory use
+doesn't grow with the number of rows.
+
+One file covers a list of quizzes or everything the mentor's students did in
+a season (attempts started within the season's dates, like season ratings).
+"""
+import csv
+import gzip
+from datetime import datetime, time
+
+from django.utils import timezone
+
+from backend.quizzes.models import QuizAttempt
+
+RESULT_COLUMNS = [
+    "quiz_title",
+    "student_telegram_id",
+    "full_name",
+    "username",
+    "first_name",
+    "last_name",
+    "score",
+    "total",
+    "started_at",
+    "finished_at",
+]
+
+# Same order as RESULT_COLUMNS
+RESULT_FIELDS = [
+    'quiz__title',
+    'student__telegram_id',
+    'student__full_name',
+    'student__username',
+    'student__first_name',
+    'student__last_name',
+    'score',
+    'total',
+    'started_at',
+    'finished_at',
+]
+
+CHUNK_SIZE = 2000
+
+
+def results_queryset(mentor_id: int, quiz_ids=None, is_active: bool = None, season=None):
+    """Finished attempts on the mentor's quizzes, narrowed to quiz_ids / active flag / season"""
+    queryset = QuizAttempt.objects.filter(quiz__mentor_id=mentor_id, finished_at__isnull=False)
+    if quiz_ids is not None:
+        queryset = queryset.filter(quiz_id__in=quiz_ids)
+    if is_active is not None:
+        queryset = queryset.filter(quiz__is_active=is_active)
+    if season is not None:
+        season_start = timezone.make_aware(datetime.combine(season.start_date, time.min))
+        queryset = queryset.filter(started_at__gte=season_start, started_at__lt=season.rollover_at())
+        return queryset.order_by('finished_at', 'id')
+    return queryset.order_by('quiz_id', 'finished_at', 'id')
+
+
+def iter_result_rows(queryset, chunk_size: int = CHUNK_SIZE):
+    """CSV rows of the attempts, streamed chunk_size rows at a time"""
+    for row in queryset.values_list(*RESULT_FIELDS).iterator(chunk_size=chunk_size):
+        (title, telegram_id, full_name, username, first_name, last_name,
+         score, total, started_at, finished_at) = row
+        yield (
+            title,
+            telegram_id,
+            full_name or "",
+            username or "",
+            first_name or "",
+            last_name or "",
+            score,
+            total,
+            started_at.isoformat() if started_at else "",
+            finished_at.isoformat() if finished_at else "",
+        )
+
+
+def write_results_csv(path: str, queryset, compresslevel: int = 6) -> int:
+    """Write the attempts to path as gzip CSV with a header row. Returns the number of rows."""
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=compresslevel) as output:
+        writer = csv.writer(output)
+        writer.writerow(RESULT_COLUMNS)
+        for row in iter_result_rows(queryset):
+            writer.writerow(row)
+            count += 1
+    return count
@@ -0,0 +1,40 @@
+"""
+Delete question bank rows no quiz question links to.
+
+The bot deletes them when questions or quizzes are edited or deleted; this
+catches the ones left by changes made outside the bot (admin, shell) or
+before that cleanup existed.
+
+    python manage.py prune_question_bank
+    python manage.py prune_question_bank --dry-run
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.quizzes.models import QuestionContent
+
+
+class Command(BaseCommand):
+    help = "Delete unused question bank rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only count them")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        unused = QuestionContent.objects.filter(quiz_links__isnull=True).order_by('id')
+        if options['dry_run']:
+            self.stdout.write(f"{unused.count()} unused question bank rows")
+            return
+
+        deleted = 0
+        while True:
+            ids = list(unused.values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += QuestionContent.delete_unused(ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} unused question bank rows in {(time.monotonic() - started) * 1000:.0f} ms"
+        ))
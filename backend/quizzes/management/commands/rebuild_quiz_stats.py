@@ -0,0 +1,27 @@
+"""
+Recompute QuizStats from attempts and questions.
+
+Needed only when questions/attempts were changed outside the bot (admin, shell).
+
+    python manage.py rebuild_quiz_stats
+    python manage.py rebuild_quiz_stats --quiz 12 --quiz 13
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.quizzes.models import QuizStats
+
+
+class Command(BaseCommand):
+    help = "Recompute quiz list statistics"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, action='append', help="Quiz id (repeatable)")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = QuizStats.rebuild(options['quiz'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {count} quizzes in {(time.monotonic() - started) * 1000:.0f} ms"
+        ))
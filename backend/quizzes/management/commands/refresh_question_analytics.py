@@ -0,0 +1,31 @@
+"""
+Recompute per-question item analytics (difficulty, discrimination, options).
+
+The bot refreshes stale quizzes on its own; use this after bulk changes or
+to compute analytics for the first time.
+
+    python manage.py refresh_question_analytics
+    python manage.py refresh_question_analytics --quiz 12 --quiz 13
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.quizzes.analytics import compute_quiz_analytics
+from backend.quizzes.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Recompute question analytics"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, action='append', help="Quiz id (repeatable)")
+
+    def handle(self, *args, **options):
+        quiz_ids = options['quiz'] or list(Quiz.objects.values_list('id', flat=True))
+        started = time.monotonic()
+        questions = sum(compute_quiz_analytics(quiz_id) for quiz_id in quiz_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Analytics for {questions} questions in {len(quiz_ids)} quizzes "
+            f"in {(time.monotonic() - started) * 1000:.0f} ms"
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:34
+
+from django.db import migrations, models
+
+
+def mark_existing_attempts_processed(apps, schema_editor):
+    """Attempts finished before this migration were processed synchronously."""
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+    QuizAttempt.objects.filter(finished_at__isnull=False).update(processed_at=models.F('finished_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0005_quizquestion_time_bonus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_attempts_processed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('finished_at__isnull', False), ('processed_at__isnull', True)), fields=['finished_at'], name='quiz_attempt_unprocessed_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+def mark_first_attempts(apps, schema_editor):
+    """Flag each student's earliest finished attempt per quiz."""
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+    first_id = QuizAttempt.objects.filter(
+        student_id=models.OuterRef('student_id'),
+        quiz_id=models.OuterRef('quiz_id'),
+        finished_at__isnull=False
+    ).order_by('started_at', 'id').values('id')[:1]
+
+    QuizAttempt.objects.filter(finished_at__isnull=False).annotate(
+        first_id=models.Subquery(first_id)
+    ).filter(id=models.F('first_id')).update(is_first_attempt=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0006_quizattempt_processed_at'),
+        ('students', '0010_season_standings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='is_first_attempt',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_first_attempts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('is_first_attempt', True)), fields=['quiz', '-score', 'finished_at'], name='quiz_attempt_first_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizattempt',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_first_attempt', True)), fields=('student', 'quiz'), name='one_first_attempt_per_student_quiz'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_quiz_stats(apps, schema_editor):
+    """Create a QuizStats row for every existing quiz."""
+    from collections import defaultdict
+
+    Quiz = apps.get_model('quizzes', 'Quiz')
+    QuizQuestion = apps.get_model('quizzes', 'QuizQuestion')
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+    QuizStats = apps.get_model('quizzes', 'QuizStats')
+
+    histograms = defaultdict(dict)
+    for row in QuizAttempt.objects.filter(is_first_attempt=True).values('quiz_id', 'score').annotate(
+        count=models.Count('id')
+    ).order_by():
+        histograms[row['quiz_id']][str(row['score'])] = row['count']
+
+    question_counts = dict(
+        QuizQuestion.objects.values('quiz_id').annotate(count=models.Count('id')).order_by().values_list('quiz_id', 'count')
+    )
+
+    rows = []
+    for quiz_id in Quiz.objects.values_list('id', flat=True):
+        histogram = histograms.get(quiz_id, {})
+        rows.append(QuizStats(
+            quiz_id=quiz_id,
+            first_attempts=sum(histogram.values()),
+            score_sum=sum(int(score) * count for score, count in histogram.items()),
+            question_count=question_counts.get(quiz_id, 0),
+            score_histogram=histogram
+        ))
+    QuizStats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0007_quizattempt_is_first_attempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizStats',
+            fields=[
+                ('quiz', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='quizzes.quiz')),
+                ('first_attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveIntegerField(default=0)),
+                ('question_count', models.PositiveIntegerField(default=0)),
+                ('score_histogram', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Quiz Stats',
+                'verbose_name_plural': 'Quiz Stats',
+            },
+        ),
+        migrations.RunPython(populate_quiz_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0008_quizstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionAnalytics',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analytics', serialize=False, to='quizzes.quizquestion')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('p_value', models.FloatField(blank=True, null=True)),
+                ('discrimination', models.FloatField(blank=True, null=True)),
+                ('option_counts', models.JSONField(blank=True, default=dict)),
+                ('timeout_rate', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Question Analytics',
+                'verbose_name_plural': 'Question Analytics',
+            },
+        ),
+        migrations.AddField(
+            model_name='quizstats',
+            name='analytics_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizstats',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
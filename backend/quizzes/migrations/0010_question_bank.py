@@ -0,0 +1,127 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:10
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CONTENT_FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer')
+
+OLD_FIELDS = [
+    ('question_text', models.TextField(null=True)),
+    ('option_a', models.CharField(max_length=500, null=True)),
+    ('option_b', models.CharField(max_length=500, null=True)),
+    ('option_c', models.CharField(max_length=500, null=True)),
+    ('option_d', models.CharField(max_length=500, null=True)),
+    ('correct_answer', models.CharField(max_length=1, null=True)),
+]
+
+
+def content_hash(values) -> str:
+    parts = list(values[:5]) + [values[5].upper()]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def move_to_question_bank(apps, schema_editor):
+    """Store question content once per hash and link every QuizQuestion to it."""
+    QuizQuestion = apps.get_model('quizzes', 'QuizQuestion')
+    QuestionContent = apps.get_model('quizzes', 'QuestionContent')
+
+    rows = list(QuizQuestion.objects.values_list('id', *CONTENT_FIELDS))
+    contents = {}
+    for row in rows:
+        values = row[1:]
+        contents.setdefault(content_hash(values), values)
+    QuestionContent.objects.bulk_create([
+        QuestionContent(content_hash=h, **dict(zip(CONTENT_FIELDS, values)))
+        for h, values in contents.items()
+    ], batch_size=500)
+
+    ids = dict(QuestionContent.objects.values_list('content_hash', 'id'))
+    links = [QuizQuestion(id=row[0], content_id=ids[content_hash(row[1:])]) for row in rows]
+    QuizQuestion.objects.bulk_update(links, ['content'], batch_size=500)
+
+
+def restore_question_fields(apps, schema_editor):
+    QuizQuestion = apps.get_model('quizzes', 'QuizQuestion')
+    links = list(QuizQuestion.objects.select_related('content'))
+    for link in links:
+        for field in CONTENT_FIELDS:
+            setattr(link, field, getattr(link.content, field))
+    QuizQuestion.objects.bulk_update(links, CONTENT_FIELDS, batch_size=500)
+
+
+def recompute_analytics(apps, schema_editor):
+    """Analytics are now per bank question: mark every quiz stale"""
+    QuizStats = apps.get_model('quizzes', 'QuizStats')
+    QuizStats.objects.update(version=models.F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0009_question_analytics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('question_text', models.TextField()),
+                ('option_a', models.CharField(max_length=500)),
+                ('option_b', models.CharField(max_length=500)),
+                ('option_c', models.CharField(max_length=500)),
+                ('option_d', models.CharField(max_length=500)),
+                ('correct_answer', models.CharField(max_length=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Question Content',
+                'verbose_name_plural': 'Question Bank',
+            },
+        ),
+        migrations.AddField(
+            model_name='quizquestion',
+            name='content',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='quiz_links', to='quizzes.questioncontent'),
+        ),
+        migrations.RunPython(move_to_question_bank, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='quizquestion',
+            name='content',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='quiz_links', to='quizzes.questioncontent'),
+        ),
+        # Nullable first, so the reverse migration can re-add and refill them
+        *[
+            migrations.AlterField(model_name='quizquestion', name=name, field=field)
+            for name, field in OLD_FIELDS
+        ],
+        migrations.RunPython(migrations.RunPython.noop, restore_question_fields),
+        *[
+            migrations.RemoveField(model_name='quizquestion', name=name)
+            for name, _ in OLD_FIELDS
+        ],
+        # Analytics were per quiz question, now per bank question (recomputed by the bot)
+        migrations.DeleteModel(
+            name='QuestionAnalytics',
+        ),
+        migrations.CreateModel(
+            name='QuestionAnalytics',
+            fields=[
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analytics', serialize=False, to='quizzes.questioncontent')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('p_value', models.FloatField(blank=True, null=True)),
+                ('discrimination', models.FloatField(blank=True, null=True)),
+                ('option_counts', models.JSONField(blank=True, default=dict)),
+                ('timeout_rate', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Question Analytics',
+                'verbose_name_plural': 'Question Analytics',
+            },
+        ),
+        migrations.RunPython(recompute_analytics, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+import hashlib
+
+from django.db import models, transaction
+from django.db.models.functions import Greatest
 from backend.mentors.models import Mentor
 from backend.students.models import Student
 
@@ -33,17 +36,93 @@ class Quiz(models.Model):
         return self.title
 
 
-class QuizQuestion(models.Model):
-    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='questions')
+CONTENT_FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer')
+
+
+def question_content_hash(question_text, option_a, option_b, option_c, option_d, correct_answer) -> str:
+    """sha256 of the question content (the question bank key)"""
+    parts = (question_text, option_a, option_b, option_c, option_d, correct_answer.upper())
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class QuestionContent(models.Model):
+    """
+    Question bank: text, options and answer stored once and shared by every
+    quiz that uses them (re-uploads, copies). Rows are immutable - editing a
+    question links it to another content row (see QuizQuestion.set_content).
+
+    Answers belong to the QuizQuestion, so after an edit the question's past
+    answers and its item analytics count for the edited content. Rows no
+    question links to any more are deleted (delete_unused) when a question or
+    quiz is edited or deleted.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
     question_text = models.TextField()
     option_a = models.CharField(max_length=500)
     option_b = models.CharField(max_length=500)
     option_c = models.CharField(max_length=500)
     option_d = models.CharField(max_length=500)
     correct_answer = models.CharField(max_length=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Question Content"
+        verbose_name_plural = "Question Bank"
+
+    def __str__(self):
+        return self.question_text[:50]
+
+    @classmethod
+    def get_or_create_many(cls, items: list) -> list:
+        """
+        items: dicts with CONTENT_FIELDS. Returns QuestionContent rows in the same
+        order, creating missing ones (2 queries however many items there are).
+        Call it in the transaction that links the rows to questions.
+        """
+        hashes = [question_content_hash(*(item[f] for f in CONTENT_FIELDS)) for item in items]
+        by_hash = {}
+        # A row delete_unused removes between the insert and the select is inserted again
+        while len(by_hash) < len(set(hashes)):
+            cls.objects.bulk_create(
+                [cls(content_hash=h, **{f: item[f] for f in CONTENT_FIELDS})
+                 for h, item in zip(hashes, items) if h not in by_hash],
+                ignore_conflicts=True,
+                batch_size=500
+            )
+            # Locked until the caller's transaction links them, so delete_unused waits
+            rows = cls.objects.select_for_update(no_key=True).filter(content_hash__in=set(hashes) - by_hash.keys())
+            by_hash.update((c.content_hash, c) for c in rows)
+        return [by_hash[h] for h in hashes]
+
+    @classmethod
+    def delete_unused(cls, ids) -> int:
+        """Delete the rows of ids no question links to. Returns how many were deleted."""
+        ids = set(ids)
+        if not ids:
+            return 0
+        with transaction.atomic():
+            # Wait for transactions linking them (get_or_create_many), then check the links
+            locked = list(cls.objects.select_for_update().filter(id__in=ids).values_list('id', flat=True))
+            unused = cls.objects.filter(id__in=locked, quiz_links__isnull=True)
+            _, deleted = unused.delete()
+        return deleted.get(cls._meta.label, 0)
+
+
+class QuizQuestionManager(models.Manager):
+    def get_queryset(self):
+        # Question fields live in QuestionContent
+        return super().get_queryset().select_related('content')
+
+
+class QuizQuestion(models.Model):
+    """A question of a quiz: ordered link to a QuestionContent row"""
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='questions')
+    content = models.ForeignKey(QuestionContent, on_delete=models.PROTECT, related_name='quiz_links')
     order = models.PositiveIntegerField(default=0)
     time_bonus = models.PositiveSmallIntegerField(default=0)
 
+    objects = QuizQuestionManager()
+
     class Meta:
         verbose_name = "Quiz Question"
         verbose_name_plural = "Quiz Questions"
@@ -52,6 +131,41 @@ class QuizQuestion(models.Model):
     def __str__(self):
         return f"{self.quiz.title} - Q{self.order}"
 
+    @property
+    def question_text(self):
+        return self.content.question_text
+
+    @property
+    def option_a(self):
+        return self.content.option_a
+
+    @property
+    def option_b(self):
+        return self.content.option_b
+
+    @property
+    def option_c(self):
+        return self.content.option_c
+
+    @property
+    def option_d(self):
+        return self.content.option_d
+
+    @property
+    def correct_answer(self):
+        return self.content.correct_answer
+
+
+    def set_content(self, **fields) -> bool:
+        """Copy-on-write edit of content fields. Returns True if the content changed."""
+        values = {f: fields.get(f, getattr(self.content, f)) for f in CONTENT_FIELDS}
+        content = QuestionContent.get_or_create_many([values])[0]
+        if content.id == self.content_id:
+            return False
+        self.content = content
+        self.save(update_fields=['content'])
+        return True
+
 
 class QuizAttempt(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='quiz_attempts')
@@ -60,6 +174,10 @@ class QuizAttempt(models.Model):
     total = models.PositiveIntegerField(default=0)
     started_at = models.DateTimeField(auto_now_add=True)
     finished_at = models.DateTimeField(blank=True, null=True)
+    # Set once streak and season rating were updated for this attempt
+    processed_at = models.DateTimeField(blank=True, null=True)
+    # Student's earliest finished attempt of this quiz (quiz statistics use first attempts only)
+    is_first_attempt = models.BooleanField(default=False)
 
     class Meta:
         verbose_name = "Quiz Attempt"
@@ -69,6 +187,23 @@ class QuizAttempt(models.Model):
             models.Index(fields=['student', 'quiz']),
             models.Index(fields=['quiz', 'finished_at']),
             models.Index(fields=['finished_at']),
+            models.Index(
+                fields=['finished_at'],
+                condition=models.Q(finished_at__isnull=False, processed_at__isnull=True),
+                name='quiz_attempt_unprocessed_idx'
+            ),
+            models.Index(
+                fields=['quiz', '-score', 'finished_at'],
+                condition=models.Q(is_first_attempt=True),
+                name='quiz_attempt_first_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'quiz'],
+                condition=models.Q(is_first_attempt=True),
+                name='one_first_attempt_per_student_quiz'
+            ),
         ]
 
     def __str__(self):
@@ -88,3 +223,141 @@ class QuizAnswer(models.Model):
 
     def __str__(self):
         return f"{self.attempt} - Q{self.question.order}: {self.selected_answer}"
+
+
+class QuizStats(models.Model):
+    """
+    Precomputed quiz list numbers (first attempts only).
+
+    Maintained incrementally by bot/db.py when attempts finish, questions are
+    added/deleted and attempts are reset. `manage.py rebuild_quiz_stats`
+    recomputes it from scratch (e.g. after edits in the admin).
+    """
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    first_attempts = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0)
+    # {"<score>": <number of first attempts with that score>}
+    score_histogram = models.JSONField(default=dict, blank=True)
+    # Bumped on every change; QuestionAnalytics are stale while analytics_version differs
+    version = models.PositiveIntegerField(default=0)
+    analytics_version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Quiz Stats"
+        verbose_name_plural = "Quiz Stats"
+
+    def __str__(self):
+        return f"{self.quiz_id}: {self.first_attempts} attempts"
+
+    @property
+    def avg_score(self) -> float:
+        return self.score_sum / self.first_attempts if self.first_attempts else 0
+
+    @classmethod
+    def _locked(cls, quiz_id: int):
+        """Get the stats row for update (creates it if missing). Call inside a transaction."""
+        cls.objects.get_or_create(quiz_id=quiz_id)
+        return cls.objects.select_for_update().get(quiz_id=quiz_id)
+
+    @classmethod
+    def record_first_attempt_change(cls, quiz_id: int, removed_score: int = None, added_score: int = None):
+        """A first attempt was added, replaced or re-scored"""
+        stats = cls._locked(quiz_id)
+        histogram = stats.score_histogram
+        if removed_score is not None:
+            stats.first_attempts = max(stats.first_attempts - 1, 0)
+            stats.score_sum = max(stats.score_sum - removed_score, 0)
+            key = str(removed_score)
+            if histogram.get(key, 0) > 1:
+                histogram[key] -= 1
+            else:
+                histogram.pop(key, None)
+        if added_score is not None:
+            stats.first_attempts += 1
+            stats.score_sum += added_score
+            key = str(added_score)
+            histogram[key] = histogram.get(key, 0) + 1
+        stats.version += 1
+        stats.save(update_fields=['first_attempts', 'score_sum', 'score_histogram', 'version', 'updated_at'])
+
+    @classmethod
+    def add_questions(cls, quiz_id: int, delta: int):
+        """Questions were added (delta > 0) or deleted (delta < 0)"""
+        cls.objects.get_or_create(quiz_id=quiz_id)
+        cls.objects.filter(quiz_id=quiz_id).update(
+            question_count=Greatest(models.F('question_count') + delta, 0),
+            version=models.F('version') + 1
+        )
+
+    @classmethod
+    def touch(cls, quiz_id: int):
+        """Questions were edited: mark analytics stale"""
+        cls.objects.filter(quiz_id=quiz_id).update(version=models.F('version') + 1)
+
+    @classmethod
+    def reset_attempts(cls, quiz_id: int):
+        """All attempts of the quiz were deleted"""
+        cls.objects.filter(quiz_id=quiz_id).update(
+            first_attempts=0, score_sum=0, score_histogram={}, version=models.F('version') + 1
+        )
+
+    @classmethod
+    def rebuild(cls, quiz_ids=None) -> int:
+        """Recompute stats from attempts and questions. Returns number of rows written."""
+        from collections import defaultdict
+
+        quizzes = Quiz.objects.all()
+        attempts = QuizAttempt.objects.filter(is_first_attempt=True)
+        questions = QuizQuestion.objects.all()
+        if quiz_ids is not None:
+            quizzes = quizzes.filter(id__in=quiz_ids)
+            attempts = attempts.filter(quiz_id__in=quiz_ids)
+            questions = questions.filter(quiz_id__in=quiz_ids)
+
+        rows = {quiz_id: cls(quiz_id=quiz_id, score_histogram={}) for quiz_id in quizzes.values_list('id', flat=True)}
+        histograms = defaultdict(dict)
+        for row in attempts.values('quiz_id', 'score').annotate(count=models.Count('id')).order_by():
+            histograms[row['quiz_id']][str(row['score'])] = row['count']
+        for quiz_id, histogram in histograms.items():
+            if quiz_id in rows:
+                rows[quiz_id].score_histogram = histogram
+                rows[quiz_id].first_attempts = sum(histogram.values())
+                rows[quiz_id].score_sum = sum(int(score) * count for score, count in histogram.items())
+        for row in questions.values('quiz_id').annotate(count=models.Count('id')).order_by():
+            if row['quiz_id'] in rows:
+                rows[row['quiz_id']].question_count = row['count']
+
+        cls.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['quiz'],
+            update_fields=['first_attempts', 'score_sum', 'question_count', 'score_histogram', 'updated_at'],
+            batch_size=500
+        )
+        return len(rows)
+
+
+class QuestionAnalytics(models.Model):
+    """
+    Item analytics of a bank question over first attempts of every quiz using it.
+    Computed in batch by backend/quizzes/analytics.py.
+    """
+    content = models.OneToOneField(QuestionContent, on_delete=models.CASCADE, primary_key=True, related_name='analytics')
+    responses = models.PositiveIntegerField(default=0)
+    # Share of correct answers (difficulty: high = easy)
+    p_value = models.FloatField(blank=True, null=True)
+    # Point-biserial correlation of correctness with the rest of the score (low/negative = misleading)
+    discrimination = models.FloatField(blank=True, null=True)
+    # {"A": n, "B": n, "C": n, "D": n, "-": n} ("-" = timeout)
+    option_counts = models.JSONField(default=dict, blank=True)
+    timeout_rate = models.FloatField(blank=True, null=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Question Analytics"
+        verbose_name_plural = "Question Analytics"
+
+    def __str__(self):
+        return f"Q{self.content_id}: p={self.p_value}"
@@ -0,0 +1,132 @@
+"""
+Mentor search over material titles, quiz titles/topics and student names.
+
+One ranked query per search, using the index created by migration
+search/0001_search_index:
+
+- PostgreSQL: pg_trgm word similarity (typo tolerant, matches inside words)
+- SQLite: FTS5 prefix match on every word, ranked by bm25
+- anything else (or SQLite without FTS5): icontains, unranked
+"""
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Q
+
+SearchResult = namedtuple('SearchResult', ['kind', 'id', 'title'])
+
+KINDS = {1: 'material', 2: 'quiz', 3: 'student'}
+MIN_QUERY_LENGTH = 2
+WORD_RE = re.compile(r'\w+')
+
+_fts_available = None
+
+
+def normalize_query(query: str) -> str:
+    """Words of the query joined by single spaces"""
+    return ' '.join(WORD_RE.findall(query or ''))[:100]
+
+
+def search(mentor_id: int, query: str, limit: int = 10) -> list:
+    """Best matches for the mentor, most relevant first. [SearchResult]"""
+    query = normalize_query(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgres(mentor_id, query, limit)
+    if connection.vendor == 'sqlite' and _sqlite_fts_available():
+        return _search_fts5(mentor_id, query, limit)
+    return _search_fallback(mentor_id, query, limit)
+
+
+def _sqlite_fts_available() -> bool:
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = 'search_index' in connection.introspection.table_names()
+    return _fts_available
+
+
+# ==================== POSTGRESQL ====================
+
+# Expressions must match the GIN trigram indexes exactly to be used
+POSTGRES_SQL = """
+    SELECT kind, id, title FROM (
+        SELECT 1 AS kind, m.id, m.title, word_similarity(%(q)s, m.title) AS score
+        FROM materials_material m JOIN materials_topic t ON t.id = m.topic_id
+        WHERE t.mentor_id = %(mentor)s AND (%(q)s <%% m.title OR m.title ILIKE %(like)s)
+      UNION ALL
+        SELECT 2, z.id, z.title, word_similarity(%(q)s, z.title || ' ' || coalesce(z.topic, ''))
+        FROM quizzes_quiz z
+        WHERE z.mentor_id = %(mentor)s
+          AND (%(q)s <%% (z.title || ' ' || coalesce(z.topic, ''))
+               OR (z.title || ' ' || coalesce(z.topic, '')) ILIKE %(like)s)
+      UNION ALL
+        SELECT 3, s.id,
+               coalesce(nullif(s.full_name, ''), nullif(trim(s.first_name || ' ' || s.last_name), ''),
+                        s.username, s.telegram_id::text),
+               word_similarity(%(q)s, s.full_name || ' ' || s.first_name || ' ' || s.last_name || ' '
+                                      || coalesce(s.username, ''))
+        FROM students_student s
+        WHERE s.mentor_id = %(mentor)s
+          AND (%(q)s <%% (s.full_name || ' ' || s.first_name || ' ' || s.last_name || ' ' || coalesce(s.username, ''))
+               OR (s.full_name || ' ' || s.first_name || ' ' || s.last_name || ' ' || coalesce(s.username, ''))
+                  ILIKE %(like)s)
+    ) results
+    ORDER BY score DESC, kind, id
+    LIMIT %(limit)s
+"""
+
+
+def _search_postgres(mentor_id: int, query: str, limit: int) -> list:
+    like = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_SQL, {'q': query, 'like': like, 'mentor': mentor_id, 'limit': limit})
+        return [SearchResult(KINDS[kind], object_id, title) for kind, object_id, title in cursor.fetchall()]
+
+
+# ==================== SQLITE FTS5 ====================
+
+FTS5_SQL = """
+    SELECT rowid %% 4, rowid / 4, title FROM search_index
+    WHERE search_index MATCH %s
+    ORDER BY bm25(search_index, 10.0, 1.0, 0.0), rowid
+    LIMIT %s
+"""
+
+
+def _search_fts5(mentor_id: int, query: str, limit: int) -> list:
+    # Every word as a quoted prefix term (no FTS5 syntax from user input)
+    words = ' '.join(f'"{word}"*' for word in query.split())
+    match = f'mentor:"m{int(mentor_id)}" AND {{title body}}:({words})'
+    with connection.cursor() as cursor:
+        cursor.execute(FTS5_SQL, [match, limit])
+        return [SearchResult(KINDS[kind], object_id, title) for kind, object_id, title in cursor.fetchall()]
+
+
+# ==================== FALLBACK ====================
+
+def _search_fallback(mentor_id: int, query: str, limit: int) -> list:
+    from backend.materials.models import Material
+    from backend.quizzes.models import Quiz
+    from backend.students.models import Student
+
+    results = [
+        SearchResult('material', pk, title)
+        for pk, title in Material.objects.filter(topic__mentor_id=mentor_id, title__icontains=query)
+        .order_by('id').values_list('id', 'title')[:limit]
+    ]
+    results += [
+        SearchResult('quiz', pk, title)
+        for pk, title in Quiz.objects.filter(mentor_id=mentor_id)
+        .filter(Q(title__icontains=query) | Q(topic__icontains=query))
+        .order_by('id').values_list('id', 'title')[:limit]
+    ]
+    results += [
+        SearchResult('student', student.id, student.get_display_name())
+        for student in Student.objects.filter(mentor_id=mentor_id).filter(
+            Q(full_name__icontains=query) | Q(first_name__icontains=query)
+            | Q(last_name__icontains=query) | Q(username__icontains=query)
+        ).order_by('id')[:limit]
+    ]
+    return results[:limit]
@@ -0,0 +1,116 @@
+"""
+Search indexes over material titles, quiz titles/topics and student names.
+
+PostgreSQL: pg_trgm GIN indexes on the searched columns (no extra table).
+SQLite: an FTS5 table kept in sync by triggers. rowid = object id * 4 + kind
+(1 material, 2 quiz, 3 student), so triggers update one row by rowid. The
+mentor is an indexed token ("m<id>"), so MATCH only visits that mentor's rows.
+Other databases get nothing and search falls back to icontains.
+"""
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS search_material_trgm ON materials_material "
+    "USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS search_quiz_trgm ON quizzes_quiz "
+    "USING gin ((title || ' ' || coalesce(topic, '')) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS search_student_trgm ON students_student "
+    "USING gin ((full_name || ' ' || first_name || ' ' || last_name || ' ' || coalesce(username, '')) gin_trgm_ops)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS search_material_trgm",
+    "DROP INDEX IF EXISTS search_quiz_trgm",
+    "DROP INDEX IF EXISTS search_student_trgm",
+]
+
+# Indexed row per object: (rowid, title, body, mentor)
+MATERIAL_ROW = (
+    "{row}.id * 4 + 1, {row}.title, {row}.file_name, "
+    "'m' || (SELECT mentor_id FROM materials_topic WHERE id = {row}.topic_id)"
+)
+QUIZ_ROW = "{row}.id * 4 + 2, {row}.title, coalesce({row}.topic, ''), 'm' || {row}.mentor_id"
+STUDENT_ROW = (
+    "{row}.id * 4 + 3, "
+    "coalesce(nullif({row}.full_name, ''), nullif(trim({row}.first_name || ' ' || {row}.last_name), ''), "
+    "{row}.username, CAST({row}.telegram_id AS TEXT)), "
+    "{row}.full_name || ' ' || {row}.first_name || ' ' || {row}.last_name || ' ' || coalesce({row}.username, ''), "
+    "'m' || {row}.mentor_id"
+)
+SOURCES = [
+    # (name, table, row expression, columns that change the indexed row)
+    ('material', 'materials_material', MATERIAL_ROW, ('title', 'file_name', 'topic_id')),
+    ('quiz', 'quizzes_quiz', QUIZ_ROW, ('title', 'topic')),
+    ('student', 'students_student', STUDENT_ROW, ('full_name', 'first_name', 'last_name', 'username', 'mentor_id')),
+]
+KIND = {'material': 1, 'quiz': 2, 'student': 3}
+
+
+def sqlite_forward():
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "title, body, mentor, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    ]
+    for name, table, row, columns in SOURCES:
+        insert = "INSERT INTO search_index(rowid, title, body, mentor) SELECT " + row
+        changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in columns)
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{name}_ai AFTER INSERT ON {table} BEGIN "
+            f"{insert.format(row='new')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{name}_au AFTER UPDATE ON {table} WHEN {changed} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 4 + {KIND[name]}; "
+            f"{insert.format(row='new')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{name}_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 4 + {KIND[name]}; END",
+            # Existing rows
+            insert.format(row='t') + f" FROM {table} t",
+        ]
+    return statements
+
+
+def sqlite_reverse():
+    statements = [
+        f"DROP TRIGGER IF EXISTS search_{name}_{event}"
+        for name, _, _, _ in SOURCES for event in ('ai', 'au', 'ad')
+    ]
+    return statements + ["DROP TABLE IF EXISTS search_index"]
+
+
+def fts5_available(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite' and fts5_available(schema_editor.connection):
+        run(schema_editor, sqlite_forward())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        run(schema_editor, sqlite_reverse())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials', '0002_material_materials_m_topic_i_c03f8e_idx'),
+        ('quizzes', '0010_question_bank'),
+        ('students', '0012_student_bot_blocked_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
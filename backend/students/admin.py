@@ -5,6 +5,6 @@ from .models import Student
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'telegram_id', 'mentor', 'joined_at', 'last_active')
-    list_filter = ('mentor',)
+    list_filter = ('mentor', 'bot_blocked_at')
     search_fields = ('username', 'first_name', 'last_name', 'telegram_id')
     readonly_fields = ('telegram_id', 'joined_at', 'last_active')
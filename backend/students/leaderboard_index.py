@@ -0,0 +1,450 @@
+"""
+Redis sorted-set mirror of the season and all-time leaderboards.
+
+Each board is one sorted set. The ordering used everywhere in the bot is
+
+    rating_score desc, avg_percentage desc, quizzes desc,
+    earliest finish asc (NULL last), student_id asc
+
+The first three keys are packed into the float score (all of them are
+small non-negative integers once rating/avg are expressed in tenths), the
+last two are packed into the member string. Redis orders equal scores by
+member bytes, so members are fixed-width and *inverted* — ZREVRANGE then
+yields the earliest finish / lowest id first.
+
+Rank lookups are ZREVRANK, pages are ZREVRANGE and board sizes ZCARD,
+all O(log n) or better.
+
+Boards are rebuilt from the database lazily (on first read, or after the
+ready marker expires) and by `manage.py leaderboard_index --rebuild`.
+Every public function raises IndexUnavailable when Redis can't be used so
+callers can fall back to the database query.
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, F, Min, Sum
+
+from backend.core.redis_client import get_redis
+from backend.students.ratings import rating_from_totals
+
+logger = logging.getLogger('studymate')
+
+# Board is trusted for this long, then rebuilt on the next read
+READY_TTL = 60 * 60
+# Only one process rebuilds a board at a time
+REBUILD_LOCK_TTL = 30
+
+# Score layout: rating tenths (<= 1500) | avg tenths (<= 1000) | quizzes
+_AVG_SHIFT = 2 ** 20
+_RATING_SHIFT = 2 ** 30
+_MAX_QUIZZES = _AVG_SHIFT - 1
+
+# Member layout: inverted finish time (µs since epoch) + inverted student id
+_TIME_WIDTH = 17
+_ID_WIDTH = 12
+_TIME_MAX = 10 ** _TIME_WIDTH - 1
+_ID_MAX = 10 ** _ID_WIDTH - 1
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class IndexUnavailable(Exception):
+    """Redis is disabled, unreachable or the board is being rebuilt"""
+
+
+# ==================== ENCODING ====================
+
+def encode_score(rating_score: float, avg_percentage: float, total_quizzes: int) -> int:
+    rating = max(int(round(rating_score * 10)), 0)
+    avg = max(int(round(avg_percentage * 10)), 0)
+    quizzes = min(max(int(total_quizzes), 0), _MAX_QUIZZES)
+    return rating * _RATING_SHIFT + avg * _AVG_SHIFT + quizzes
+
+
+def decode_score(score: float) -> tuple[float, float, int]:
+    """Returns (rating_score, avg_percentage, total_quizzes)"""
+    score = int(score)
+    rating, rest = divmod(score, _RATING_SHIFT)
+    avg, quizzes = divmod(rest, _AVG_SHIFT)
+    return rating / 10, avg / 10, quizzes
+
+
+def encode_member(student_id: int, earliest_finished=None) -> str:
+    if earliest_finished is None:
+        inv_time = 0  # Sorts after every real timestamp
+    else:
+        inv_time = _TIME_MAX - _micros(earliest_finished)
+    return f"{inv_time:0{_TIME_WIDTH}d}{_ID_MAX - student_id:0{_ID_WIDTH}d}"
+
+
+def _micros(value: datetime) -> int:
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def decode_member(member: str) -> int:
+    """Returns student_id"""
+    return _ID_MAX - int(member[_TIME_WIDTH:])
+
+
+# ==================== KEYS ====================
+
+def season_key(season_id: int) -> str:
+    return f"lb:season:{season_id}"
+
+
+def alltime_key(mentor_id: int) -> str:
+    return f"lb:alltime:{mentor_id}"
+
+
+def _members_key(key: str) -> str:
+    return f"{key}:members"
+
+
+def _ready_key(key: str) -> str:
+    return f"{key}:ready"
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+# ==================== DATABASE SOURCES ====================
+
+def _test_student_ids() -> set:
+    ids_str = os.environ.get('TEST_STUDENT_IDS', '')
+    return {int(i.strip()) for i in ids_str.split(',') if i.strip().isdigit()}
+
+
+def season_entries(season_id: int) -> list:
+    """
+    Board rows for a season from SeasonRating, in leaderboard order.
+    Returns list of (student_id, rating_score, avg_percentage, total_quizzes, earliest_attempt_at)
+    """
+    from backend.students.season_models import SeasonRating
+
+    rows = SeasonRating.objects.filter(
+        season_id=season_id,
+        rating_score__gt=0
+    ).exclude(
+        student__telegram_id__in=_test_student_ids()
+    ).order_by(*SeasonRating.LEADERBOARD_ORDERING).values_list(
+        'student_id', 'rating_score', 'avg_percentage', 'total_ranked_quizzes', 'earliest_attempt_at'
+    )
+    return list(rows)
+
+
+def alltime_entries(mentor_id: int, student_ids=None) -> list:
+    """
+    All-time board rows for a mentor, computed from ranked attempts, in leaderboard order.
+
+    Only counts attempts where:
+    - quiz.quiz_type == 'ranked'
+    - attempt.started_at < quiz.available_until
+
+    Returns list of (student_id, rating_score, avg_percentage, total_quizzes, earliest_finished)
+    """
+    from backend.quizzes.models import QuizAttempt
+
+    attempts = QuizAttempt.objects.filter(
+        quiz__mentor_id=mentor_id,
+        quiz__quiz_type='ranked',
+        finished_at__isnull=False,
+        quiz__available_until__isnull=False,
+        started_at__lt=F('quiz__available_until')
+    ).exclude(
+        student__telegram_id__in=_test_student_ids()
+    )
+    if student_ids is not None:
+        attempts = attempts.filter(student_id__in=student_ids)
+
+    grouped = attempts.values('student_id').annotate(
+        quizzes=Count('quiz_id', distinct=True),
+        total_score=Sum('score'),
+        total_questions=Sum('total'),
+        earliest_finished=Min('finished_at')
+    ).order_by()
+
+    results = []
+    for row in grouped:
+        if not row['total_questions']:
+            continue
+        avg_percentage, rating_score = rating_from_totals(row['total_score'], row['total_questions'], row['quizzes'])
+        results.append((row['student_id'], rating_score, avg_percentage, row['quizzes'], row['earliest_finished']))
+
+    results.sort(key=_sort_key)
+    return results
+
+
+def _sort_key(entry):
+    student_id, rating_score, avg_percentage, quizzes, earliest = entry
+    return (
+        -rating_score, -avg_percentage, -quizzes,
+        earliest is None, _micros(earliest) if earliest else 0,
+        student_id
+    )
+
+
+# ==================== BOARD MAINTENANCE ====================
+
+def _client():
+    client = get_redis()
+    if client is None:
+        raise IndexUnavailable("Redis is not configured")
+    return client
+
+
+def _write_board(client, key: str, entries: list):
+    """Replace a board with the given entries in one MULTI/EXEC block"""
+    pipe = client.pipeline(transaction=True)
+    pipe.delete(key, _members_key(key))
+    if entries:
+        members = {}
+        scores = {}
+        for student_id, rating, avg, quizzes, earliest in entries:
+            member = encode_member(student_id, earliest)
+            scores[member] = encode_score(rating, avg, quizzes)
+            members[student_id] = member
+        pipe.zadd(key, scores)
+        pipe.hset(_members_key(key), mapping=members)
+    pipe.set(_ready_key(key), 1, ex=READY_TTL)
+    pipe.execute()
+
+
+def rebuild_season(season_id: int) -> int:
+    """Rebuild a season board from SeasonRating. Returns number of entries."""
+    client = _client()
+    entries = season_entries(season_id)
+    try:
+        _write_board(client, season_key(season_id), entries)
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+    return len(entries)
+
+
+def rebuild_alltime(mentor_id: int) -> int:
+    """Rebuild a mentor's all-time board from quiz attempts. Returns number of entries."""
+    client = _client()
+    entries = alltime_entries(mentor_id)
+    try:
+        _write_board(client, alltime_key(mentor_id), entries)
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+    return len(entries)
+
+
+def _ensure_ready(client, key: str, rebuild):
+    """Make sure the board exists; rebuild it under a short lock if it doesn't"""
+    try:
+        if client.exists(_ready_key(key)):
+            return
+        if not client.set(_lock_key(key), 1, nx=True, ex=REBUILD_LOCK_TTL):
+            raise IndexUnavailable(f"{key} is being rebuilt")
+    except IndexUnavailable:
+        raise
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+
+    try:
+        rebuild()
+    finally:
+        try:
+            client.delete(_lock_key(key))
+        except Exception:
+            pass
+
+
+def _set_entry(client, key: str, student_id: int, entry):
+    """Replace (or remove when entry is None) one student's member on a board"""
+    members_key = _members_key(key)
+
+    def update(pipe):
+        old = pipe.hget(members_key, student_id)
+        pipe.multi()
+        if old:
+            pipe.zrem(key, old)
+        if entry is None:
+            pipe.hdel(members_key, student_id)
+        else:
+            _, rating, avg, quizzes, earliest = entry
+            member = encode_member(student_id, earliest)
+            pipe.zadd(key, {member: encode_score(rating, avg, quizzes)})
+            pipe.hset(members_key, student_id, member)
+
+    client.transaction(update, members_key)
+
+
+def update_student(mentor_id: int, student_id: int, season_id: int = None):
+    """
+    Refresh one student's entries after their ratings changed.
+
+    Boards that haven't been built yet are left alone (they will be built
+    from the database on first read). Never raises: on failure the board
+    is dropped so the next read rebuilds it.
+    """
+    client = get_redis()
+    if client is None:
+        return
+
+    targets = [(alltime_key(mentor_id), lambda: alltime_entries(mentor_id, [student_id]))]
+    if season_id is not None:
+        targets.append((season_key(season_id), lambda: _season_entry(season_id, student_id)))
+
+    for key, load in targets:
+        try:
+            if not client.exists(_ready_key(key)):
+                continue
+            entries = load()
+            _set_entry(client, key, student_id, entries[0] if entries else None)
+        except Exception as e:
+            logger.warning(f"Leaderboard index update failed for {key}: {e}")
+            invalidate_keys([key])
+
+
+def _season_entry(season_id: int, student_id: int) -> list:
+    from backend.students.season_models import SeasonRating
+
+    rows = SeasonRating.objects.filter(
+        season_id=season_id,
+        student_id=student_id,
+        rating_score__gt=0
+    ).exclude(
+        student__telegram_id__in=_test_student_ids()
+    ).values_list(
+        'student_id', 'rating_score', 'avg_percentage', 'total_ranked_quizzes', 'earliest_attempt_at'
+    )
+    return list(rows)
+
+
+def invalidate_keys(keys):
+    """Drop ready markers so the boards are rebuilt on next read"""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*[_ready_key(k) for k in keys])
+    except Exception as e:
+        logger.warning(f"Leaderboard index invalidation failed: {e}")
+
+
+def invalidate_mentor(mentor_id: int):
+    """Drop every board of a mentor (after quizzes/attempts were deleted in bulk)"""
+    from backend.students.season_models import Season
+
+    season_ids = Season.objects.filter(mentor_id=mentor_id).values_list('id', flat=True)
+    invalidate_keys([alltime_key(mentor_id)] + [season_key(sid) for sid in season_ids])
+
+
+# ==================== READS ====================
+
+def _rank(key: str, rebuild, student_id: int):
+    client = _client()
+    _ensure_ready(client, key, rebuild)
+    try:
+        member = client.hget(_members_key(key), student_id)
+        if not member:
+            return None
+        pipe = client.pipeline(transaction=False)
+        pipe.zrevrank(key, member)
+        pipe.zscore(key, member)
+        rank, score = pipe.execute()
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+    if rank is None:
+        return None
+    return (rank + 1,) + decode_score(score)
+
+
+def _page(key: str, rebuild, offset: int, limit: int) -> list:
+    client = _client()
+    _ensure_ready(client, key, rebuild)
+    try:
+        rows = client.zrevrange(key, offset, offset + limit - 1, withscores=True)
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+    return [(decode_member(member),) + decode_score(score) for member, score in rows]
+
+
+def _count(key: str, rebuild) -> int:
+    client = _client()
+    _ensure_ready(client, key, rebuild)
+    try:
+        return client.zcard(key)
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+
+
+def season_rank(season_id: int, student_id: int):
+    """Returns (rank, rating_score, avg_percentage, total_quizzes) or None if not on the board"""
+    return _rank(season_key(season_id), lambda: rebuild_season(season_id), student_id)
+
+
+def season_page(season_id: int, offset: int = 0, limit: int = 100) -> list:
+    """Returns list of (student_id, rating_score, avg_percentage, total_quizzes)"""
+    return _page(season_key(season_id), lambda: rebuild_season(season_id), offset, limit)
+
+
+def season_count(season_id: int) -> int:
+    """Number of students on the season board"""
+    return _count(season_key(season_id), lambda: rebuild_season(season_id))
+
+
+def alltime_rank(mentor_id: int, student_id: int):
+    """Returns (rank, rating_score, avg_percentage, total_quizzes) or None if not on the board"""
+    return _rank(alltime_key(mentor_id), lambda: rebuild_alltime(mentor_id), student_id)
+
+
+def alltime_page(mentor_id: int, offset: int = 0, limit: int = 100) -> list:
+    """Returns list of (student_id, rating_score, avg_percentage, total_quizzes)"""
+    return _page(alltime_key(mentor_id), lambda: rebuild_alltime(mentor_id), offset, limit)
+
+
+def alltime_count(mentor_id: int) -> int:
+    """Number of students on the mentor's all-time board"""
+    return _count(alltime_key(mentor_id), lambda: rebuild_alltime(mentor_id))
+
+
+# ==================== CONSISTENCY ====================
+
+def check_board(key: str, expected: list) -> list:
+    """
+    Compare a board with the database ordering.
+    Returns list of human-readable problems (empty if the board matches).
+    """
+    client = _client()
+    try:
+        rows = client.zrevrange(key, 0, -1, withscores=True)
+        members = client.hgetall(_members_key(key))
+    except Exception as e:
+        raise IndexUnavailable(str(e)) from e
+
+    problems = []
+    actual_ids = [decode_member(m) for m, _ in rows]
+    expected_ids = [e[0] for e in expected]
+
+    missing = set(expected_ids) - set(actual_ids)
+    extra = set(actual_ids) - set(expected_ids)
+    if missing:
+        problems.append(f"{len(missing)} students missing: {sorted(missing)[:10]}")
+    if extra:
+        problems.append(f"{len(extra)} unexpected students: {sorted(extra)[:10]}")
+    if len(members) != len(rows):
+        problems.append(f"members hash has {len(members)} entries, board has {len(rows)}")
+
+    for position, (expected_row, (member, score)) in enumerate(zip(expected, rows), 1):
+        student_id, rating, avg, quizzes, earliest = expected_row
+        if decode_member(member) != student_id:
+            problems.append(f"order differs at rank {position}: expected student {student_id}, got {decode_member(member)}")
+            break
+        if int(score) != encode_score(rating, avg, quizzes) or member != encode_member(student_id, earliest):
+            problems.append(f"stale entry for student {student_id} at rank {position}")
+
+    return problems
+
+
+def check_season(season_id: int) -> list:
+    return check_board(season_key(season_id), season_entries(season_id))
+
+
+def check_alltime(mentor_id: int) -> list:
+    return check_board(alltime_key(mentor_id), alltime_entries(mentor_id))
@@ -0,0 +1,32 @@
+"""
+Save final standings of ended seasons.
+
+Seasons are also closed automatically on the first leaderboard request after
+rollover; this command is for backfilling or forcing a specific season.
+
+    python manage.py close_seasons
+    python manage.py close_seasons --season 12
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.students.season_models import Season
+
+
+class Command(BaseCommand):
+    help = "Snapshot final standings of ended seasons"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, help="Close this season (id) even if it hasn't ended")
+
+    def handle(self, *args, **options):
+        if options['season']:
+            try:
+                season = Season.objects.get(id=options['season'])
+            except Season.DoesNotExist:
+                raise CommandError(f"Season {options['season']} not found")
+            count = season.close()
+            self.stdout.write(self.style.SUCCESS(f"{season.name}: {count} standings saved"))
+            return
+
+        closed = Season.close_ended_seasons()
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} seasons"))
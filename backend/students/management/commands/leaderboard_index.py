@@ -0,0 +1,66 @@
+"""
+Rebuild or verify the Redis leaderboard index.
+
+    python manage.py leaderboard_index --rebuild
+    python manage.py leaderboard_index --check
+    python manage.py leaderboard_index --check --mentor 3
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.mentors.models import Mentor
+from backend.students import leaderboard_index
+from backend.students.season_models import Season
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis leaderboard index from the database or check it for drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Rebuild boards from the database")
+        parser.add_argument('--check', action='store_true', help="Compare boards with the database ordering")
+        parser.add_argument('--mentor', type=int, help="Only boards of this mentor (id)")
+        parser.add_argument('--season', type=int, help="Only this season (id)")
+
+    def handle(self, *args, **options):
+        if not options['rebuild'] and not options['check']:
+            raise CommandError("Pass --rebuild and/or --check")
+
+        mentors = Mentor.objects.all()
+        seasons = Season.objects.all()
+        if options['mentor']:
+            mentors = mentors.filter(id=options['mentor'])
+            seasons = seasons.filter(mentor_id=options['mentor'])
+        if options['season']:
+            seasons = seasons.filter(id=options['season'])
+            mentors = mentors.none()
+
+        boards = [(f"all-time mentor={m.id}", m.id, None) for m in mentors]
+        boards += [(f"season={s.id} ({s.name}, mentor={s.mentor_id})", None, s.id) for s in seasons]
+
+        problems_total = 0
+        try:
+            for label, mentor_id, season_id in boards:
+                if options['rebuild']:
+                    if season_id is not None:
+                        count = leaderboard_index.rebuild_season(season_id)
+                    else:
+                        count = leaderboard_index.rebuild_alltime(mentor_id)
+                    self.stdout.write(f"Rebuilt {label}: {count} students")
+
+                if options['check']:
+                    if season_id is not None:
+                        problems = leaderboard_index.check_season(season_id)
+                    else:
+                        problems = leaderboard_index.check_alltime(mentor_id)
+                    problems_total += len(problems)
+                    if problems:
+                        self.stdout.write(self.style.ERROR(f"{label}:"))
+                        for problem in problems:
+                            self.stdout.write(f"  - {problem}")
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"{label}: OK"))
+        except leaderboard_index.IndexUnavailable as e:
+            raise CommandError(f"Redis unavailable: {e}")
+
+        if problems_total:
+            raise CommandError(f"{problems_total} problems found, run with --rebuild to fix")
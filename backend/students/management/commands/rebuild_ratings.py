@@ -0,0 +1,40 @@
+"""
+Rebuild SeasonRating rows from quiz attempts with set-based SQL.
+
+    python manage.py rebuild_ratings
+    python manage.py rebuild_ratings --mentor 3
+    python manage.py rebuild_ratings --season 12 --season 13 --student 45
+"""
+from django.core.management.base import BaseCommand
+
+from backend.students import leaderboard_index
+from backend.students.ratings import rebuild_season_ratings
+from backend.students.season_models import Season
+
+
+class Command(BaseCommand):
+    help = "Rebuild season ratings for any set of seasons, mentors or students"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, action='append', help="Season id (repeatable)")
+        parser.add_argument('--mentor', type=int, action='append', help="Mentor id (repeatable)")
+        parser.add_argument('--student', type=int, action='append', help="Student id (repeatable)")
+
+    def handle(self, *args, **options):
+        result = rebuild_season_ratings(
+            seasons=options['season'],
+            mentors=options['mentor'],
+            students=options['student'],
+        )
+
+        # Season boards in the Redis index are rebuilt on next read
+        seasons = Season.objects.all()
+        if options['season']:
+            seasons = seasons.filter(id__in=options['season'])
+        if options['mentor']:
+            seasons = seasons.filter(mentor_id__in=options['mentor'])
+        leaderboard_index.invalidate_keys([leaderboard_index.season_key(sid) for sid in seasons.values_list('id', flat=True)])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {result['rows']} ratings, reset {result['reset']} in {result['seconds'] * 1000:.0f} ms"
+        ))
@@ -0,0 +1,27 @@
+"""
+Recompute StudentStats (profile numbers) from finished attempts.
+
+Needed only when attempts were changed outside the bot (admin, shell).
+
+    python manage.py rebuild_student_stats
+    python manage.py rebuild_student_stats --student 45 --student 46
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.students.models import StudentStats
+
+
+class Command(BaseCommand):
+    help = "Recompute student profile statistics"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--student', type=int, action='append', help="Student id (repeatable)")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = StudentStats.rebuild(options['student'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {count} students in {(time.monotonic() - started) * 1000:.0f} ms"
+        ))
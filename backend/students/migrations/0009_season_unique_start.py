@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:39
+
+from django.db import migrations, models
+
+
+def merge_duplicate_seasons(apps, schema_editor):
+    """
+    Merge seasons created twice for the same mentor and start date
+    (concurrent month rollover). The active one (or the oldest) is kept;
+    ratings of the duplicates are moved to it unless it already has one
+    for that student (ratings are computed from attempts, so they match).
+    """
+    Season = apps.get_model('students', 'Season')
+    SeasonRating = apps.get_model('students', 'SeasonRating')
+
+    duplicates = (
+        Season.objects.values('mentor_id', 'start_date')
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+    )
+    for dup in duplicates:
+        seasons = list(
+            Season.objects.filter(mentor_id=dup['mentor_id'], start_date=dup['start_date'])
+            .order_by('-is_active', 'id')
+        )
+        keep, extra = seasons[0], seasons[1:]
+        extra_ids = [s.id for s in extra]
+        kept_students = SeasonRating.objects.filter(season=keep).values_list('student_id', flat=True)
+        SeasonRating.objects.filter(season_id__in=extra_ids).exclude(
+            student_id__in=kept_students
+        ).update(season=keep)
+        Season.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentors', '0002_mentor_language'),
+        ('students', '0008_populate_earliest_attempt_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_seasons, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='season',
+            constraint=models.UniqueConstraint(fields=('mentor', 'start_date'), name='unique_season_start_per_mentor'),
+        ),
+    ]
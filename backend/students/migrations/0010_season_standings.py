@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0009_season_unique_start'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, help_text='Set when final standings were saved (see SeasonStanding)', null=True, verbose_name='Closed At'),
+        ),
+        migrations.CreateModel(
+            name='SeasonStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField(verbose_name='Rank')),
+                ('rating_score', models.FloatField(verbose_name='Rating Score')),
+                ('avg_percentage', models.FloatField(verbose_name='Average Percentage')),
+                ('total_quizzes', models.PositiveIntegerField(verbose_name='Total Ranked Quizzes')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='students.season', verbose_name='Season')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_standings', to='students.student', verbose_name='Student')),
+            ],
+            options={
+                'verbose_name': 'Season Standing',
+                'verbose_name_plural': 'Season Standings',
+                'ordering': ['season', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('season', 'rank'), name='unique_standing_rank'), models.UniqueConstraint(fields=('season', 'student'), name='unique_standing_student')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_student_stats(apps, schema_editor):
+    """Create a StudentStats row for every existing student."""
+    Student = apps.get_model('students', 'Student')
+    StudentStats = apps.get_model('students', 'StudentStats')
+    QuizAttempt = apps.get_model('quizzes', 'QuizAttempt')
+
+    attempts = QuizAttempt.objects.filter(finished_at__isnull=False)
+    rows = {student_id: StudentStats(student_id=student_id) for student_id in Student.objects.values_list('id', flat=True)}
+    for row in attempts.values('student_id').annotate(
+        count=models.Count('id'),
+        score_sum=models.Sum('score'),
+        total_sum=models.Sum('total'),
+        quizzes=models.Count('quiz', distinct=True),
+        ranked=models.Count('quiz', distinct=True, filter=models.Q(quiz__quiz_type='ranked')),
+        practice=models.Count('quiz', distinct=True, filter=models.Q(quiz__quiz_type='practice')),
+    ).order_by():
+        stats = rows[row['student_id']]
+        stats.finished_attempts = row['count']
+        stats.score_sum = row['score_sum'] or 0
+        stats.total_sum = row['total_sum'] or 0
+        stats.total_quizzes = row['quizzes']
+        stats.ranked_quizzes = row['ranked']
+        stats.practice_quizzes = row['practice']
+
+    seen = set()
+    for student_id, score, total in attempts.order_by('student_id', '-score', 'id').values_list('student_id', 'score', 'total'):
+        if student_id not in seen:
+            seen.add(student_id)
+            rows[student_id].best_score, rows[student_id].best_total = score, total
+
+    StudentStats.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0010_season_standings'),
+        ('quizzes', '0005_quizquestion_time_bonus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStats',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='students.student')),
+                ('finished_attempts', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.PositiveIntegerField(default=0)),
+                ('total_sum', models.PositiveIntegerField(default=0)),
+                ('total_quizzes', models.PositiveIntegerField(default=0)),
+                ('ranked_quizzes', models.PositiveIntegerField(default=0)),
+                ('practice_quizzes', models.PositiveIntegerField(default=0)),
+                ('best_score', models.PositiveIntegerField(default=0)),
+                ('best_total', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Stats',
+                'verbose_name_plural': 'Student Stats',
+            },
+        ),
+        migrations.RunPython(populate_student_stats, migrations.RunPython.noop),
+    ]
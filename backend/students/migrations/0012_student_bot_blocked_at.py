@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0011_student_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='bot_blocked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Blocked Bot At'),
+        ),
+    ]
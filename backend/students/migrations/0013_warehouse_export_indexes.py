@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentors', '0002_mentor_language'),
+        ('students', '0012_student_bot_blocked_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seasonrating',
+            index=models.Index(fields=['updated_at'], name='students_se_updated_5fb84a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_active'], name='students_st_last_ac_2d4ad5_idx'),
+        ),
+    ]
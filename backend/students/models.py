@@ -2,7 +2,7 @@ from django.db import models
 from backend.mentors.models import Mentor
 
 # Import season models to ensure Django discovers them
-from .season_models import Season, SeasonRating  # noqa: F401
+from .season_models import Season, SeasonRating, SeasonStanding  # noqa: F401
 
 
 class Student(models.Model):
@@ -22,11 +22,16 @@ class Student(models.Model):
     longest_streak = models.IntegerField(default=0, verbose_name="Longest Streak (days)")
     last_quiz_date = models.DateField(null=True, blank=True, verbose_name="Last Quiz Date")
 
+    # Set when Telegram reports the student blocked the bot; broadcasts skip them
+    bot_blocked_at = models.DateTimeField(null=True, blank=True, verbose_name="Blocked Bot At")
+
     class Meta:
         verbose_name = "Student"
         verbose_name_plural = "Students"
         indexes = [
             models.Index(fields=['mentor', 'joined_at']),
+            # Incremental warehouse export (backend/warehouse)
+            models.Index(fields=['last_active']),
         ]
 
     def __str__(self):
@@ -42,15 +47,44 @@ class Student(models.Model):
 
     def get_quiz_stats(self):
         """
-        Calculate student's quiz statistics.
+        Student's quiz statistics (read from StudentStats).
         Returns dict with: total_quizzes, total_ranked, total_practice, avg_score, best_score
         """
-        from django.db.models import Avg, Sum, Max
+        stats = StudentStats.objects.filter(student_id=self.pk).first()
+        return stats.as_dict() if stats else StudentStats().as_dict()
+
+
+class StudentStats(models.Model):
+    """
+    Precomputed profile numbers over all finished attempts.
+
+    Updated by bot/db.py when an attempt finishes; rebuilt for affected
+    students when attempts are deleted. `manage.py rebuild_student_stats`
+    recomputes it from scratch.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    finished_attempts = models.PositiveIntegerField(default=0)
+    score_sum = models.PositiveIntegerField(default=0)
+    total_sum = models.PositiveIntegerField(default=0)
+    # Distinct quizzes with at least one finished attempt
+    total_quizzes = models.PositiveIntegerField(default=0)
+    ranked_quizzes = models.PositiveIntegerField(default=0)
+    practice_quizzes = models.PositiveIntegerField(default=0)
+    # Attempt with the highest raw score (earliest one on ties)
+    best_score = models.PositiveIntegerField(default=0)
+    best_total = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Student Stats"
+        verbose_name_plural = "Student Stats"
 
-        # All finished attempts
-        attempts = self.quiz_attempts.filter(finished_at__isnull=False)
+    def __str__(self):
+        return f"{self.student_id}: {self.total_quizzes} quizzes"
 
-        if not attempts.exists():
+    def as_dict(self) -> dict:
+        """Same shape as the profile screen expects"""
+        if not self.finished_attempts:
             return {
                 'total_quizzes': 0,
                 'total_ranked': 0,
@@ -61,41 +95,87 @@ class Student(models.Model):
                 'best_total': 0,
                 'best_percentage': 0
             }
-
-        # Count unique quizzes
-        total_quizzes = attempts.values('quiz').distinct().count()
-
-        # Count by type
-        ranked_attempts = attempts.filter(quiz__quiz_type='ranked')
-        practice_attempts = attempts.filter(quiz__quiz_type='practice')
-        total_ranked = ranked_attempts.values('quiz').distinct().count()
-        total_practice = practice_attempts.values('quiz').distinct().count()
-
-        # Calculate average score (raw score)
-        avg_score = attempts.aggregate(avg=Avg('score'))['avg'] or 0
-
-        # Calculate average percentage using DB aggregation
-        aggregates = attempts.aggregate(
-            total_score=Sum('score'),
-            total_possible=Sum('total')
-        )
-        total_score = aggregates['total_score'] or 0
-        total_possible = aggregates['total_possible'] or 0
-        avg_percentage = round((total_score / total_possible * 100), 1) if total_possible > 0 else 0
-
-        # Get best result
-        best_attempt = attempts.order_by('-score').first()
-        best_score = best_attempt.score if best_attempt else 0
-        best_total = best_attempt.total if best_attempt else 1
-        best_percentage = round((best_score / best_total * 100), 1) if best_total > 0 else 0
-
         return {
-            'total_quizzes': total_quizzes,
-            'total_ranked': total_ranked,
-            'total_practice': total_practice,
-            'avg_score': round(avg_score, 1),
-            'avg_percentage': avg_percentage,
-            'best_score': best_score,
-            'best_total': best_total,
-            'best_percentage': best_percentage
+            'total_quizzes': self.total_quizzes,
+            'total_ranked': self.ranked_quizzes,
+            'total_practice': self.practice_quizzes,
+            'avg_score': round(self.score_sum / self.finished_attempts, 1),
+            'avg_percentage': round(self.score_sum / self.total_sum * 100, 1) if self.total_sum > 0 else 0,
+            'best_score': self.best_score,
+            'best_total': self.best_total,
+            'best_percentage': round(self.best_score / self.best_total * 100, 1) if self.best_total > 0 else 0
         }
+
+    @classmethod
+    def record_finished_attempt(cls, student_id: int, score: int, total: int, new_quiz_type: str = None):
+        """
+        A new attempt finished. new_quiz_type is the quiz type if this is the
+        student's first finished attempt of that quiz, else None.
+        Call inside a transaction.
+        """
+        cls.objects.get_or_create(student_id=student_id)
+        stats = cls.objects.select_for_update().get(student_id=student_id)
+        if not stats.finished_attempts or score > stats.best_score:
+            stats.best_score, stats.best_total = score, total
+        stats.finished_attempts += 1
+        stats.score_sum += score
+        stats.total_sum += total
+        if new_quiz_type is not None:
+            stats.total_quizzes += 1
+            if new_quiz_type == 'ranked':
+                stats.ranked_quizzes += 1
+            elif new_quiz_type == 'practice':
+                stats.practice_quizzes += 1
+        stats.save()
+
+    @classmethod
+    def rebuild(cls, student_ids=None) -> int:
+        """Recompute stats from finished attempts. Returns number of rows written."""
+        from backend.quizzes.models import QuizAttempt
+
+        students = Student.objects.all()
+        attempts = QuizAttempt.objects.filter(finished_at__isnull=False)
+        if student_ids is not None:
+            students = students.filter(id__in=student_ids)
+            attempts = attempts.filter(student_id__in=student_ids)
+
+        rows = {student_id: cls(student_id=student_id) for student_id in students.values_list('id', flat=True)}
+        totals = attempts.values('student_id').annotate(
+            count=models.Count('id'),
+            score_sum=models.Sum('score'),
+            total_sum=models.Sum('total'),
+            quizzes=models.Count('quiz', distinct=True),
+            ranked=models.Count('quiz', distinct=True, filter=models.Q(quiz__quiz_type='ranked')),
+            practice=models.Count('quiz', distinct=True, filter=models.Q(quiz__quiz_type='practice')),
+        ).order_by()
+        for row in totals:
+            stats = rows.get(row['student_id'])
+            if stats is None:
+                continue
+            stats.finished_attempts = row['count']
+            stats.score_sum = row['score_sum'] or 0
+            stats.total_sum = row['total_sum'] or 0
+            stats.total_quizzes = row['quizzes']
+            stats.ranked_quizzes = row['ranked']
+            stats.practice_quizzes = row['practice']
+
+        # Best attempt: first row per student in (-score, id) order
+        seen = set()
+        best = attempts.order_by('student_id', '-score', 'id').values_list('student_id', 'score', 'total')
+        for student_id, score, total in best.iterator(chunk_size=5000):
+            if student_id in seen or student_id not in rows:
+                continue
+            seen.add(student_id)
+            rows[student_id].best_score, rows[student_id].best_total = score, total
+
+        cls.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=[
+                'finished_attempts', 'score_sum', 'total_sum', 'total_quizzes',
+                'ranked_quizzes', 'practice_quizzes', 'best_score', 'best_total', 'updated_at'
+            ],
+            batch_size=500
+        )
+        return len(rows)
@@ -0,0 +1,180 @@
+"""
+Set-based SeasonRating rebuild.
+
+One INSERT … SELECT … GROUP BY … ON CONFLICT statement recomputes ratings for
+any set of seasons / mentors / students, and one UPDATE zeroes ratings that no
+longer have valid attempts. Same rules and formula as the leaderboard:
+
+- ranked quizzes of the season's mentor only
+- finished attempts, started before quiz.available_until
+- attempt started within the season (by local date, TIME_ZONE)
+- rating = avg_percentage × (1 + min(total_quizzes / 10, 1) × 0.5)
+"""
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+def rating_from_totals(total_score: int, total_possible: int, total_quizzes: int) -> tuple[float, float]:
+    """
+    Returns (avg_percentage, rating_score) rounded to 0.1 half-up,
+    exactly like the SQL below (Python's round() would round 31.25 to 31.2).
+    """
+    tenth = Decimal('0.1')
+    if not total_possible:
+        return 0.0, 0.0
+    avg = (Decimal(total_score) * 100 / Decimal(total_possible)).quantize(tenth, ROUND_HALF_UP)
+    bonus = 1 + min(Decimal(total_quizzes) / 10, Decimal(1)) * Decimal('0.5')
+    rating = (avg * bonus).quantize(tenth, ROUND_HALF_UP)
+    return float(avg), float(rating)
+
+
+def _table(model) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _in(column: str, values) -> tuple[str, list]:
+    values = list(values)
+    if not values:
+        return "1 = 0", []
+    return f"{column} IN ({', '.join(['%s'] * len(values))})", values
+
+
+def _valid_attempts_sql(attempt_alias: str, quiz_alias: str, season_alias: str) -> tuple[str, list]:
+    """WHERE fragment selecting attempts that count towards a season rating"""
+    tzname = timezone.get_current_timezone_name() if settings.USE_TZ else None
+    local_date, params = connection.ops.datetime_cast_date_sql(f"{attempt_alias}.started_at", (), tzname)
+    sql = (
+        f"{quiz_alias}.mentor_id = {season_alias}.mentor_id"
+        f" AND {quiz_alias}.quiz_type = 'ranked'"
+        f" AND {attempt_alias}.finished_at IS NOT NULL"
+        f" AND {quiz_alias}.available_until IS NOT NULL"
+        f" AND {attempt_alias}.started_at < {quiz_alias}.available_until"
+        f" AND {local_date} BETWEEN {season_alias}.start_date AND {season_alias}.end_date"
+    )
+    return sql, list(params)
+
+
+def rebuild_season_ratings(seasons=None, mentors=None, students=None) -> dict:
+    """
+    Recompute SeasonRating rows in bulk.
+
+    Args:
+        seasons: iterable of Season objects or ids (None = all seasons)
+        mentors: iterable of Mentor objects or ids (None = all mentors)
+        students: iterable of Student objects or ids (None = all students)
+
+    Returns dict with 'rows' (ratings inserted/updated), 'reset' (ratings zeroed
+    because they have no valid attempts left) and 'seconds'.
+    """
+    from backend.quizzes.models import Quiz, QuizAttempt
+    from backend.students.season_models import Season, SeasonRating
+
+    def ids(items):
+        return None if items is None else [getattr(item, 'pk', item) for item in items]
+
+    season_ids, mentor_ids, student_ids = ids(seasons), ids(mentors), ids(students)
+
+    attempts_t, quiz_t = _table(QuizAttempt), _table(Quiz)
+    season_t, rating_t = _table(Season), _table(SeasonRating)
+
+    # Scope filters
+    season_scope, season_scope_params = ["1 = 1"], []
+    if season_ids is not None:
+        sql, params = _in("s.id", season_ids)
+        season_scope.append(sql)
+        season_scope_params += params
+    if mentor_ids is not None:
+        sql, params = _in("s.mentor_id", mentor_ids)
+        season_scope.append(sql)
+        season_scope_params += params
+    season_scope_sql = " AND ".join(season_scope)
+
+    student_scope_sql, student_scope_params = "1 = 1", []
+    if student_ids is not None:
+        student_scope_sql, student_scope_params = _in("a.student_id", student_ids)
+
+    valid_sql, valid_params = _valid_attempts_sql("a", "q", "s")
+
+    avg_sql = (
+        "CASE WHEN agg.total_possible > 0"
+        " THEN ROUND(CAST(agg.total_score * 100.0 / agg.total_possible AS NUMERIC), 1)"
+        " ELSE 0 END"
+    )
+    bonus_sql = (
+        "(1 + CASE WHEN agg.total_quizzes >= 10 THEN 1.0"
+        " ELSE agg.total_quizzes / 10.0 END * 0.5)"
+    )
+
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    upsert_sql = f"""
+        INSERT INTO {rating_t} (
+            season_id, student_id, total_ranked_quizzes, total_score, total_possible,
+            avg_percentage, rating_score, earliest_attempt_at, updated_at
+        )
+        SELECT
+            agg.season_id, agg.student_id, agg.total_quizzes, agg.total_score, agg.total_possible,
+            {avg_sql}, ROUND(CAST({avg_sql} * {bonus_sql} AS NUMERIC), 1), agg.earliest, %s
+        FROM (
+            SELECT
+                s.id AS season_id,
+                a.student_id AS student_id,
+                COUNT(DISTINCT a.quiz_id) AS total_quizzes,
+                SUM(a.score) AS total_score,
+                SUM(a.total) AS total_possible,
+                MIN(a.finished_at) AS earliest
+            FROM {attempts_t} a
+            JOIN {quiz_t} q ON q.id = a.quiz_id
+            JOIN {season_t} s ON s.mentor_id = q.mentor_id
+            WHERE {valid_sql} AND {season_scope_sql} AND {student_scope_sql}
+            GROUP BY s.id, a.student_id
+        ) agg
+        WHERE 1 = 1
+        ON CONFLICT (season_id, student_id) DO UPDATE SET
+            total_ranked_quizzes = EXCLUDED.total_ranked_quizzes,
+            total_score = EXCLUDED.total_score,
+            total_possible = EXCLUDED.total_possible,
+            avg_percentage = EXCLUDED.avg_percentage,
+            rating_score = EXCLUDED.rating_score,
+            earliest_attempt_at = EXCLUDED.earliest_attempt_at,
+            updated_at = EXCLUDED.updated_at
+    """
+    upsert_params = [now, *valid_params, *season_scope_params, *student_scope_params]
+
+    # Ratings in scope without any valid attempt left
+    reset_student_sql = student_scope_sql.replace("a.student_id", "r.student_id")
+    reset_sql = f"""
+        UPDATE {rating_t} SET
+            total_ranked_quizzes = 0, total_score = 0, total_possible = 0,
+            avg_percentage = 0, rating_score = 0, earliest_attempt_at = NULL, updated_at = %s
+        WHERE {rating_t}.id IN (
+            SELECT r.id
+            FROM {rating_t} r
+            JOIN {season_t} s ON s.id = r.season_id
+            WHERE {season_scope_sql} AND {reset_student_sql}
+              AND (r.total_ranked_quizzes <> 0 OR r.total_possible <> 0 OR r.rating_score <> 0)
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM {attempts_t} a
+                  JOIN {quiz_t} q ON q.id = a.quiz_id
+                  WHERE a.student_id = r.student_id AND {valid_sql}
+              )
+        )
+    """
+    reset_params = [now, *season_scope_params, *student_scope_params, *valid_params]
+
+    started = time.monotonic()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(upsert_sql, upsert_params)
+        rows = max(cursor.rowcount, 0)
+        cursor.execute(reset_sql, reset_params)
+        reset = max(cursor.rowcount, 0)
+
+    return {
+        'rows': rows,
+        'reset': reset,
+        'seconds': time.monotonic() - started,
+    }
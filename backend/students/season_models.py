@@ -1,9 +1,47 @@
 """
 Season and SeasonRating models for leaderboard management.
 """
-from django.db import models
+import threading
+
+from django.db import models, transaction, IntegrityError
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+
+
+MONTH_NAMES_RU = [
+    'Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
+    'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь'
+]
+
+# Per-process cache of each mentor's current season:
+# mentor_id -> (season, valid_until). valid_until is the season rollover
+# instant (local midnight after end_date), capped by CURRENT_SEASON_CACHE_TTL
+# so edits made by other processes (e.g. admin) are picked up.
+CURRENT_SEASON_CACHE_TTL = timedelta(minutes=10)
+# Seasons are snapshotted this long after they end, so attempts started
+# just before the rollover are finished and processed first
+SEASON_CLOSE_GRACE = timedelta(hours=1)
+_current_season_cache: dict = {}
+_current_season_lock = threading.Lock()
+
+
+def _month_bounds(target_date):
+    """First and last day of target_date's month"""
+    start_of_month = target_date.replace(day=1)
+    if target_date.month == 12:
+        end_of_month = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
+    else:
+        end_of_month = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
+    return start_of_month, end_of_month
+
+
+def clear_season_cache(mentor_id=None):
+    """Forget cached current seasons (all mentors or one)"""
+    with _current_season_lock:
+        if mentor_id is None:
+            _current_season_cache.clear()
+        else:
+            _current_season_cache.pop(mentor_id, None)
 
 
 class Season(models.Model):
@@ -14,6 +52,7 @@ class Season(models.Model):
     - Automatic monthly seasons
     - Manual season creation by mentor
     - One active season per mentor at a time
+    - At most one season per mentor starting on a given date
     """
     mentor = models.ForeignKey(
         'mentors.Mentor',
@@ -34,6 +73,12 @@ class Season(models.Model):
         help_text="Only one season can be active at a time per mentor"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Closed At",
+        help_text="Set when final standings were saved (see SeasonStanding)"
+    )
 
     class Meta:
         verbose_name = "Season"
@@ -45,75 +90,124 @@ class Season(models.Model):
                 fields=['mentor', 'is_active'],
                 condition=models.Q(is_active=True),
                 name='one_active_season_per_mentor'
-            )
+            ),
+            # Concurrent month rollovers can't create the same season twice
+            models.UniqueConstraint(
+                fields=['mentor', 'start_date'],
+                name='unique_season_start_per_mentor'
+            ),
         ]
 
     def __str__(self):
         return f"{self.name} ({self.mentor.name})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._was_active = instance.is_active
+        return instance
+
     def is_current(self):
         """Check if this season is currently running"""
-        today = timezone.now().date()
+        today = timezone.localdate()
         return self.start_date <= today <= self.end_date
 
+    def rollover_at(self):
+        """Instant when this season ends (local midnight after end_date)"""
+        return timezone.make_aware(datetime.combine(self.end_date + timedelta(days=1), time.min))
+
     def save(self, *args, **kwargs):
         """Ensure only one active season per mentor"""
-        if self.is_active:
-            # Deactivate other active seasons for this mentor
+        if self.is_active and not getattr(self, '_was_active', False):
+            # Deactivate other active seasons for this mentor (only when activating)
             Season.objects.filter(
-                mentor=self.mentor,
+                mentor_id=self.mentor_id,
                 is_active=True
             ).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        self._was_active = self.is_active
+        clear_season_cache(self.mentor_id)
+
+    def delete(self, *args, **kwargs):
+        clear_season_cache(self.mentor_id)
+        return super().delete(*args, **kwargs)
+
+    def close(self) -> int:
+        """
+        Save final standings of an ended season (idempotent).
+        Returns number of standings written (0 if already closed).
+        """
+        from backend.students.leaderboard_index import season_entries
+
+        with transaction.atomic():
+            season = Season.objects.select_for_update().get(pk=self.pk)
+            if season.closed_at is not None:
+                self.closed_at = season.closed_at
+                return 0
+
+            standings = [
+                SeasonStanding(
+                    season_id=self.pk,
+                    rank=rank,
+                    student_id=student_id,
+                    rating_score=round(rating_score, 1),
+                    avg_percentage=round(avg_percentage, 1),
+                    total_quizzes=total_quizzes
+                )
+                for rank, (student_id, rating_score, avg_percentage, total_quizzes, _) in enumerate(
+                    season_entries(self.pk), 1
+                )
+            ]
+            SeasonStanding.objects.bulk_create(standings, batch_size=1000)
+
+            self.closed_at = timezone.now()
+            Season.objects.filter(pk=self.pk).update(closed_at=self.closed_at)
+
+        return len(standings)
+
+    @classmethod
+    def close_ended_seasons(cls, mentor=None) -> int:
+        """Snapshot every season that ended (plus grace period) and isn't closed yet"""
+        cutoff = timezone.localdate(timezone.now() - SEASON_CLOSE_GRACE)
+        seasons = cls.objects.filter(closed_at__isnull=True, end_date__lt=cutoff)
+        if mentor is not None:
+            seasons = seasons.filter(mentor=mentor)
+        closed = 0
+        for season in seasons:
+            season.close()
+            closed += 1
+        return closed
 
     @classmethod
     def get_or_create_current_season(cls, mentor):
         """
         Get or create the current month's season for a mentor.
-        Auto-creates monthly seasons.
+        Auto-creates monthly seasons. Served from a per-process cache until
+        the season's rollover instant.
         """
-        today = timezone.now().date()
-
-        # Try to find active season
-        active_season = cls.objects.filter(
-            mentor=mentor,
-            is_active=True,
-            start_date__lte=today,
-            end_date__gte=today
-        ).first()
-
-        if active_season:
-            return active_season
-
-        # Create new season for current month
-        start_of_month = today.replace(day=1)
-
-        # Calculate last day of month
-        if today.month == 12:
-            end_of_month = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            end_of_month = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-
-        # Generate season name
-        month_names_ru = [
-            'Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
-            'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь'
-        ]
-        season_name = f"{month_names_ru[today.month - 1]} {today.year}"
-
-        # Create season
-        season = cls.objects.create(
-            mentor=mentor,
-            name=season_name,
-            start_date=start_of_month,
-            end_date=end_of_month,
-            is_active=True
-        )
-
+        now = timezone.now()
+        with _current_season_lock:
+            cached = _current_season_cache.get(mentor.id)
+        if cached and now < cached[1]:
+            return cached[0]
+
+        cls.close_ended_seasons(mentor)
+        season = cls.get_or_create_season_for_date(mentor, timezone.localdate(now), use_cache=False)
+        if not season.is_active:
+            season.is_active = True
+            try:
+                with transaction.atomic():
+                    season.save(update_fields=['is_active'])
+            except IntegrityError:
+                # Another process activated it at the same time
+                season.refresh_from_db()
+
+        with _current_season_lock:
+            _current_season_cache[mentor.id] = (season, min(season.rollover_at(), now + CURRENT_SEASON_CACHE_TTL))
         return season
 
     @classmethod
-    def get_or_create_season_for_date(cls, mentor, target_date):
+    def get_or_create_season_for_date(cls, mentor, target_date, use_cache: bool = True):
         """
         Get or create season for a specific date (not necessarily today).
         Used when recording quiz attempts to ensure they go to the correct season.
@@ -121,52 +215,64 @@ class Season(models.Model):
         Args:
             mentor: Mentor object
             target_date: date or datetime object for which to find/create season
+                (aware datetimes are converted to the local date)
 
         Returns:
             Season object covering the target_date
         """
-        # Convert datetime to date if needed
-        if hasattr(target_date, 'date'):
-            target_date = target_date.date()
-
-        # Try to find existing season covering this date
+        # Convert datetime to (local) date if needed
+        if isinstance(target_date, datetime):
+            if timezone.is_aware(target_date):
+                target_date = timezone.localdate(target_date)
+            else:
+                target_date = target_date.date()
+
+        # Most attempts belong to the current season
+        if use_cache:
+            with _current_season_lock:
+                cached = _current_season_cache.get(mentor.id)
+            if cached and timezone.now() < cached[1] and cached[0].start_date <= target_date <= cached[0].end_date:
+                return cached[0]
+
+        # Try to find existing season covering this date (prefer the active one)
         existing_season = cls.objects.filter(
             mentor=mentor,
             start_date__lte=target_date,
             end_date__gte=target_date
-        ).first()
+        ).order_by('-is_active', '-start_date').first()
 
         if existing_season:
             return existing_season
 
         # Create new season for target month
-        start_of_month = target_date.replace(day=1)
-
-        # Calculate last day of month
-        if target_date.month == 12:
-            end_of_month = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            end_of_month = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
-
-        # Generate season name
-        month_names_ru = [
-            'Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
-            'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь'
-        ]
-        season_name = f"{month_names_ru[target_date.month - 1]} {target_date.year}"
+        start_of_month, end_of_month = _month_bounds(target_date)
+        season_name = f"{MONTH_NAMES_RU[target_date.month - 1]} {target_date.year}"
 
         # Check if this should be the active season (only if it covers today)
-        today = timezone.now().date()
+        today = timezone.localdate()
         is_active = (start_of_month <= today <= end_of_month)
 
-        # Create season
-        season = cls.objects.create(
-            mentor=mentor,
-            name=season_name,
-            start_date=start_of_month,
-            end_date=end_of_month,
-            is_active=is_active
-        )
+        # Create season; a concurrent request may have created it first
+        try:
+            with transaction.atomic():
+                season = cls.objects.create(
+                    mentor=mentor,
+                    name=season_name,
+                    start_date=start_of_month,
+                    end_date=end_of_month,
+                    is_active=is_active
+                )
+        except IntegrityError:
+            season = cls.objects.filter(mentor=mentor, start_date=start_of_month).first()
+            if season is None:
+                # Lost the race on the active flag, not the month: create inactive
+                season = cls.objects.create(
+                    mentor=mentor,
+                    name=season_name,
+                    start_date=start_of_month,
+                    end_date=end_of_month,
+                    is_active=False
+                )
 
         return season
 
@@ -222,11 +328,24 @@ class SeasonRating(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Leaderboard order (same tiebreakers as the all-time board)
+    LEADERBOARD_ORDERING = (
+        '-rating_score',
+        '-avg_percentage',
+        '-total_ranked_quizzes',
+        models.F('earliest_attempt_at').asc(nulls_last=True),
+        'student_id',
+    )
+
     class Meta:
         verbose_name = "Season Rating"
         verbose_name_plural = "Season Ratings"
         ordering = ['-rating_score']
         unique_together = ['season', 'student']
+        indexes = [
+            # Incremental warehouse export (backend/warehouse)
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.season.name}: {self.rating_score:.1f}"
@@ -234,70 +353,12 @@ class SeasonRating(models.Model):
     def recalculate(self):
         """
         Recalculate rating based on quiz attempts in this season.
-        Uses the same formula as global leaderboard.
+        Uses the same formula as global leaderboard (see backend/students/ratings.py).
         """
-        from backend.quizzes.models import QuizAttempt
-        from django.db.models import F
-        from datetime import datetime, time
-
-        # Convert season dates to datetime with timezone for proper comparison
-        season_start = timezone.make_aware(
-            datetime.combine(self.season.start_date, time.min)
-        )
-        season_end = timezone.make_aware(
-            datetime.combine(self.season.end_date, time.max)
-        )
-
-        # Get valid ranked attempts in this season
-        # Only count attempts that:
-        # 1. Are for ranked quizzes
-        # 2. Were completed (finished_at is not null)
-        # 3. Started within the season period
-        # 4. Started before the quiz expired (if available_until is set)
-        valid_attempts = QuizAttempt.objects.filter(
-            student=self.student,
-            quiz__mentor=self.season.mentor,
-            quiz__quiz_type='ranked',
-            finished_at__isnull=False,
-            started_at__gte=season_start,
-            started_at__lte=season_end,
-            quiz__available_until__isnull=False  # Only quizzes with available_until set
-        ).filter(
-            started_at__lt=F('quiz__available_until')
-        )
-
-        if not valid_attempts.exists():
-            self.total_ranked_quizzes = 0
-            self.total_score = 0
-            self.total_possible = 0
-            self.avg_percentage = 0.0
-            self.rating_score = 0.0
-            self.earliest_attempt_at = None
-            self.save()
-            return
-
-        # Calculate metrics
-        from django.db.models import Sum, Min
-
-        self.total_ranked_quizzes = valid_attempts.values('quiz').distinct().count()
-
-        aggregates = valid_attempts.aggregate(
-            total_score=Sum('score'),
-            total_possible=Sum('total'),
-            earliest_finished=Min('finished_at')
-        )
-        self.total_score = aggregates['total_score'] or 0
-        self.total_possible = aggregates['total_possible'] or 0
-        self.earliest_attempt_at = aggregates['earliest_finished']
+        from backend.students.ratings import rebuild_season_ratings
 
-        # Average percentage
-        self.avg_percentage = round((self.total_score / self.total_possible * 100), 1) if self.total_possible > 0 else 0
-
-        # Rating formula: avg_percentage × (1 + min(total_quizzes/10, 1) × 0.5)
-        activity_bonus = min(self.total_ranked_quizzes / 10, 1) * 0.5
-        self.rating_score = round(self.avg_percentage * (1 + activity_bonus), 1)
-
-        self.save()
+        rebuild_season_ratings(seasons=[self.season_id], students=[self.student_id])
+        self.refresh_from_db()
 
     @classmethod
     def get_or_create_for_student(cls, student, season):
@@ -314,3 +375,45 @@ class SeasonRating(models.Model):
             }
         )
         return rating
+
+
+class SeasonStanding(models.Model):
+    """
+    Final, immutable standings of a closed season.
+
+    Written once by Season.close(); later rating recalculations don't touch
+    it, so historical leaderboards never change.
+    """
+    season = models.ForeignKey(
+        Season,
+        on_delete=models.CASCADE,
+        related_name='standings',
+        verbose_name="Season"
+    )
+    rank = models.PositiveIntegerField(verbose_name="Rank")
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='season_standings',
+        verbose_name="Student"
+    )
+    rating_score = models.FloatField(verbose_name="Rating Score")
+    avg_percentage = models.FloatField(verbose_name="Average Percentage")
+    total_quizzes = models.PositiveIntegerField(verbose_name="Total Ranked Quizzes")
+
+    class Meta:
+        verbose_name = "Season Standing"
+        verbose_name_plural = "Season Standings"
+        ordering = ['season', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'rank'], name='unique_standing_rank'),
+            models.UniqueConstraint(fields=['season', 'student'], name='unique_standing_student'),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.student_id} - {self.season_id}: {self.rating_score:.1f}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Season standings are immutable")
+        super().save(*args, **kwargs)
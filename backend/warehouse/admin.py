@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import ExportWatermark
+
+
+@admin.register(ExportWatermark)
+class ExportWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('table', 'changed_at', 'last_id', 'rows', 'updated_at')
+    readonly_fields = ('updated_at',)
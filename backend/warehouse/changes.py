@@ -0,0 +1,159 @@
+"""
+Incremental export of changed rows for the analytics warehouse.
+
+Every exported table has a change column (see TABLES). The export reads the
+rows after the table's watermark in (change column, id) order, in keyset
+batches of batch_size rows from an index, and writes each row as one JSON
+object per line, in one file per local day of the change time:
+
+    <output>/<table>/date=2026-10-19/part-20261020T030000.ndjson[.gz]
+
+Rows changed again after an export are exported again with their new
+values, so the warehouse keeps the latest version per id. Deleted rows are
+not exported.
+
+Rows come in change-time order, so one day file is open at a time. When a
+day is complete its file is renamed from .tmp to its final name and the
+watermark (ExportWatermark) moves to its last row, so an interrupted export
+continues from the last complete day. Delivery is at-least-once: a crash
+between the rename and the watermark update exports that day's rows again
+under a new file name.
+
+Rows changed less than LAG_SECONDS ago are left for the next run, so a
+transaction that commits late (or a download event still buffered by the
+bot) is not skipped by a watermark that already moved past it.
+"""
+import gzip
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils import timezone
+
+from backend.downloads.models import Download
+from backend.questions.models import Question
+from backend.quizzes.models import QuizAttempt, QuizAnswer
+from backend.students.models import Student, SeasonRating
+from backend.warehouse.models import ExportWatermark
+
+ExportTable = namedtuple('ExportTable', ['model', 'changed_field'])
+
+TABLES = {
+    # Exported once finished (the score doesn't change after that)
+    'quiz_attempts': ExportTable(QuizAttempt, 'finished_at'),
+    # Complete when their attempt is finished
+    'quiz_answers': ExportTable(QuizAnswer, 'attempt__finished_at'),
+    'downloads': ExportTable(Download, 'downloaded_at'),
+    'season_ratings': ExportTable(SeasonRating, 'updated_at'),
+    # auto_now; changes written with QuerySet.update() (bot_blocked_at) wait for the next save
+    'students': ExportTable(Student, 'last_active'),
+    'questions': ExportTable(Question, 'updated_at'),
+}
+
+BATCH_SIZE = 5000
+LAG_SECONDS = 300
+
+TableExport = namedtuple('TableExport', ['table', 'rows', 'files'])
+
+
+def _after(changed_field: str, changed_at, last_id: int) -> Q:
+    """Rows after (changed_at, last_id) in (changed_field, id) order"""
+    return Q(**{f'{changed_field}__gt': changed_at}) | Q(**{changed_field: changed_at, 'id__gt': last_id})
+
+
+class _DayFile:
+    """NDJSON file of one day, written under a .tmp name until finished"""
+
+    def __init__(self, directory: str, run_id: str, compress: bool):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"part-{run_id}.ndjson" + (".gz" if compress else ""))
+        self.tmp_path = self.path + ".tmp"
+        if compress:
+            self.file = gzip.open(self.tmp_path, 'wt', encoding='utf-8')
+        else:
+            self.file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    def write(self, row: dict):
+        self.file.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+        self.file.write('\n')
+
+    def finish(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+def _save_watermark(table: str, changed_at, last_id: int, rows: int):
+    watermark, created = ExportWatermark.objects.get_or_create(
+        table=table, defaults={'changed_at': changed_at, 'last_id': last_id, 'rows': rows}
+    )
+    if not created:
+        watermark.changed_at = changed_at
+        watermark.last_id = last_id
+        watermark.rows += rows
+        watermark.save(update_fields=['changed_at', 'last_id', 'rows', 'updated_at'])
+
+
+def export_table(table: str, output_dir: str, run_id: str = None, until: datetime = None,
+                 batch_size: int = BATCH_SIZE, compress: bool = False) -> TableExport:
+    """
+    Export the table's rows changed after its watermark and before `until`
+    (default: LAG_SECONDS ago). Returns TableExport(table, rows, files).
+    """
+    model, changed_field = TABLES[table]
+    now = timezone.now()
+    run_id = run_id or now.strftime('%Y%m%dT%H%M%S')
+    until = until or now - timedelta(seconds=LAG_SECONDS)
+
+    fields = [field.attname for field in model._meta.concrete_fields]
+    base = model.objects.filter(**{f'{changed_field}__lt': until})
+    watermark = ExportWatermark.objects.filter(table=table).first()
+    position = (watermark.changed_at, watermark.last_id) if watermark else None
+
+    rows = files = 0
+    day, day_file, day_rows = None, None, 0
+    try:
+        while True:
+            queryset = base.filter(_after(changed_field, *position)) if position else base
+            batch = list(
+                queryset.order_by(changed_field, 'id')
+                .values(*fields, _changed_at=F(changed_field))[:batch_size]
+            )
+            for row in batch:
+                changed_at = row.pop('_changed_at')
+                row_day = timezone.localdate(changed_at)
+                if row_day != day:
+                    if day_file is not None:
+                        # Day complete: publish its file and move the watermark to its last row
+                        day_file.finish()
+                        _save_watermark(table, *position, day_rows)
+                        files += 1
+                    day, day_rows = row_day, 0
+                    day_file = _DayFile(os.path.join(output_dir, table, f"date={day.isoformat()}"), run_id, compress)
+                day_file.write(row)
+                day_rows += 1
+                position = (changed_at, row['id'])
+            rows += len(batch)
+            if len(batch) < batch_size:
+                break
+
+        if day_file is not None:
+            day_file.finish()
+            _save_watermark(table, *position, day_rows)
+            files += 1
+            day_file = None
+    finally:
+        if day_file is not None:
+            # Failed inside a day: drop its partial file, the day is exported again next time
+            day_file.file.close()
+            os.remove(day_file.tmp_path)
+
+    return TableExport(table, rows, files)
+
+
+def reset_watermark(table: str) -> bool:
+    """Forget the table's watermark (the next export starts from its first row)"""
+    deleted, _ = ExportWatermark.objects.filter(table=table).delete()
+    return bool(deleted)
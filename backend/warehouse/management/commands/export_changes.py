@@ -0,0 +1,57 @@
+"""
+Export rows changed since the last run as NDJSON for the analytics warehouse
+(see backend/warehouse/changes.py). Meant to run nightly; don't run two at once.
+
+    python manage.py export_changes --output /data/warehouse
+    python manage.py export_changes --output /data/warehouse --table downloads --gzip
+    python manage.py export_changes --reset --table students   # export students from the start
+"""
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backend.warehouse.changes import TABLES, BATCH_SIZE, LAG_SECONDS, export_table, reset_watermark
+
+
+class Command(BaseCommand):
+    help = "Export changed rows as NDJSON partitioned by day"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.getenv('WAREHOUSE_EXPORT_DIR'),
+                            help="Output directory (default: WAREHOUSE_EXPORT_DIR)")
+        parser.add_argument('--table', action='append', choices=sorted(TABLES),
+                            help="Table to export (repeatable, default: all)")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--lag', type=int, default=LAG_SECONDS,
+                            help="Leave rows changed in the last N seconds for the next run")
+        parser.add_argument('--gzip', action='store_true', help="Write .ndjson.gz files")
+        parser.add_argument('--reset', action='store_true', help="Only forget the watermarks of the tables")
+
+    def handle(self, *args, **options):
+        tables = options['table'] or list(TABLES)
+
+        if options['reset']:
+            for table in tables:
+                if reset_watermark(table):
+                    self.stdout.write(f"{table}: watermark removed")
+            return
+
+        if not options['output']:
+            raise CommandError("Set --output or WAREHOUSE_EXPORT_DIR")
+
+        # One file name and upper bound for every table of this run
+        now = timezone.now()
+        run_id = now.strftime('%Y%m%dT%H%M%S')
+        until = now - timedelta(seconds=options['lag'])
+
+        for table in tables:
+            started = time.monotonic()
+            result = export_table(table, options['output'], run_id=run_id, until=until,
+                                  batch_size=options['batch_size'], compress=options['gzip'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{table}: {result.rows} rows, {result.files} files "
+                f"in {(time.monotonic() - started) * 1000:.0f} ms"
+            ))
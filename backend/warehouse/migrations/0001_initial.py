@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50, unique=True)),
+                ('changed_at', models.DateTimeField()),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('rows', models.PositiveBigIntegerField(default=0, verbose_name='Rows Exported')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Export Watermark',
+                'verbose_name_plural': 'Export Watermarks',
+                'ordering': ['table'],
+            },
+        ),
+    ]
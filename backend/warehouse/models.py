@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class ExportWatermark(models.Model):
+    """
+    Position of the incremental warehouse export in one table
+    (see backend/warehouse/changes.py).
+
+    The next export reads rows whose change time / id come after
+    (changed_at, last_id) in that order. Delete the row to export the table
+    from the start again.
+    """
+    table = models.CharField(max_length=50, unique=True)
+    changed_at = models.DateTimeField()
+    last_id = models.BigIntegerField(default=0)
+    rows = models.PositiveBigIntegerField(default=0, verbose_name="Rows Exported")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Export Watermark"
+        verbose_name_plural = "Export Watermarks"
+        ordering = ['table']
+
+    def __str__(self):
+        return f"{self.table}: {self.changed_at.isoformat()} #{self.last_id}"
@@ -4,7 +4,7 @@ import django
 from asgiref.sync import sync_to_async
 from datetime import timedelta
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.core.settings')
@@ -12,11 +12,19 @@ django.setup()
 
 from backend.mentors.models import Mentor
 from backend.materials.models import Topic, Material
-from backend.students.models import Student
-from backend.students.season_models import Season, SeasonRating
+from backend.students.models import Student, StudentStats
+from backend.students.season_models import Season, SeasonRating, SeasonStanding
+from backend.students import leaderboard_index
 from backend.questions.models import Question
-from backend.downloads.models import Download
-from backend.quizzes.models import Quiz, QuizQuestion, QuizAttempt, QuizAnswer
+from backend.downloads.models import Download, DownloadDaily, DailyActiveStudent
+from backend.downloads import rollups as download_rollups
+from backend.broadcasts.models import Broadcast, BroadcastDelivery
+from backend.quizzes.models import (
+    Quiz, QuizQuestion, QuestionContent, QuizAttempt, QuizAnswer, QuizStats, QuestionAnalytics, CONTENT_FIELDS
+)
+from backend.quizzes import analytics as quiz_analytics
+from backend.search import index as search_index
+from bot.utils.pagination import Page, keyset_page
 
 
 # ==================== TEST ACCOUNTS ====================
@@ -183,13 +191,20 @@ def get_students_by_mentor(mentor):
 
 
 @sync_to_async
-def get_student_quiz_stats(telegram_id: int):
-    """Get student's quiz statistics"""
-    try:
-        student = Student.objects.get(telegram_id=telegram_id)
-        return student.get_quiz_stats()
-    except Student.DoesNotExist:
-        return None
+def count_students_by_mentor(mentor) -> int:
+    return Student.objects.filter(mentor=mentor).count()
+
+
+@sync_to_async
+def get_students_page(mentor, page: int, per_page: int, cursor: str = None) -> Page:
+    """One page of a mentor's students in join order (see bot.utils.pagination)"""
+    return keyset_page(Student.objects.filter(mentor=mentor).order_by('id'), page, per_page, cursor)
+
+
+@sync_to_async
+def get_student_quiz_stats(student):
+    """Get student's quiz statistics (one StudentStats read)"""
+    return student.get_quiz_stats()
 
 
 # ==================== TOPICS ====================
@@ -199,6 +214,19 @@ def get_topics_by_mentor(mentor):
     return list(Topic.objects.filter(mentor=mentor))
 
 
+@sync_to_async
+def get_topics_page(mentor, page: int, per_page: int, cursor: str = None, with_materials: bool = False) -> Page:
+    """
+    One page of a mentor's topics (see bot.utils.pagination).
+    with_materials: only topics that have at least one material (student view)
+    """
+    from django.db.models import Exists, OuterRef
+    topics = Topic.objects.filter(mentor=mentor)
+    if with_materials:
+        topics = topics.filter(Exists(Material.objects.filter(topic=OuterRef('pk'))))
+    return keyset_page(topics, page, per_page, cursor)
+
+
 @sync_to_async
 def get_topic_by_id(topic_id: int):
     try:
@@ -230,6 +258,12 @@ def get_materials_by_topic(topic):
     return list(Material.objects.filter(topic=topic))
 
 
+@sync_to_async
+def get_materials_page(topic_id: int, page: int, per_page: int, cursor: str = None) -> Page:
+    """One page of a topic's materials (see bot.utils.pagination)"""
+    return keyset_page(Material.objects.filter(topic_id=topic_id), page, per_page, cursor)
+
+
 @sync_to_async
 def get_material_by_id(material_id: int):
     try:
@@ -317,8 +351,32 @@ def create_question(mentor, text: str, student=None, message_id=None, student_te
 
 
 @sync_to_async
-def get_unanswered_questions(mentor):
-    return list(Question.objects.filter(mentor=mentor, is_answered=False))
+def get_unanswered_questions_page(mentor, page: int, per_page: int, cursor: str = None) -> Page:
+    """One page of the unanswered inbox, newest first (see bot.utils.pagination)"""
+    return keyset_page(Question.objects.filter(mentor=mentor, is_answered=False), page, per_page, cursor)
+
+
+@sync_to_async
+def get_question_text(question_id: int):
+    return Question.objects.filter(id=question_id).values_list('text', flat=True).first()
+
+
+@sync_to_async
+def mark_questions_notified(question_ids: list) -> int:
+    return Question.objects.filter(id__in=question_ids, notified_at__isnull=True).update(notified_at=timezone.now())
+
+
+@sync_to_async
+def get_unnotified_questions(since) -> list:
+    """
+    Questions created after `since` that were never sent to their mentor, oldest first.
+    Returns list of (mentor_telegram_id, question_id, student_telegram_id, message_id, text)
+    """
+    return list(
+        Question.objects.filter(notified_at__isnull=True, created_at__gte=since)
+        .order_by('created_at')
+        .values_list('mentor__telegram_id', 'id', 'student_telegram_id', 'message_id', 'text')
+    )
 
 
 @sync_to_async
@@ -435,16 +493,40 @@ def add_question_reply(question_id: int, reply_text: str) -> bool:
 # ==================== DOWNLOADS ====================
 
 @sync_to_async
-def record_download(student, material):
-    return Download.objects.create(student=student, material=material)
+def save_downloads(events: list) -> int:
+    """
+    Insert buffered download events [(student_id, material_id, downloaded_at)] in one batch.
+    Events of students or materials deleted meanwhile are skipped. Returns how many were saved.
+    """
+    for attempt in range(2):
+        student_ids = set(Student.objects.filter(id__in={e[0] for e in events}).values_list('id', flat=True))
+        material_ids = set(Material.objects.filter(id__in={e[1] for e in events}).values_list('id', flat=True))
+        events = [e for e in events if e[0] in student_ids and e[1] in material_ids]
+        try:
+            with transaction.atomic():
+                Download.objects.bulk_create([
+                    Download(student_id=student_id, material_id=material_id, downloaded_at=downloaded_at)
+                    for student_id, material_id, downloaded_at in events
+                ], batch_size=500)
+            return len(events)
+        except IntegrityError:
+            # Deleted between the check and the insert: check again
+            if attempt:
+                raise
+
+
+@sync_to_async(thread_sensitive=False)
+def rollup_download_days(dates) -> int:
+    """Recompute daily download rollups for the given local dates"""
+    return download_rollups.rollup_days(dates)
 
 
 # ==================== STATISTICS ====================
 
 @sync_to_async
 def get_mentor_stats(mentor):
-    now = timezone.now()
-    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    """Counts plus download activity (read from the daily rollups, up to a minute behind)"""
+    today = timezone.localdate()
     week_ago = today - timedelta(days=7)
 
     # Exclude test students from counts
@@ -461,30 +543,20 @@ def get_mentor_stats(mentor):
     questions_unanswered = Question.objects.filter(mentor=mentor, is_answered=False).count()
 
     # Exclude test students from activity stats
-    active_today_qs = Download.objects.filter(
-        material__topic__mentor=mentor,
-        downloaded_at__gte=today
-    )
+    active_qs = DailyActiveStudent.objects.filter(mentor=mentor, date__gte=week_ago)
     if test_ids:
-        active_today_qs = active_today_qs.exclude(student__telegram_id__in=test_ids)
-    active_today = active_today_qs.values('student').distinct().count()
+        active_qs = active_qs.exclude(student__telegram_id__in=test_ids)
+    active_today = active_qs.filter(date=today).count()
+    active_week = active_qs.values('student').distinct().count()
 
-    active_week_qs = Download.objects.filter(
-        material__topic__mentor=mentor,
-        downloaded_at__gte=week_ago
-    )
-    if test_ids:
-        active_week_qs = active_week_qs.exclude(student__telegram_id__in=test_ids)
-    active_week = active_week_qs.values('student').distinct().count()
-
-    from django.db.models import Count
-    popular = Material.objects.filter(
-        topic__mentor=mentor
-    ).annotate(
-        download_count=Count('downloads')
-    ).order_by('-download_count')[:3]
+    from django.db.models import Sum
+    popular = DownloadDaily.objects.filter(
+        material__topic__mentor=mentor
+    ).values('material_id', 'material__title').annotate(
+        download_count=Sum('downloads')
+    ).order_by('-download_count', 'material_id')[:3]
 
-    popular_list = [(m.title, m.download_count) for m in popular]
+    popular_list = [(row['material__title'], row['download_count']) for row in popular]
 
     return {
         'students': students_count,
@@ -498,6 +570,124 @@ def get_mentor_stats(mentor):
     }
 
 
+# ==================== SEARCH ====================
+
+@sync_to_async
+def search_mentor_items(mentor, query: str, limit: int = 10) -> list:
+    """Materials, quizzes and students of the mentor matching the query, best first"""
+    return search_index.search(mentor.id, query, limit)
+
+
+# ==================== BROADCASTS ====================
+
+def _broadcast_recipients(mentor):
+    return Student.objects.filter(mentor=mentor, bot_blocked_at__isnull=True)
+
+
+@sync_to_async
+def count_broadcast_recipients(mentor) -> int:
+    return _broadcast_recipients(mentor).count()
+
+
+@sync_to_async
+def create_broadcast(mentor, texts: dict, kind: str = 'message', report_lang: str = 'ru',
+                     report_chat_id: int = None, report_message_id: int = None):
+    """
+    Persist a broadcast job with one pending delivery per reachable student.
+    texts: message rendered per language. Returns None if there are no recipients.
+    report_chat_id/report_message_id: message in the mentor's chat the worker
+    edits with progress. It is stored with the job, since a worker polling for
+    jobs (sharded workers) can start it as soon as it is committed.
+    """
+    recipients = list(_broadcast_recipients(mentor).values_list('id', 'telegram_id', 'language'))
+    if not recipients:
+        return None
+
+    with transaction.atomic():
+        broadcast = Broadcast.objects.create(
+            mentor=mentor, kind=kind, texts=texts, total=len(recipients), report_lang=report_lang,
+            report_chat_id=report_chat_id, report_message_id=report_message_id
+        )
+        BroadcastDelivery.objects.bulk_create([
+            BroadcastDelivery(broadcast=broadcast, student_id=student_id, telegram_id=telegram_id, language=language)
+            for student_id, telegram_id, language in recipients
+        ], batch_size=500)
+    return broadcast
+
+
+@sync_to_async
+def get_broadcast(broadcast_id: int):
+    return Broadcast.objects.filter(pk=broadcast_id).first()
+
+
+@sync_to_async
+def get_unfinished_broadcast_ids() -> list:
+    return list(Broadcast.objects.exclude(status='done').order_by('id').values_list('id', flat=True))
+
+
+@sync_to_async
+def get_pending_deliveries(broadcast_id: int, limit: int) -> list:
+    """[(delivery_id, student_id, telegram_id, language)] still to be sent"""
+    return list(
+        BroadcastDelivery.objects.filter(broadcast_id=broadcast_id, status='pending')
+        .order_by('id')
+        .values_list('id', 'student_id', 'telegram_id', 'language')[:limit]
+    )
+
+
+@sync_to_async
+def record_broadcast_results(broadcast_id: int, results: list) -> tuple:
+    """
+    Store the outcome of a batch of deliveries in one transaction.
+    results: [(delivery_id, student_id, status, error)] with status sent/failed/blocked.
+    Students with status blocked are marked so future broadcasts skip them.
+    Returns the broadcast's (sent, failed, blocked) totals.
+    """
+    from django.db.models import F
+
+    now = timezone.now()
+    by_status = {'sent': [], 'failed': [], 'blocked': []}
+    for delivery_id, student_id, status, error in results:
+        by_status[status].append((delivery_id, student_id, error))
+
+    with transaction.atomic():
+        if by_status['sent']:
+            BroadcastDelivery.objects.filter(
+                id__in=[delivery_id for delivery_id, _, _ in by_status['sent']]
+            ).update(status='sent', sent_at=now)
+        failed = [
+            BroadcastDelivery(id=delivery_id, status=status, error=error[:200])
+            for status in ('failed', 'blocked')
+            for delivery_id, _, error in by_status[status]
+        ]
+        if failed:
+            BroadcastDelivery.objects.bulk_update(failed, ['status', 'error'])
+        if by_status['blocked']:
+            Student.objects.filter(
+                id__in=[student_id for _, student_id, _ in by_status['blocked']]
+            ).update(bot_blocked_at=now)
+
+        Broadcast.objects.filter(pk=broadcast_id).update(
+            status='running',
+            sent=F('sent') + len(by_status['sent']),
+            failed=F('failed') + len(by_status['failed']),
+            blocked=F('blocked') + len(by_status['blocked']),
+        )
+    return Broadcast.objects.filter(pk=broadcast_id).values_list('sent', 'failed', 'blocked').first()
+
+
+@sync_to_async
+def finish_broadcast(broadcast_id: int):
+    Broadcast.objects.filter(pk=broadcast_id).update(status='done', finished_at=timezone.now())
+    return Broadcast.objects.filter(pk=broadcast_id).first()
+
+
+@sync_to_async
+def set_student_bot_blocked(telegram_id: int, blocked: bool):
+    """The student blocked (or unblocked) the bot"""
+    Student.objects.filter(telegram_id=telegram_id).update(bot_blocked_at=timezone.now() if blocked else None)
+
+
 # ==================== QUIZZES ====================
 
 @sync_to_async
@@ -505,6 +695,74 @@ def create_quiz(mentor, title, topic=None):
     return Quiz.objects.create(mentor=mentor, title=title, topic=topic)
 
 
+def _publish_quiz(mentor, title: str, questions: list, archive_existing: bool = False, **quiz_fields):
+    """
+    Create a quiz with all its questions in one transaction (nothing is left
+    half-created on failure). questions are parsed dicts from parse_quiz_file.
+    archive_existing archives the mentor's quizzes with the same title first.
+    """
+    with transaction.atomic():
+        if archive_existing:
+            Quiz.objects.filter(mentor=mentor, title__iexact=title).update(is_active=False)
+        quiz = Quiz.objects.create(mentor=mentor, title=title, **quiz_fields)
+        # Questions already in the bank (re-uploads, copies) are reused, not duplicated
+        contents = QuestionContent.get_or_create_many([
+            {
+                "question_text": q["text"],
+                "option_a": q["option_a"],
+                "option_b": q["option_b"],
+                "option_c": q["option_c"],
+                "option_d": q["option_d"],
+                "correct_answer": q["correct"],
+            }
+            for q in questions
+        ])
+        QuizQuestion.objects.bulk_create([
+            QuizQuestion(quiz=quiz, content=content, order=i, time_bonus=q.get("time_bonus", 0))
+            for i, (q, content) in enumerate(zip(questions, contents), 1)
+        ], batch_size=500)
+        QuizStats.objects.create(quiz=quiz, question_count=len(questions))
+    return quiz
+
+
+publish_quiz = sync_to_async(_publish_quiz)
+
+
+@sync_to_async
+def copy_quiz(quiz_id: int, title: str):
+    """
+    Copy a quiz as a new practice quiz. Questions are shared through the
+    question bank, so this is a single INSERT ... SELECT on the link table.
+    """
+    from django.db import connection
+
+    try:
+        source = Quiz.objects.get(id=quiz_id)
+    except Quiz.DoesNotExist:
+        return None
+
+    table = connection.ops.quote_name(QuizQuestion._meta.db_table)
+    order = connection.ops.quote_name('order')
+    with transaction.atomic():
+        quiz = Quiz.objects.create(
+            mentor_id=source.mentor_id,
+            title=title,
+            topic=source.topic,
+            quiz_type='practice',
+            max_attempts=999,
+            is_active=True
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (quiz_id, content_id, {order}, time_bonus)"
+                f" SELECT %s, content_id, {order}, time_bonus FROM {table} WHERE quiz_id = %s",
+                [quiz.id, source.id]
+            )
+            count = cursor.rowcount
+        QuizStats.objects.create(quiz=quiz, question_count=count)
+    return quiz
+
+
 @sync_to_async
 def get_quizzes_by_mentor(mentor, include_inactive: bool = False):
     qs = Quiz.objects.filter(mentor=mentor)
@@ -513,40 +771,56 @@ def get_quizzes_by_mentor(mentor, include_inactive: bool = False):
     return list(qs)
 
 
+@sync_to_async
+def get_quizzes_page(mentor, is_active: bool, page: int, per_page: int, cursor: str = None) -> Page:
+    """One page of a mentor's active or archived quizzes, newest first (see bot.utils.pagination)"""
+    return keyset_page(Quiz.objects.filter(mentor=mentor, is_active=is_active), page, per_page, cursor)
+
+
 @sync_to_async
 def get_active_quizzes_by_mentor(mentor):
     """Get active quizzes for students"""
     return list(Quiz.objects.filter(mentor=mentor, is_active=True))
 
 
+def _student_quizzes(mentor, list_type: str):
+    """
+    Active quizzes of a student list, same rules as is_exam_mode / is_practice_mode:
+    'ranked' = ranked before deadline, 'practice' = practice OR expired ranked.
+    """
+    from django.db.models import Q
+    now = timezone.now()
+    quizzes = Quiz.objects.filter(mentor=mentor, is_active=True)
+    if list_type == 'ranked':
+        return quizzes.filter(quiz_type='ranked', available_until__gt=now)
+    return quizzes.filter(Q(quiz_type='practice') | Q(quiz_type='ranked', available_until__lte=now))
+
+
 @sync_to_async
 def get_ranked_quizzes_by_mentor(mentor):
     """Get active ranked quizzes (exam mode) for students"""
-    from django.utils import timezone
-    now = timezone.now()
-    return list(Quiz.objects.filter(
-        mentor=mentor,
-        is_active=True,
-        quiz_type='ranked',
-        available_until__gt=now
-    ))
+    return list(_student_quizzes(mentor, 'ranked'))
 
 
 @sync_to_async
 def get_practice_quizzes_by_mentor(mentor):
     """Get practice quizzes + expired ranked quizzes (review mode) for students"""
-    from django.utils import timezone
-    now = timezone.now()
-    from django.db.models import Q
+    return list(_student_quizzes(mentor, 'practice'))
 
-    # Practice quizzes OR expired ranked quizzes
-    return list(Quiz.objects.filter(
-        mentor=mentor,
-        is_active=True
-    ).filter(
-        Q(quiz_type='practice') |
-        Q(quiz_type='ranked', available_until__lte=now)
-    ))
+
+@sync_to_async
+def get_student_quiz_page(mentor, list_type: str, page: int, per_page: int):
+    """
+    One page of a student quiz list ('ranked' or 'practice').
+    Returns (quizzes, total_count, page) - page is clamped to the last page.
+    """
+    quizzes = _student_quizzes(mentor, list_type)
+    total = quizzes.count()
+    if not total:
+        return [], 0, 0
+    page = max(0, min(page, (total - 1) // per_page))
+    start = page * per_page
+    return list(quizzes[start:start + per_page]), total, page
 
 
 @sync_to_async
@@ -560,10 +834,23 @@ def get_quiz_by_id(quiz_id: int):
 @sync_to_async
 def delete_quiz(quiz_id: int) -> bool:
     try:
-        Quiz.objects.get(id=quiz_id).delete()
-        return True
+        quiz = Quiz.objects.get(id=quiz_id)
     except Quiz.DoesNotExist:
         return False
+    affected_student_ids = list(
+        QuizAttempt.objects.filter(quiz=quiz, finished_at__isnull=False)
+        .values_list('student_id', flat=True)
+        .distinct()
+    )
+    with transaction.atomic():
+        content_ids = list(QuizQuestion.objects.filter(quiz=quiz).values_list('content_id', flat=True))
+        quiz.delete()
+        QuestionContent.delete_unused(content_ids)
+    if affected_student_ids:
+        StudentStats.rebuild(affected_student_ids)
+    if quiz.quiz_type == 'ranked':
+        leaderboard_index.invalidate_mentor(quiz.mentor_id)
+    return True
 
 
 @sync_to_async
@@ -585,17 +872,18 @@ def quiz_title_exists(mentor, title: str) -> bool:
 
 @sync_to_async
 def create_quiz_question(quiz, question_text, option_a, option_b, option_c, option_d, correct_answer, order, time_bonus: int = 0):
-    return QuizQuestion.objects.create(
-        quiz=quiz,
-        question_text=question_text,
-        option_a=option_a,
-        option_b=option_b,
-        option_c=option_c,
-        option_d=option_d,
-        correct_answer=correct_answer,
-        order=order,
-        time_bonus=time_bonus
-    )
+    with transaction.atomic():
+        content = QuestionContent.get_or_create_many([{
+            "question_text": question_text,
+            "option_a": option_a,
+            "option_b": option_b,
+            "option_c": option_c,
+            "option_d": option_d,
+            "correct_answer": correct_answer,
+        }])[0]
+        question = QuizQuestion.objects.create(quiz=quiz, content=content, order=order, time_bonus=time_bonus)
+        QuizStats.add_questions(quiz.id, 1)
+    return question
 
 
 @sync_to_async
@@ -613,14 +901,48 @@ def get_question_by_id(question_id: int):
 
 @sync_to_async
 def delete_quiz_question(question_id: int) -> bool:
-    deleted, _ = QuizQuestion.objects.filter(id=question_id).delete()
+    row = QuizQuestion.objects.filter(id=question_id).values_list('quiz_id', 'content_id').first()
+    if row is None:
+        return False
+    quiz_id, content_id = row
+    with transaction.atomic():
+        deleted, _ = QuizQuestion.objects.filter(id=question_id).delete()
+        if deleted:
+            QuizStats.add_questions(quiz_id, -1)
+            QuestionContent.delete_unused([content_id])
     return deleted > 0
 
 
 @sync_to_async
 def update_quiz_question(question_id: int, **fields) -> bool:
-    updated = QuizQuestion.objects.filter(id=question_id).update(**fields)
-    return updated > 0
+    """Update question fields. Content edits link the question to another bank row (copy-on-write)."""
+    content_fields = {f: v for f, v in fields.items() if f in CONTENT_FIELDS}
+    link_fields = {f: v for f, v in fields.items() if f not in CONTENT_FIELDS}
+    try:
+        question = QuizQuestion.objects.get(id=question_id)
+    except QuizQuestion.DoesNotExist:
+        return False
+
+    old_content_id = question.content_id
+    with transaction.atomic():
+        if link_fields:
+            QuizQuestion.objects.filter(id=question_id).update(**link_fields)
+        if content_fields and question.set_content(**content_fields):
+            QuizStats.touch(question.quiz_id)
+            QuestionContent.delete_unused([old_content_id])
+    return True
+
+
+@sync_to_async
+def get_question_analytics(content_id: int):
+    """Item analytics of a bank question (None until computed)"""
+    return QuestionAnalytics.objects.filter(content_id=content_id).first()
+
+
+# Runs outside the shared sync thread: NumPy work must not block other DB calls
+@sync_to_async(thread_sensitive=False)
+def refresh_stale_question_analytics(limit: int = 20) -> int:
+    return quiz_analytics.refresh_stale_analytics(limit)
 
 
 @sync_to_async
@@ -638,38 +960,119 @@ def create_quiz_attempt(student, quiz):
 
 @sync_to_async
 def finish_quiz_attempt(attempt_id: int, score: int):
+    """
+    Commit the finished attempt and return it right away.
+    Streak and season rating are updated afterwards by process_finished_attempt
+    (run by the post-quiz worker, see bot/workers/post_quiz.py).
+    """
     try:
-        attempt = QuizAttempt.objects.get(id=attempt_id)
-        attempt.score = score
-        attempt.finished_at = timezone.now()
-        attempt.save()
-
-        # Update student's learning streak
-        student = attempt.student
-        from datetime import timedelta
-        today = timezone.localdate()  # Use timezone-aware date
-
-        # If this is the first quiz ever
-        if student.last_quiz_date is None:
-            student.current_streak = 1
-            student.longest_streak = 1
-            student.last_quiz_date = today
-            student.save()
-        # If already completed a quiz today, streak doesn't change
-        elif student.last_quiz_date == today:
-            pass
-        # If completed yesterday, increment streak
+        attempt = QuizAttempt.objects.select_related('quiz').get(id=attempt_id)
+    except QuizAttempt.DoesNotExist:
+        return None
+
+    was_finished = attempt.finished_at is not None
+    attempt.score = score
+    attempt.finished_at = timezone.now()
+    attempt.processed_at = None
+    with transaction.atomic():
+        attempts = QuizAttempt.objects.filter(student_id=attempt.student_id, quiz_id=attempt.quiz_id)
+        _lock_attempts(attempts)
+        # Read under the lock, or a concurrent finish could apply its change to QuizStats twice
+        previous_first = attempts.filter(is_first_attempt=True).values_list('id', 'score').first()
+        attempt.save(update_fields=['score', 'finished_at', 'processed_at'])
+        _update_first_attempt_flag(attempt.student_id, attempt.quiz_id, previous_first)
+        if was_finished:
+            StudentStats.rebuild([attempt.student_id])
         else:
-            yesterday = today - timedelta(days=1)
-            if student.last_quiz_date == yesterday:
-                student.current_streak += 1
-                if student.current_streak > student.longest_streak:
-                    student.longest_streak = student.current_streak
-            else:
-                # Streak broken, reset to 1
-                student.current_streak = 1
-            student.last_quiz_date = today
-            student.save()
+            StudentStats.record_finished_attempt(
+                attempt.student_id, score, attempt.total,
+                new_quiz_type=attempt.quiz.quiz_type if previous_first is None else None
+            )
+    return attempt
+
+
+def _lock_attempts(attempts):
+    """
+    Lock a student's attempts of a quiz until the transaction ends, before any
+    of them is written: two finishes at the same time would otherwise both
+    clear and set is_first_attempt (one_first_attempt_per_student_quiz).
+    """
+    list(attempts.select_for_update().order_by('id').values_list('id', flat=True))
+
+
+def _update_first_attempt_flag(student_id: int, quiz_id: int, previous_first=None):
+    """
+    Flag the student's earliest finished attempt of the quiz as first attempt
+    and apply the change to QuizStats.
+    Handles the flip case where an earlier-started attempt finishes later.
+    previous_first is the (id, score) of the flagged attempt before this change.
+    Call it with the attempts locked (_lock_attempts).
+    """
+    attempts = QuizAttempt.objects.filter(student_id=student_id, quiz_id=quiz_id)
+    first = (
+        attempts.filter(finished_at__isnull=False)
+        .order_by('started_at', 'id')
+        .values_list('id', 'score')
+        .first()
+    )
+    first_id = first[0] if first else None
+    # Clear first, then set (one_first_attempt_per_student_quiz constraint)
+    attempts.filter(is_first_attempt=True).exclude(id=first_id).update(is_first_attempt=False)
+    attempts.filter(id=first_id, is_first_attempt=False).update(is_first_attempt=True)
+
+    if first != previous_first:
+        QuizStats.record_first_attempt_change(
+            quiz_id,
+            removed_score=previous_first[1] if previous_first else None,
+            added_score=first[1] if first else None
+        )
+
+
+def _apply_streak(student, quiz_date):
+    """Update learning streak for a quiz finished on quiz_date (local date). Returns True if changed."""
+    # If this is the first quiz ever
+    if student.last_quiz_date is None:
+        student.current_streak = 1
+        student.longest_streak = max(student.longest_streak, 1)
+    # Same day or an older attempt processed late: streak doesn't change
+    elif quiz_date <= student.last_quiz_date:
+        return False
+    # If completed the day after the last quiz, increment streak
+    elif quiz_date - timedelta(days=1) == student.last_quiz_date:
+        student.current_streak += 1
+        if student.current_streak > student.longest_streak:
+            student.longest_streak = student.current_streak
+    else:
+        # Streak broken, reset to 1
+        student.current_streak = 1
+
+    student.last_quiz_date = quiz_date
+    return True
+
+
+@sync_to_async
+def process_finished_attempt(attempt_id: int) -> bool:
+    """
+    Update streak, season rating and leaderboard index for a finished attempt.
+    Idempotent: attempts already processed are skipped, so it is safe to run
+    more than once for the same attempt.
+    Returns True if the attempt was processed by this call.
+    """
+    season = None
+    with transaction.atomic():
+        attempt = (
+            QuizAttempt.objects.select_for_update()
+            .select_related('quiz')
+            .filter(id=attempt_id)
+            .first()
+        )
+        if not attempt or attempt.finished_at is None or attempt.processed_at is not None:
+            return False
+
+        # Update student's learning streak (by the local date the quiz was finished)
+        student = Student.objects.select_for_update().get(id=attempt.student_id)
+        if _apply_streak(student, timezone.localdate(attempt.finished_at)):
+            student.save(update_fields=['current_streak', 'longest_streak', 'last_quiz_date', 'last_active'])
 
         # Update season rating (only for ranked quizzes)
         if attempt.quiz.quiz_type == 'ranked':
@@ -680,9 +1083,35 @@ def finish_quiz_attempt(attempt_id: int, score: int):
             rating = SeasonRating.get_or_create_for_student(student, season)
             rating.recalculate()
 
-        return attempt
-    except QuizAttempt.DoesNotExist:
-        return None
+        attempt.processed_at = timezone.now()
+        attempt.save(update_fields=['processed_at'])
+
+    if season is not None:
+        leaderboard_index.update_student(season.mentor_id, student.id, season.id)
+    return True
+
+
+@sync_to_async
+def get_unprocessed_attempt_ids(limit: int = 500, finished_before=None) -> list:
+    """Finished attempts still waiting for post-quiz processing, oldest first"""
+    attempts = QuizAttempt.objects.filter(finished_at__isnull=False, processed_at__isnull=True)
+    if finished_before is not None:
+        attempts = attempts.filter(finished_at__lt=finished_before)
+    return list(attempts.order_by('finished_at').values_list('id', flat=True)[:limit])
+
+
+@sync_to_async
+def get_post_quiz_backlog() -> tuple[int, float]:
+    """Returns (unprocessed attempts count, age in seconds of the oldest one)"""
+    from django.db.models import Count, Min
+
+    result = QuizAttempt.objects.filter(
+        finished_at__isnull=False,
+        processed_at__isnull=True
+    ).aggregate(count=Count('id'), oldest=Min('finished_at'))
+    if not result['oldest']:
+        return 0, 0.0
+    return result['count'], (timezone.now() - result['oldest']).total_seconds()
 
 
 @sync_to_async
@@ -704,6 +1133,32 @@ def get_student_attempt(student, quiz):
         return None
 
 
+@sync_to_async
+def get_student_attempts_summary(student, quiz_ids) -> dict:
+    """
+    Latest and best finished attempt of a student for each quiz, in one query.
+    Returns {quiz_id: {'latest': QuizAttempt, 'best': QuizAttempt}} (quizzes without finished attempts are absent).
+    """
+    if not student or not quiz_ids:
+        return {}
+
+    summary = {}
+    attempts = QuizAttempt.objects.filter(
+        student=student,
+        quiz_id__in=quiz_ids,
+        finished_at__isnull=False
+    ).order_by('-started_at', '-id')
+    for attempt in attempts:
+        entry = summary.get(attempt.quiz_id)
+        if entry is None:
+            # Ordered newest first: the first one seen is the latest
+            summary[attempt.quiz_id] = {'latest': attempt, 'best': attempt}
+        elif attempt.score >= entry['best'].score:
+            # Ties go to the earlier attempt
+            entry['best'] = attempt
+    return summary
+
+
 @sync_to_async
 def get_student_first_attempt(student, quiz):
     """Get student's first attempt for a quiz (used for statistics)"""
@@ -719,87 +1174,42 @@ def has_student_attempted(student, quiz) -> bool:
     return QuizAttempt.objects.filter(student=student, quiz=quiz, finished_at__isnull=False).exists()
 
 
-@sync_to_async
-def get_quiz_attempts(quiz):
-    """Get all attempts for export (includes all attempts, not just first)"""
-    return list(QuizAttempt.objects.filter(
-        quiz=quiz,
-        finished_at__isnull=False
-    ).select_related('student').order_by('finished_at'))
+@sync_to_async(thread_sensitive=False)
+def write_quiz_results_export(path: str, mentor_id: int, quiz_ids=None, is_active: bool = None,
+                              season_id: int = None) -> int:
+    """
+    Stream finished attempts (all attempts, not just first) of the mentor's quizzes
+    to a gzip CSV file. Returns the number of rows, 0 if there was nothing to export.
+    """
+    from backend.quizzes import exports as quiz_exports
+
+    season = None
+    if season_id is not None:
+        season = Season.objects.filter(pk=season_id, mentor_id=mentor_id).first()
+        if season is None:
+            return 0
+    queryset = quiz_exports.results_queryset(mentor_id, quiz_ids=quiz_ids, is_active=is_active, season=season)
+    return quiz_exports.write_results_csv(path, queryset)
 
 
 @sync_to_async
 def get_quiz_average_score(quiz):
     """Get average score from first attempts only"""
-    from django.db.models import Avg, Min, Q
-
-    # Get first attempt time for each student
-    first_attempts = QuizAttempt.objects.filter(
-        quiz=quiz,
-        finished_at__isnull=False
-    ).values('student_id').annotate(
-        first_started=Min('started_at')
-    )
-
-    if not first_attempts:
-        return 0
-
-    # Build OR condition for all (student_id, started_at) pairs
-    conditions = Q()
-    for fa in first_attempts:
-        conditions |= Q(student_id=fa['student_id'], started_at=fa['first_started'])
-
-    # Single query to get all first attempts
-    result = QuizAttempt.objects.filter(
-        quiz=quiz,
-        finished_at__isnull=False
-    ).filter(conditions).aggregate(avg_score=Avg('score'))
-
-    return result['avg_score'] or 0
+    stats = QuizStats.objects.filter(quiz_id=quiz.id).first()
+    return stats.avg_score if stats else 0
 
 
 @sync_to_async
 def get_quiz_stats(quiz):
     """Get quiz statistics based on first attempts only"""
-    from django.db.models import Avg, Count, Min, Q
-
-    # Get first attempt time for each student
-    first_attempts = QuizAttempt.objects.filter(
-        quiz=quiz,
-        finished_at__isnull=False
-    ).values('student_id').annotate(
-        first_started=Min('started_at')
-    )
-
-    # Calculate stats from first attempts only
-    if first_attempts:
-        # Build OR condition for all (student_id, started_at) pairs
-        conditions = Q()
-        for fa in first_attempts:
-            conditions |= Q(student_id=fa['student_id'], started_at=fa['first_started'])
-
-        # Single query to get stats from all first attempts
-        attempt_stats = QuizAttempt.objects.filter(
-            quiz=quiz,
-            finished_at__isnull=False
-        ).filter(conditions).aggregate(
-            attempts=Count('id'),
-            avg_score=Avg('score')
-        )
-        count = attempt_stats['attempts'] or 0
-        avg = attempt_stats['avg_score'] or 0
-    else:
-        count = 0
-        avg = 0
-
-    questions_count = QuizQuestion.objects.filter(quiz=quiz).aggregate(
-        questions=Count('id')
-    )['questions']
+    stats = QuizStats.objects.filter(quiz_id=quiz.id).first()
+    if not stats:
+        return {'attempts': 0, 'avg': 0, 'questions': 0}
 
     return {
-        'attempts': count,
-        'avg': round(avg, 1),
-        'questions': questions_count
+        'attempts': stats.first_attempts,
+        'avg': round(stats.avg_score, 1),
+        'questions': stats.question_count
     }
 
 
@@ -809,54 +1219,15 @@ def get_quiz_stats_by_ids(quiz_ids):
     if not quiz_ids:
         return {}
 
-    from django.db.models import Avg, Count, Min, Q
-
-    # Get first attempts for each student in each quiz
-    first_attempts_data = QuizAttempt.objects.filter(
-        quiz_id__in=quiz_ids,
-        finished_at__isnull=False
-    ).values('quiz_id', 'student_id').annotate(
-        first_started=Min('started_at')
-    )
-
-    # Build OR condition for all (quiz_id, student_id, started_at) tuples
-    if first_attempts_data:
-        conditions = Q()
-        for fa in first_attempts_data:
-            conditions |= Q(
-                quiz_id=fa['quiz_id'],
-                student_id=fa['student_id'],
-                started_at=fa['first_started']
-            )
-
-        # Single query to get stats from all first attempts
-        attempt_rows = QuizAttempt.objects.filter(
-            quiz_id__in=quiz_ids,
-            finished_at__isnull=False
-        ).filter(conditions).values('quiz_id').annotate(
-            attempts=Count('id'),
-            avg_score=Avg('score')
-        )
-    else:
-        attempt_rows = []
-
-    question_rows = QuizQuestion.objects.filter(
-        quiz_id__in=quiz_ids
-    ).values('quiz_id').annotate(
-        questions=Count('id')
-    )
-
-    attempt_map = {row['quiz_id']: row for row in attempt_rows}
-    question_map = {row['quiz_id']: row['questions'] for row in question_rows}
+    stats_map = {s.quiz_id: s for s in QuizStats.objects.filter(quiz_id__in=quiz_ids)}
 
     stats = {}
     for quiz_id in quiz_ids:
-        attempt = attempt_map.get(quiz_id, {})
-        avg = attempt.get('avg_score') or 0
+        row = stats_map.get(quiz_id)
         stats[quiz_id] = {
-            'attempts': attempt.get('attempts', 0) or 0,
-            'avg': round(avg, 1),
-            'questions': question_map.get(quiz_id, 0) or 0
+            'attempts': row.first_attempts if row else 0,
+            'avg': round(row.avg_score, 1) if row else 0,
+            'questions': row.question_count if row else 0
         }
 
     return stats
@@ -865,29 +1236,10 @@ def get_quiz_stats_by_ids(quiz_ids):
 @sync_to_async
 def get_quiz_top_students(quiz, limit=5):
     """Get top students based on first attempts only"""
-    from django.db.models import Min, Q
-
-    # Get first attempts for each student
-    first_attempts_data = QuizAttempt.objects.filter(
-        quiz=quiz,
-        finished_at__isnull=False
-    ).values('student_id').annotate(
-        first_started=Min('started_at')
-    )
-
-    if not first_attempts_data:
-        return []
-
-    # Build OR condition for all (student_id, started_at) pairs
-    conditions = Q()
-    for fa in first_attempts_data:
-        conditions |= Q(student_id=fa['student_id'], started_at=fa['first_started'])
-
-    # Single query to get all first attempts
     first_attempts = QuizAttempt.objects.filter(
         quiz=quiz,
-        finished_at__isnull=False
-    ).filter(conditions).select_related('student').order_by('-score', 'finished_at')[:limit]
+        is_first_attempt=True
+    ).select_related('student').order_by('-score', 'finished_at')[:limit]
 
     return [(a.student, a.score, a.total) for a in first_attempts]
 
@@ -914,12 +1266,14 @@ def get_attempt_by_id(attempt_id: int):
 @sync_to_async
 def get_attempt_answers(attempt):
     """Get all answers for an attempt with questions for review"""
-    return list(QuizAnswer.objects.filter(attempt=attempt).select_related('question').order_by('question__order'))
+    return list(QuizAnswer.objects.filter(attempt=attempt).select_related('question__content').order_by('question__order'))
 
 
 @sync_to_async
 def delete_quiz_attempts(quiz):
     """Delete all attempts for a quiz (for restart)"""
+    from backend.students.ratings import rebuild_season_ratings
+
     # Collect affected students before deletion (for rating recalc)
     affected_student_ids = list(
         QuizAttempt.objects.filter(quiz=quiz)
@@ -927,13 +1281,17 @@ def delete_quiz_attempts(quiz):
         .distinct()
     )
 
-    deleted_count = QuizAttempt.objects.filter(quiz=quiz).delete()[0]
+    with transaction.atomic():
+        deleted_count = QuizAttempt.objects.filter(quiz=quiz).delete()[0]
+        QuizStats.reset_attempts(quiz.id)
+        if affected_student_ids:
+            StudentStats.rebuild(affected_student_ids)
 
-    # Recalculate season ratings for affected students
+    # Rebuild season ratings of affected students in every season of this mentor
+    # (the attempts may belong to an earlier season than the current one)
     if quiz.quiz_type == 'ranked' and affected_student_ids:
-        season = Season.get_or_create_current_season(quiz.mentor)
-        for rating in SeasonRating.objects.filter(season=season, student_id__in=affected_student_ids):
-            rating.recalculate()
+        rebuild_season_ratings(mentors=[quiz.mentor_id], students=affected_student_ids)
+        leaderboard_index.invalidate_mentor(quiz.mentor_id)
 
     return deleted_count
 
@@ -942,16 +1300,16 @@ def delete_quiz_attempts(quiz):
 def shuffle_quiz_questions(quiz):
     """Randomly shuffle the order of quiz questions"""
     import random
-    questions = list(QuizQuestion.objects.filter(quiz=quiz))
+    questions = list(QuizQuestion.objects.filter(quiz=quiz).select_related(None).only('id', 'order'))
     random.shuffle(questions)
     for i, question in enumerate(questions, 1):
         question.order = i
-        question.save()
+    QuizQuestion.objects.bulk_update(questions, ['order'], batch_size=500)
     return len(questions)
 
 
 @sync_to_async
-def get_global_leaderboard(mentor, limit=10):
+def get_global_leaderboard(mentor, limit=10, offset=0):
     """
     Get global leaderboard for students based on RANKED quiz performance only.
     Returns list of (student, rating_score, avg_percentage, total_quizzes) ordered by rating.
@@ -964,66 +1322,37 @@ def get_global_leaderboard(mentor, limit=10):
 
     Rating formula: avg_percentage × (1 + min(total_quizzes / 10, 1) × 0.5)
     This gives up to 50% bonus for activity (max at 10+ quizzes).
+
+    Reads the Redis leaderboard index, falls back to aggregating attempts.
     """
-    from django.db.models import F
-    from collections import defaultdict
+    rows, _ = _alltime_board(mentor.id, offset, limit)
+    return _with_students(rows)
 
-    # Get test student IDs to exclude
-    test_ids = get_test_student_ids()
 
-    # Get all valid ranked attempts in one query
-    valid_attempts = QuizAttempt.objects.filter(
-        quiz__mentor=mentor,
-        quiz__quiz_type='ranked',
-        finished_at__isnull=False,
-        quiz__available_until__isnull=False
-    ).filter(
-        started_at__lt=F('quiz__available_until')
-    ).select_related('student').values('student_id', 'quiz_id', 'score', 'total', 'finished_at')
-
-    # Group by student
-    student_stats = defaultdict(lambda: {'quizzes': set(), 'total_score': 0, 'total_questions': 0, 'earliest_finished': None})
-    for attempt in valid_attempts:
-        student_id = attempt['student_id']
-        student_stats[student_id]['quizzes'].add(attempt['quiz_id'])
-        student_stats[student_id]['total_score'] += attempt['score']
-        student_stats[student_id]['total_questions'] += attempt['total']
-        finished = attempt['finished_at']
-        if finished and (student_stats[student_id]['earliest_finished'] is None or finished < student_stats[student_id]['earliest_finished']):
-            student_stats[student_id]['earliest_finished'] = finished
-
-    if not student_stats:
-        return []
-
-    # Get student objects (exclude test accounts)
-    student_ids = list(student_stats.keys())
-    students_map = {s.id: s for s in Student.objects.filter(id__in=student_ids) if s.telegram_id not in test_ids}
-
-    # Calculate ratings
-    results = []
-    for student_id, stats in student_stats.items():
-        total_quizzes = len(stats['quizzes'])
-        total_score = stats['total_score']
-        total_questions = stats['total_questions']
-
-        if total_questions == 0:
-            continue
-
-        avg_percentage = round((total_score / total_questions) * 100.0, 1)
-        activity_bonus = min(total_quizzes / 10.0, 1.0) * 0.5
-        rating_score = round(avg_percentage * (1 + activity_bonus), 1)
-
-        student = students_map.get(student_id)
-        if student:
-            results.append((student, rating_score, avg_percentage, total_quizzes, stats['earliest_finished']))
-
-    # Sort by rating score descending, then by earliest finish time (earlier = higher rank)
-    # Use far-future date for None to sort students without finish time last
-    far_future = timezone.now().replace(year=9999)
-    results.sort(key=lambda x: (-x[1], -x[2], -x[3], x[4] or far_future, x[0].id))
-
-    # Return 4-tuples (strip earliest_finished used only for sorting)
-    return [(s, r, a, q) for s, r, a, q, _ in results[:limit]]
+def _alltime_board(mentor_id: int, offset: int, limit: int, count: bool = False) -> tuple[list, int | None]:
+    """
+    Rows (student_id, rating_score, avg_percentage, total_quizzes) from position offset,
+    and the board size when count is set.
+    """
+    try:
+        rows = leaderboard_index.alltime_page(mentor_id, offset, limit)
+        return rows, leaderboard_index.alltime_count(mentor_id) if count else None
+    except leaderboard_index.IndexUnavailable:
+        entries = leaderboard_index.alltime_entries(mentor_id)
+        return [entry[:4] for entry in entries[offset:offset + limit]], len(entries)
+
+
+def _with_students(rows, ndigits: int = None) -> list:
+    """Board rows with Student objects instead of ids (one query)"""
+    students_map = Student.objects.in_bulk([row[0] for row in rows])
+    if ndigits is not None:
+        rows = [(student_id, round(rating, ndigits), round(avg, ndigits), quizzes)
+                for student_id, rating, avg, quizzes in rows]
+    return [
+        (students_map[student_id], rating_score, avg_percentage, total_quizzes)
+        for student_id, rating_score, avg_percentage, total_quizzes in rows
+        if student_id in students_map
+    ]
 
 
 def is_exam_mode(quiz) -> bool:
@@ -1095,61 +1424,14 @@ def get_student_rank(student, mentor):
 
     Rating formula: avg_percentage × (1 + min(total_quizzes / 10, 1) × 0.5)
     """
-    from django.db.models import F
-    from collections import defaultdict
+    try:
+        return leaderboard_index.alltime_rank(mentor.id, student.id)
+    except leaderboard_index.IndexUnavailable:
+        pass
 
-    # Get all valid ranked attempts in one query
-    valid_attempts = QuizAttempt.objects.filter(
-        quiz__mentor=mentor,
-        quiz__quiz_type='ranked',
-        finished_at__isnull=False,
-        quiz__available_until__isnull=False
-    ).filter(
-        started_at__lt=F('quiz__available_until')
-    ).values('student_id', 'quiz_id', 'score', 'total', 'finished_at')
-
-    # Group by student
-    student_stats = defaultdict(lambda: {'quizzes': set(), 'total_score': 0, 'total_questions': 0, 'earliest_finished': None})
-    for attempt in valid_attempts:
-        student_id = attempt['student_id']
-        student_stats[student_id]['quizzes'].add(attempt['quiz_id'])
-        student_stats[student_id]['total_score'] += attempt['score']
-        student_stats[student_id]['total_questions'] += attempt['total']
-        finished = attempt['finished_at']
-        if finished and (student_stats[student_id]['earliest_finished'] is None or finished < student_stats[student_id]['earliest_finished']):
-            student_stats[student_id]['earliest_finished'] = finished
-
-    # Calculate ratings
-    student_data = []
-    for student_id, stats in student_stats.items():
-        total_quizzes = len(stats['quizzes'])
-        total_score = stats['total_score']
-        total_questions = stats['total_questions']
-
-        if total_questions == 0:
-            continue
-
-        avg_percentage = round((total_score / total_questions) * 100.0, 1)
-        activity_bonus = min(total_quizzes / 10.0, 1.0) * 0.5
-        rating_score = round(avg_percentage * (1 + activity_bonus), 1)
-
-        student_data.append({
-            'id': student_id,
-            'rating_score': rating_score,
-            'avg_percentage': avg_percentage,
-            'total_quizzes': total_quizzes,
-            'earliest_finished': stats['earliest_finished']
-        })
-
-    # Sort by rating score descending, then by earliest finish time (earlier = higher rank)
-    # Use far-future date for None to sort students without finish time last
-    far_future = timezone.now().replace(year=9999)
-    student_data.sort(key=lambda x: (-x['rating_score'], -x['avg_percentage'], -x['total_quizzes'], x['earliest_finished'] or far_future, x['id']))
-
-    # Find student's position
-    for rank, s_data in enumerate(student_data, 1):
-        if s_data['id'] == student.id:
-            return (rank, s_data['rating_score'], s_data['avg_percentage'], s_data['total_quizzes'])
+    for rank, entry in enumerate(leaderboard_index.alltime_entries(mentor.id), 1):
+        if entry[0] == student.id:
+            return (rank,) + tuple(entry[1:4])
 
     return None
 
@@ -1162,34 +1444,61 @@ def get_current_season(mentor):
 
 
 @sync_to_async
-def get_season_leaderboard(season, limit=100):
+def get_season_leaderboard(season, limit=100, offset=0):
     """
     Get leaderboard for a specific season.
     Returns list of (student, rating_score, avg_percentage, total_quizzes)
     Excludes test student accounts.
+    Closed seasons are read from their final standings.
     """
-    test_ids = get_test_student_ids()
+    rows, _ = _season_board(season, offset, limit)
+    return _with_students(rows, ndigits=1)
 
-    from django.db.models import F
 
-    ratings = SeasonRating.objects.filter(
-        season=season,
-        rating_score__gt=0
-    ).select_related('student').order_by(
-        '-rating_score',
-        F('earliest_attempt_at').asc(nulls_last=True),
-        'student_id'
-    )
+def _season_board(season, offset: int, limit: int, count: bool = False) -> tuple[list, int | None]:
+    """Same as _alltime_board for a season"""
+    if season.closed_at:
+        # Final ranks are 1..n, so a page is a rank range
+        standings = SeasonStanding.objects.filter(season=season)
+        rows = standings.filter(rank__gt=offset, rank__lte=offset + limit).order_by('rank').values_list(
+            'student_id', 'rating_score', 'avg_percentage', 'total_quizzes'
+        )
+        return list(rows), standings.count() if count else None
+
+    try:
+        rows = leaderboard_index.season_page(season.id, offset, limit)
+        return rows, leaderboard_index.season_count(season.id) if count else None
+    except leaderboard_index.IndexUnavailable:
+        entries = leaderboard_index.season_entries(season.id)
+        return [entry[:4] for entry in entries[offset:offset + limit]], len(entries)
+
 
-    # Filter out test accounts and apply limit
-    results = []
-    for r in ratings:
-        if r.student.telegram_id not in test_ids:
-            results.append((r.student, round(r.rating_score, 1), round(r.avg_percentage, 1), r.total_ranked_quizzes))
-            if len(results) >= limit:
-                break
+@sync_to_async
+def get_leaderboard_page(mentor, mode: str, page: int, per_page: int) -> tuple[Page, object]:
+    """
+    One page of the current season ('season') or all-time ('alltime') leaderboard.
+    Returns (Page of (student, rating_score, avg_percentage, total_quizzes), season or None).
+    Only the requested rows are read; the total is the board size (ZCARD / COUNT).
+    """
+    season = None
+    page = max(page, 0)
+    if mode == 'season':
+        season = Season.get_or_create_current_season(mentor)
+        rows, total = _season_board(season, page * per_page, per_page, count=True)
+    else:
+        rows, total = _alltime_board(mentor.id, page * per_page, per_page, count=True)
+
+    last_page = max(0, (total - 1) // per_page)
+    if total and page > last_page:
+        # Board shrank since the buttons were sent
+        page = last_page
+        if mode == 'season':
+            rows, _ = _season_board(season, page * per_page, per_page)
+        else:
+            rows, _ = _alltime_board(mentor.id, page * per_page, per_page)
 
-    return results
+    entries = _with_students(rows, ndigits=1 if mode == 'season' else None)
+    return Page(entries, total, page if total else 0, per_page), season
 
 
 @sync_to_async
@@ -1223,50 +1532,57 @@ def get_student_season_rank(student, season):
     Get student's rank in a specific season.
     Returns tuple: (rank, rating_score, avg_percentage, total_quizzes) or None
     """
+    if season.closed_at:
+        standing = SeasonStanding.objects.filter(season=season, student=student).first()
+        if not standing:
+            return None
+        return (standing.rank, standing.rating_score, standing.avg_percentage, standing.total_quizzes)
+
     try:
-        rating = SeasonRating.objects.get(season=season, student=student)
-        
-        # Count how many students have higher rating or same rating but earlier attempts
-        # Also use student_id as final tiebreaker for deterministic ranking
-        from django.db.models import Q
-        higher_q = Q(rating_score__gt=rating.rating_score)
-        if rating.earliest_attempt_at:
-            same_but_earlier_q = Q(
-                rating_score=rating.rating_score,
-                earliest_attempt_at__lt=rating.earliest_attempt_at
-            )
-            same_time_lower_id_q = Q(
-                rating_score=rating.rating_score,
-                earliest_attempt_at=rating.earliest_attempt_at,
-                student_id__lt=rating.student_id
-            )
-            higher_count = SeasonRating.objects.filter(
-                season=season
-            ).filter(higher_q | same_but_earlier_q | same_time_lower_id_q).count()
-        else:
-            # No earliest_attempt_at: count students with higher rating,
-            # or same rating but with an actual earliest_attempt_at (they rank higher),
-            # or same rating + also NULL earliest_attempt_at but lower student_id
-            same_with_attempt_q = Q(
-                rating_score=rating.rating_score,
-                earliest_attempt_at__isnull=False
-            )
-            same_null_lower_id_q = Q(
-                rating_score=rating.rating_score,
-                earliest_attempt_at__isnull=True,
-                student_id__lt=rating.student_id
-            )
-            higher_count = SeasonRating.objects.filter(
-                season=season
-            ).filter(higher_q | same_with_attempt_q | same_null_lower_id_q).count()
+        return leaderboard_index.season_rank(season.id, student.id)
+    except leaderboard_index.IndexUnavailable:
+        pass
 
-        rank = higher_count + 1
-        return (rank, round(rating.rating_score, 1), round(rating.avg_percentage, 1), rating.total_ranked_quizzes)
+    from django.db.models import Q
+
+    try:
+        rating = SeasonRating.objects.get(season=season, student=student)
     except SeasonRating.DoesNotExist:
         return None
+    if rating.rating_score <= 0 or is_test_student(student.telegram_id):
+        return None
+
+    # Count students ahead of this one in leaderboard order:
+    # rating, avg, quizzes (desc), earliest attempt (asc, NULL last), student_id (asc)
+    ahead_q = Q()
+    same = {}
+    for field in ('rating_score', 'avg_percentage', 'total_ranked_quizzes'):
+        value = getattr(rating, field)
+        ahead_q |= Q(**same, **{f'{field}__gt': value})
+        same[field] = value
+    if rating.earliest_attempt_at:
+        ahead_q |= Q(**same, earliest_attempt_at__lt=rating.earliest_attempt_at)
+        same['earliest_attempt_at'] = rating.earliest_attempt_at
+    else:
+        ahead_q |= Q(**same, earliest_attempt_at__isnull=False)
+        same['earliest_attempt_at__isnull'] = True
+    ahead_q |= Q(**same, student_id__lt=rating.student_id)
+
+    higher_count = SeasonRating.objects.filter(
+        season=season,
+        rating_score__gt=0
+    ).exclude(
+        student__telegram_id__in=get_test_student_ids()
+    ).filter(ahead_q).count()
+
+    rank = higher_count + 1
+    return (rank, round(rating.rating_score, 1), round(rating.avg_percentage, 1), rating.total_ranked_quizzes)
 
 
 @sync_to_async
 def get_all_seasons(mentor):
-    """Get all seasons for mentor, ordered by start date descending"""
+    """
+    Get all seasons for mentor, ordered by start date descending.
+    Closed seasons (closed_at set) have final standings, see get_season_leaderboard.
+    """
     return list(Season.objects.filter(mentor=mentor).order_by('-start_date'))
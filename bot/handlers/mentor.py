@@ -1,21 +1,28 @@
+import html
+
 from aiogram import Router, F, Bot
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from bot.keyboards import (
     mentor_menu, cancel_menu, materials_submenu,
-    topics_for_upload, topics_for_manage, files_for_manage,
-    topics_for_view
+    topics_for_upload, topics_for_manage, files_for_manage
 )
-from bot.texts import t
+from bot.keyboards.menus import ITEMS_PER_PAGE, page_nav_buttons, question_reply_keyboard
+from bot.texts import t, LANGUAGES
 from bot.db import (
     is_mentor, get_mentor_by_telegram_id,
-    get_topics_by_mentor, get_topic_by_id, create_topic, delete_topic,
+    get_topics_by_mentor, get_topics_page, get_topic_by_id, create_topic, delete_topic,
     get_materials_by_topic, get_material_by_id, add_material, delete_material,
-    get_unanswered_questions, get_materials_count_by_topics,
-    get_mentor_stats, get_user_language, get_students_by_mentor
+    get_unanswered_questions_page, get_materials_count_by_topics,
+    get_mentor_stats, get_user_language, get_students_page, count_students_by_mentor,
+    count_broadcast_recipients, create_broadcast, search_mentor_items
 )
+from backend.search.index import normalize_query, MIN_QUERY_LENGTH
+from bot.utils.pagination import parse_page_callback
+from bot.workers.broadcast import submit_broadcast
 
 router = Router()
 
@@ -147,28 +154,36 @@ async def manage_start(message: Message, state: FSMContext):
     await state.clear()
     lang = await get_user_language(message.from_user.id)
     mentor = await get_mentor_by_telegram_id(message.from_user.id)
-    topics = await get_topics_by_mentor(mentor)
+    keyboard = await build_topics_manage_keyboard(mentor, lang)
 
-    if not topics:
+    if keyboard is None:
         await message.answer(t("no_topics", lang))
         return
 
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_manage(topics, materials_count, lang, page=0)
     await message.answer(t("select_topic_manage", lang), reply_markup=keyboard)
 
 
+async def build_topics_manage_keyboard(mentor, lang: str, page: int = 0, cursor: str = None):
+    """Keyboard with one page of topics, None if the mentor has no topics"""
+    topics_page = await get_topics_page(mentor, page, ITEMS_PER_PAGE, cursor)
+    if not topics_page.total:
+        return None
+    materials_count = await get_materials_count_by_topics(topics_page.items)
+    return topics_for_manage(topics_page, materials_count, lang)
+
+
 @router.callback_query(F.data.startswith("managepage_"))
 async def manage_page(callback: CallbackQuery):
     if not await is_mentor(callback.from_user.id):
         return
     lang = await get_user_language(callback.from_user.id)
-    page = int(callback.data.replace("managepage_", ""))
+    _, page, cursor = parse_page_callback(callback.data, "managepage")
     mentor = await get_mentor_by_telegram_id(callback.from_user.id)
-    topics = await get_topics_by_mentor(mentor)
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_manage(topics, materials_count, lang, page=page)
-    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    keyboard = await build_topics_manage_keyboard(mentor, lang, page, cursor)
+    if keyboard is None:
+        await callback.message.edit_text(t("no_topics", lang))
+    else:
+        await callback.message.edit_reply_markup(reply_markup=keyboard)
     await callback.answer()
 
 
@@ -269,14 +284,12 @@ async def delete_topic_confirmed(callback: CallbackQuery):
     await callback.answer(t("topic_deleted", lang, name=topic_name))
 
     mentor = await get_mentor_by_telegram_id(callback.from_user.id)
-    topics = await get_topics_by_mentor(mentor)
+    keyboard = await build_topics_manage_keyboard(mentor, lang)
 
-    if not topics:
+    if keyboard is None:
         await callback.message.edit_text(t("no_topics_left", lang))
         return
 
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_manage(topics, materials_count, lang, page=0)
     await callback.message.edit_text(t("select_topic_manage", lang), reply_markup=keyboard)
 
 
@@ -286,14 +299,12 @@ async def back_to_manage(callback: CallbackQuery):
         return
     lang = await get_user_language(callback.from_user.id)
     mentor = await get_mentor_by_telegram_id(callback.from_user.id)
-    topics = await get_topics_by_mentor(mentor)
+    keyboard = await build_topics_manage_keyboard(mentor, lang)
 
-    if not topics:
+    if keyboard is None:
         await callback.message.edit_text(t("no_topics", lang))
         return
 
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_manage(topics, materials_count, lang, page=0)
     await callback.message.edit_text(t("select_topic_manage", lang), reply_markup=keyboard)
     await callback.answer()
 
@@ -341,20 +352,50 @@ async def view_questions(message: Message, state: FSMContext):
     lang = await get_user_language(message.from_user.id)
     
     mentor = await get_mentor_by_telegram_id(message.from_user.id)
-    questions = await get_unanswered_questions(mentor)
+    text, keyboard = await build_questions_inbox(mentor, lang)
 
-    if not questions:
+    if text is None:
         await message.answer(t("no_questions", lang))
         return
 
-    text = t("unanswered_questions", lang, count=len(questions))
-    for i, q in enumerate(questions[:10], 1):
-        text += f"{i}. {q.text[:100]}{'...' if len(q.text) > 100 else ''}\n\n"
+    await message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+
+
+QUESTIONS_PER_PAGE = 10
 
-    if len(questions) > 10:
-        text += t("and_more", lang, count=len(questions) - 10)
 
-    await message.answer(text)
+async def build_questions_inbox(mentor, lang: str, page: int = 0, cursor: str = None):
+    """Text and keyboard of one page of unanswered questions, (None, None) if there are none"""
+    questions_page = await get_unanswered_questions_page(mentor, page, QUESTIONS_PER_PAGE, cursor)
+    if not questions_page.total:
+        return None, None
+
+    text = t("unanswered_questions", lang, count=questions_page.total)
+    for i, q in enumerate(questions_page.items, start=questions_page.start + 1):
+        text += f"{i}. {html.escape(q.text[:100])}{'...' if len(q.text) > 100 else ''}\n\n"
+    text += t("tap_number_to_reply", lang)
+
+    keyboard = question_reply_keyboard(
+        questions_page.items, lang, start=questions_page.start + 1,
+        nav_buttons=page_nav_buttons(questions_page, "qinbox", lang)
+    )
+    return text, keyboard
+
+
+@router.callback_query(F.data.startswith("qinbox_"))
+async def questions_inbox_page(callback: CallbackQuery):
+    if not await is_mentor(callback.from_user.id):
+        return
+    lang = await get_user_language(callback.from_user.id)
+    _, page, cursor = parse_page_callback(callback.data, "qinbox")
+
+    mentor = await get_mentor_by_telegram_id(callback.from_user.id)
+    text, keyboard = await build_questions_inbox(mentor, lang, page, cursor)
+    if text is None:
+        await callback.message.edit_text(t("no_questions", lang))
+    else:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    await callback.answer()
 
 
 # ==================== MESSAGE STUDENTS ====================
@@ -372,14 +413,14 @@ async def message_students_start(message: Message, state: FSMContext):
     lang = await get_user_language(message.from_user.id)
 
     mentor = await get_mentor_by_telegram_id(message.from_user.id)
-    students = await get_students_by_mentor(mentor)
+    students_page = await get_students_page(mentor, 0, ITEMS_PER_PAGE)
 
-    if not students:
+    if not students_page.total:
         await message.answer(t("no_students", lang))
         return
 
     from bot.keyboards import students_for_message
-    keyboard = students_for_message(students, lang, page=0)
+    keyboard = students_for_message(students_page, lang)
     await message.answer(t("select_student", lang), reply_markup=keyboard)
 
 
@@ -388,13 +429,13 @@ async def message_students_page(callback: CallbackQuery):
     if not await is_mentor(callback.from_user.id):
         return
     lang = await get_user_language(callback.from_user.id)
-    page = int(callback.data.replace("msgpage_", ""))
+    _, page, cursor = parse_page_callback(callback.data, "msgpage")
 
     mentor = await get_mentor_by_telegram_id(callback.from_user.id)
-    students = await get_students_by_mentor(mentor)
+    students_page = await get_students_page(mentor, page, ITEMS_PER_PAGE, cursor)
 
     from bot.keyboards import students_for_message
-    keyboard = students_for_message(students, lang, page=page)
+    keyboard = students_for_message(students_page, lang)
     await callback.message.edit_reply_markup(reply_markup=keyboard)
     await callback.answer()
 
@@ -418,19 +459,19 @@ async def select_broadcast_to_all(callback: CallbackQuery, state: FSMContext):
     lang = await get_user_language(callback.from_user.id)
 
     mentor = await get_mentor_by_telegram_id(callback.from_user.id)
-    students = await get_students_by_mentor(mentor)
+    student_count = await count_students_by_mentor(mentor)
 
-    if not students:
+    if not student_count:
         await callback.answer(t("no_students", lang))
         return
 
     # Save to FSM that this is broadcast mode
     await state.set_state(MessageStates.waiting_broadcast)
-    await state.update_data(broadcast=True, student_count=len(students))
+    await state.update_data(broadcast=True, student_count=student_count)
 
     # Ask mentor to write broadcast message
     await callback.message.answer(
-        t("write_broadcast_message", lang, count=len(students)),
+        t("write_broadcast_message", lang, count=student_count),
         parse_mode="HTML",
         reply_markup=cancel_menu(lang)
     )
@@ -537,51 +578,90 @@ async def receive_broadcast_message(message: Message, state: FSMContext, bot: Bo
         await message.answer(t("cancelled", lang), reply_markup=mentor_menu(lang))
         return
 
-    # Get mentor's students
+    # Recipients and per-language texts are stored, sending runs in the background
     mentor = await get_mentor_by_telegram_id(message.from_user.id)
-    students = await get_students_by_mentor(mentor)
+    texts = {student_lang: t("mentor_message", student_lang, text=message.text) for student_lang in LANGUAGES}
+    await state.clear()
+    total = await count_broadcast_recipients(mentor)
+    if not total:
+        await message.answer(t("no_students", lang), reply_markup=mentor_menu(lang))
+        return
+
+    # The worker edits this message with progress and the final report. It is
+    # sent first so the job is stored with it (another worker may start the job).
+    status_msg = await message.answer(t("sending_broadcast", lang, sent=0, total=total))
+    broadcast = await create_broadcast(mentor, texts, kind='message', report_lang=lang,
+                                       report_chat_id=status_msg.chat.id, report_message_id=status_msg.message_id)
+    if broadcast is None:
+        await status_msg.edit_text(t("no_students", lang))
+    else:
+        submit_broadcast(broadcast.id)
+
+    await message.answer(t("back_to_menu", lang), reply_markup=mentor_menu(lang))
 
-    if not students:
+
+# ==================== SEARCH ====================
+
+class SearchStates(StatesGroup):
+    waiting_query = State()
+
+
+SEARCH_RESULT_CALLBACKS = {
+    'material': ("📄", "getfile_{}"),
+    'quiz': ("📝", "quizmanage_{}"),
+    'student': ("👤", "msgstudent_{}"),
+}
+
+
+@router.message(Command("search"))
+async def search_command(message: Message, command: CommandObject, state: FSMContext):
+    """/search <text> searches right away, /search alone asks for the text"""
+    if not await is_mentor(message.from_user.id):
+        return
+    lang = await get_user_language(message.from_user.id)
+
+    if command.args:
         await state.clear()
-        await message.answer(t("no_students", lang), reply_markup=mentor_menu(lang))
+        await show_search_results(message, command.args, lang)
         return
 
-    # Send message to all students
-    sent_count = 0
-    failed_count = 0
-
-    status_msg = await message.answer(t("sending_broadcast", lang, sent=0, total=len(students)))
-
-    for i, student in enumerate(students):
-        student_lang = await get_user_language(student.telegram_id)
-        try:
-            await bot.send_message(
-                student.telegram_id,
-                t("mentor_message", student_lang, text=message.text),
-                parse_mode="HTML"
-            )
-            sent_count += 1
-        except Exception as e:
-            print(f"[BROADCAST] Failed to send to student {student.telegram_id}: {e}")
-            failed_count += 1
-
-        # Update status every 5 students
-        if (i + 1) % 5 == 0 or i == len(students) - 1:
-            try:
-                await status_msg.edit_text(t("sending_broadcast", lang, sent=sent_count, total=len(students)))
-            except:
-                pass
+    await state.set_state(SearchStates.waiting_query)
+    await message.answer(t("search_prompt", lang), reply_markup=cancel_menu(lang))
 
-    await state.clear()
 
-    # Final report
-    if failed_count > 0:
-        await status_msg.edit_text(
-            t("broadcast_complete_partial", lang, sent=sent_count, failed=failed_count)
-        )
-    else:
-        await status_msg.edit_text(
-            t("broadcast_complete", lang, sent=sent_count)
-        )
+@router.message(SearchStates.waiting_query)
+async def receive_search_query(message: Message, state: FSMContext):
+    if not await is_mentor(message.from_user.id):
+        return
+    lang = await get_user_language(message.from_user.id)
 
+    await state.clear()
+    await show_search_results(message, message.text or "", lang)
     await message.answer(t("back_to_menu", lang), reply_markup=mentor_menu(lang))
+
+
+async def show_search_results(message: Message, query: str, lang: str):
+    if len(normalize_query(query)) < MIN_QUERY_LENGTH:
+        await message.answer(t("search_too_short", lang))
+        return
+
+    mentor = await get_mentor_by_telegram_id(message.from_user.id)
+    results = await search_mentor_items(mentor, query)
+    shown_query = html.escape(query.strip()[:50])
+
+    if not results:
+        await message.answer(t("search_no_results", lang, query=shown_query), parse_mode="HTML")
+        return
+
+    buttons = []
+    for result in results:
+        icon, callback_data = SEARCH_RESULT_CALLBACKS[result.kind]
+        buttons.append([InlineKeyboardButton(
+            text=f"{icon} {result.title[:60]}",
+            callback_data=callback_data.format(result.id)
+        )])
+    await message.answer(
+        t("search_results", lang, query=shown_query),
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons),
+        parse_mode="HTML"
+    )
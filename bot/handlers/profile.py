@@ -153,7 +153,7 @@ async def view_profile(message: Message, state: FSMContext):
     language = language_names.get(student.language, student.language)
 
     # Get quiz statistics
-    stats = await get_student_quiz_stats(message.from_user.id)
+    stats = await get_student_quiz_stats(student)
 
     # Format streak info
     current_streak = student.current_streak
@@ -1,5 +1,7 @@
+import html
+
 from aiogram import Router, F, Bot
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
@@ -8,8 +10,9 @@ from bot.texts import t
 from bot.db import (
     is_mentor, get_student_mentor, get_student_by_telegram_id, create_question,
     mark_question_answered, get_user_language, add_question_reply,
-    get_mentor_by_telegram_id
+    get_mentor_by_telegram_id, get_question_text
 )
+from bot.workers.question_digest import notify_mentor, send_question_digest
 
 router = Router()
 
@@ -72,25 +75,12 @@ async def receive_question(message: Message, state: FSMContext, bot: Bot):
     question_id = question.id
     print(f"[QUESTION] Created #{question_id} from student {student_telegram_id} (msg:{student_message_id}) to mentor {mentor.telegram_id}")
 
-    # Get mentor's language
-    mentor_lang = await get_user_language(mentor.telegram_id)
-
-    # CRITICAL: Store all data in callback_data for reply!
-    # Format: reply_{question_id}_{student_telegram_id}_{message_id}
-    # This allows sending reply as a thread to the original question
-    callback_data = f"reply_{question_id}_{student_telegram_id}_{student_message_id}"
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text=t("btn_reply", mentor_lang), callback_data=callback_data)]
-    ])
-
-    # Send question to mentor
-    await bot.send_message(
-        mentor.telegram_id,
-        t("anonymous_question", mentor_lang, text=message.text),
-        parse_mode="HTML",
-        reply_markup=keyboard
-    )
+    # Questions arriving close together go to the mentor as one digest message.
+    # Each question gets its own reply button:
+    # reply_{question_id}_{student_telegram_id}_{message_id}
+    # so the reply can be sent as a thread to the original question
+    if not notify_mentor(mentor.telegram_id, question):
+        await send_question_digest(bot, mentor.telegram_id, [question])
 
     await state.clear()
     await message.answer(t("question_sent", lang), reply_markup=student_menu(lang))
@@ -121,11 +111,13 @@ async def question_reply_start(callback: CallbackQuery, state: FSMContext):
 
     print(f"[QUESTION] Mentor {callback.from_user.id} starting reply to #{question_id}, student: {student_telegram_id}, msg_id: {student_message_id}")
 
-    # Extract question text from the message (no DB query needed)
-    message_text = callback.message.text or callback.message.caption or ""
-    question_text = message_text.split("\n\n", 1)[-1] if "\n\n" in message_text else message_text
+    # Digests and the inbox list several questions, so the text is read by id
+    question_text = await get_question_text(question_id)
+    if question_text is None:
+        message_text = callback.message.text or callback.message.caption or ""
+        question_text = message_text.split("\n\n", 1)[-1] if "\n\n" in message_text else message_text
 
-    # Save ALL data to FSM - NO database queries needed for reply!
+    # Save ALL data to FSM - no database queries needed when the reply is sent
     await state.set_state(QuestionStates.waiting_reply)
     await state.update_data(
         question_id=question_id,
@@ -136,7 +128,7 @@ async def question_reply_start(callback: CallbackQuery, state: FSMContext):
 
     # Ask mentor to write reply
     await callback.message.answer(
-        t("write_reply", lang, text=question_text),
+        t("write_reply", lang, text=html.escape(question_text)),
         parse_mode="HTML",
         reply_markup=cancel_menu(lang)
     )
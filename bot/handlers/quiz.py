@@ -1,21 +1,19 @@
 import asyncio
-import csv
 import html
-import io
 import random
 import time
 from aiogram import Router, F, Bot
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from asgiref.sync import sync_to_async
 
 QUESTION_TIMEOUT = 20  # seconds per question
 QUESTIONS_PER_PAGE = 5
 ANSWERS_PER_PAGE = 10  # answers per review page
 QUIZ_SESSION_TIMEOUT = 900  # 15 minutes - auto-reset quiz state
 LEADERBOARD_PER_PAGE = 10  # students per page in mentor leaderboard
+ANALYTICS_MIN_RESPONSES = 5  # responses needed before judging a question
 
 # Store active timers: {attempt_id: (timeout_task, countdown_task)}
 active_timers = {}
@@ -23,6 +21,7 @@ active_timers = {}
 session_timers = {}
 
 from bot.keyboards import mentor_menu, student_menu, cancel_menu
+from bot.keyboards.menus import page_nav_buttons, quiz_answer_keyboard
 
 
 def escape_html(text: str) -> str:
@@ -106,21 +105,26 @@ def build_review_text(answers, page: int, lang: str) -> str:
             review_text += t("quiz_review_wrong", lang, num=q.order, question=escape_html(q_text), answer=selected_text, correct=correct_text)
 
     return review_text, total_pages
-from bot.texts import t, get_season_name
+from bot.texts import t, LANGUAGES, get_season_name
 from bot.db import (
     is_mentor, get_mentor_by_telegram_id, get_student_by_telegram_id,
-    get_student_mentor, get_user_language, get_students_by_mentor,
-    create_quiz, get_quizzes_by_mentor, get_active_quizzes_by_mentor, get_quiz_by_id,
+    get_student_mentor, get_user_language,
+    create_quiz, get_quizzes_by_mentor, get_quiz_by_id,
+    get_student_quiz_page, get_student_attempts_summary, publish_quiz, copy_quiz,
     create_quiz_question, get_questions_by_quiz, get_question_by_id,
     create_quiz_attempt, finish_quiz_attempt, get_student_attempt,
-    get_quiz_attempts, get_quiz_average_score,
+    get_quiz_average_score,
     get_quiz_stats, get_quiz_stats_by_ids, get_quiz_top_students, save_quiz_answer,
     get_attempt_by_id, get_attempt_answers, set_quiz_active,
     delete_quiz_question, get_next_quiz_question_order, update_quiz_question,
-    archive_quizzes_by_title, quiz_title_exists,
-    get_global_leaderboard, get_student_rank
+    quiz_title_exists,
+    get_leaderboard_page, get_quizzes_page, get_student_rank, get_question_analytics,
+    create_broadcast
 )
-from bot.utils.quiz_parser import parse_quiz_file
+from bot.utils.pagination import parse_page_callback
+from bot.utils.quiz_drafts import save_quiz_draft, get_quiz_draft_questions, load_quiz_draft, delete_quiz_draft
+from bot.workers.post_quiz import enqueue_post_quiz
+from bot.workers.broadcast import submit_broadcast
 
 router = Router()
 
@@ -173,13 +177,41 @@ def build_questions_keyboard(questions, quiz_id: int, lang: str, page: int = 0)
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def build_quiz_preview_text(parsed: dict, title: str, lang: str) -> str:
-    questions = parsed.get("questions", [])
-    topic = parsed.get("topic")
-    count = len(questions)
+def build_question_analytics_text(analytics, correct: str, lang: str) -> str:
+    """Analytics block for the question detail screen ('' until computed)"""
+    if not analytics or not analytics.responses:
+        return ""
+    counts = analytics.option_counts or {}
+    text = t(
+        "quiz_question_analytics",
+        lang,
+        responses=analytics.responses,
+        p=round((analytics.p_value or 0) * 100),
+        disc=f"{analytics.discrimination:.2f}" if analytics.discrimination is not None else "-",
+        a=counts.get("A", 0),
+        b=counts.get("B", 0),
+        c=counts.get("C", 0),
+        d=counts.get("D", 0),
+        timeout=round((analytics.timeout_rate or 0) * 100)
+    )
+    if analytics.responses < ANALYTICS_MIN_RESPONSES or analytics.p_value is None:
+        return text
+
+    # A wrong option picked more often than the correct one usually means a bad key or wording
+    top_wrong = max((counts.get(o, 0) for o in "ABCD" if o != correct), default=0)
+    if (analytics.discrimination is not None and analytics.discrimination < 0) or top_wrong > counts.get(correct, 0):
+        text += "\n" + t("quiz_question_misleading", lang)
+    elif analytics.p_value >= 0.9:
+        text += "\n" + t("quiz_question_too_easy", lang)
+    elif analytics.p_value <= 0.3:
+        text += "\n" + t("quiz_question_too_hard", lang)
+    return text
+
+
+def build_quiz_preview_text(title: str, topic: str | None, count: int, first_question: dict | None, lang: str) -> str:
     preview = ""
-    if questions:
-        q = questions[0]
+    if first_question:
+        q = first_question
         preview = t(
             "quiz_preview_question",
             lang,
@@ -256,19 +288,20 @@ async def show_quiz_list(callback: CallbackQuery):
         return
 
     lang = await get_user_language(callback.from_user.id)
-    parts = callback.data.split("_")
-    list_type = parts[1]  # 'active' or 'archived'
-    page = int(parts[2])
+    # quizlist_{list_type}_{page}[_{cursor}]
+    parts, page, cursor = parse_page_callback(callback.data, "quizlist")
+    list_type = parts[0] if parts else "active"  # 'active' or 'archived'
 
     if list_type == "active":
-        await show_active_quizzes(callback.message, callback.from_user.id, lang, page, edit=True)
+        await show_active_quizzes(callback.message, callback.from_user.id, lang, page, edit=True, cursor=cursor)
     else:
-        await show_archived_quizzes(callback.message, callback.from_user.id, lang, page, edit=True)
+        await show_archived_quizzes(callback.message, callback.from_user.id, lang, page, edit=True, cursor=cursor)
 
     await callback.answer()
 
 
-async def show_active_quizzes(message, user_id: int, lang: str, page: int = 0, edit: bool = False):
+async def show_active_quizzes(message, user_id: int, lang: str, page: int = 0, edit: bool = False,
+                              cursor: str = None):
     """Show active quizzes with pagination (5 per page)"""
     QUIZZES_PER_PAGE = 5
 
@@ -283,10 +316,10 @@ async def show_active_quizzes(message, user_id: int, lang: str, page: int = 0, e
             await message.answer(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons))
         return
 
-    all_quizzes = await get_quizzes_by_mentor(mentor, include_inactive=False)
-    stats_map = await get_quiz_stats_by_ids([quiz.id for quiz in all_quizzes])
+    quiz_page = await get_quizzes_page(mentor, True, page, QUIZZES_PER_PAGE, cursor)
+    stats_map = await get_quiz_stats_by_ids([quiz.id for quiz in quiz_page.items])
 
-    if not all_quizzes:
+    if not quiz_page.total:
         text = t("active_quizzes_header", lang) + "\n\n" + t("no_active_quizzes", lang)
         buttons = [
             [InlineKeyboardButton(text=t("btn_archived_quizzes", lang), callback_data="quizlist_archived_0")],
@@ -298,20 +331,15 @@ async def show_active_quizzes(message, user_id: int, lang: str, page: int = 0, e
             await message.answer(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
         return
 
-    # Calculate pagination
-    total_pages = (len(all_quizzes) + QUIZZES_PER_PAGE - 1) // QUIZZES_PER_PAGE
-    start_idx = page * QUIZZES_PER_PAGE
-    end_idx = start_idx + QUIZZES_PER_PAGE
-    page_quizzes = all_quizzes[start_idx:end_idx]
-
     # Build text
     text = t("active_quizzes_header", lang) + "\n\n"
-    if total_pages > 1:
-        text += t("pagination_info", lang, page=page + 1, total=total_pages, count=len(all_quizzes)) + "\n\n"
+    if quiz_page.total_pages > 1:
+        text += t("pagination_info", lang, page=quiz_page.number + 1, total=quiz_page.total_pages,
+                  count=quiz_page.total) + "\n\n"
 
     # Build buttons
     buttons = []
-    for quiz in page_quizzes:
+    for quiz in quiz_page.items:
         stats = stats_map.get(quiz.id, {'questions': 0, 'attempts': 0, 'avg': 0})
 
         # Add badge based on quiz type
@@ -329,16 +357,11 @@ async def show_active_quizzes(message, user_id: int, lang: str, page: int = 0, e
         )])
 
     # Pagination buttons
-    if total_pages > 1:
-        nav = []
-        if page > 0:
-            nav.append(InlineKeyboardButton(text="◀️", callback_data=f"quizlist_active_{page - 1}"))
-        nav.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
-            nav.append(InlineKeyboardButton(text="▶️", callback_data=f"quizlist_active_{page + 1}"))
-        buttons.append(nav)
+    if quiz_page.total_pages > 1:
+        buttons.append(page_nav_buttons(quiz_page, "quizlist", lang, extra_data="active"))
 
     # Bottom buttons
+    buttons.append([InlineKeyboardButton(text=t("btn_export_all", lang), callback_data="quizexportlist_active")])
     buttons.append([InlineKeyboardButton(text=t("btn_archived_short", lang), callback_data="quizlist_archived_0")])
     buttons.append([InlineKeyboardButton(text=t("btn_upload_quiz", lang), callback_data="upload_quiz")])
 
@@ -348,7 +371,8 @@ async def show_active_quizzes(message, user_id: int, lang: str, page: int = 0, e
         await message.answer(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
 
 
-async def show_archived_quizzes(message, user_id: int, lang: str, page: int = 0, edit: bool = False):
+async def show_archived_quizzes(message, user_id: int, lang: str, page: int = 0, edit: bool = False,
+                                cursor: str = None):
     """Show archived quizzes with pagination (5 per page)"""
     QUIZZES_PER_PAGE = 5
 
@@ -363,11 +387,10 @@ async def show_archived_quizzes(message, user_id: int, lang: str, page: int = 0,
             await message.answer(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons))
         return
 
-    all_quizzes = await get_quizzes_by_mentor(mentor, include_inactive=True)
-    archived_quizzes = [q for q in all_quizzes if not q.is_active]
-    stats_map = await get_quiz_stats_by_ids([quiz.id for quiz in archived_quizzes])
+    quiz_page = await get_quizzes_page(mentor, False, page, QUIZZES_PER_PAGE, cursor)
+    stats_map = await get_quiz_stats_by_ids([quiz.id for quiz in quiz_page.items])
 
-    if not archived_quizzes:
+    if not quiz_page.total:
         text = t("archived_quizzes_header", lang) + "\n\n" + t("no_archived_quizzes", lang)
         buttons = [
             [InlineKeyboardButton(text=t("btn_active_quizzes", lang), callback_data="quizlist_active_0")],
@@ -379,20 +402,15 @@ async def show_archived_quizzes(message, user_id: int, lang: str, page: int = 0,
             await message.answer(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
         return
 
-    # Calculate pagination
-    total_pages = (len(archived_quizzes) + QUIZZES_PER_PAGE - 1) // QUIZZES_PER_PAGE
-    start_idx = page * QUIZZES_PER_PAGE
-    end_idx = start_idx + QUIZZES_PER_PAGE
-    page_quizzes = archived_quizzes[start_idx:end_idx]
-
     # Build text
     text = t("archived_quizzes_header", lang) + "\n\n"
-    if total_pages > 1:
-        text += t("pagination_info", lang, page=page + 1, total=total_pages, count=len(archived_quizzes)) + "\n\n"
+    if quiz_page.total_pages > 1:
+        text += t("pagination_info", lang, page=quiz_page.number + 1, total=quiz_page.total_pages,
+                  count=quiz_page.total) + "\n\n"
 
     # Build buttons
     buttons = []
-    for quiz in page_quizzes:
+    for quiz in quiz_page.items:
         stats = stats_map.get(quiz.id, {'questions': 0, 'attempts': 0, 'avg': 0})
         buttons.append([InlineKeyboardButton(
             text=f"🗄️ {quiz.title} • {stats['questions']} вопр. • {stats['attempts']} попыток",
@@ -400,16 +418,11 @@ async def show_archived_quizzes(message, user_id: int, lang: str, page: int = 0,
         )])
 
     # Pagination buttons
-    if total_pages > 1:
-        nav = []
-        if page > 0:
-            nav.append(InlineKeyboardButton(text="◀️", callback_data=f"quizlist_archived_{page - 1}"))
-        nav.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
-            nav.append(InlineKeyboardButton(text="▶️", callback_data=f"quizlist_archived_{page + 1}"))
-        buttons.append(nav)
+    if quiz_page.total_pages > 1:
+        buttons.append(page_nav_buttons(quiz_page, "quizlist", lang, extra_data="archived"))
 
     # Bottom buttons
+    buttons.append([InlineKeyboardButton(text=t("btn_export_all", lang), callback_data="quizexportlist_archived")])
     buttons.append([InlineKeyboardButton(text=t("btn_active_short", lang), callback_data="quizlist_active_0")])
     buttons.append([InlineKeyboardButton(text=t("btn_upload_quiz", lang), callback_data="upload_quiz")])
 
@@ -522,18 +535,12 @@ async def show_student_quiz_list(callback: CallbackQuery):
 
 async def show_student_ranked_quizzes(message, user_id: int, mentor, lang: str, page: int = 0, edit: bool = False):
     """Show ranked quizzes for student with pagination (5 per page)"""
-    from bot.db import is_exam_mode
-
     QUIZZES_PER_PAGE = 5
 
-    # Get all active quizzes
-    all_quizzes = await get_active_quizzes_by_mentor(mentor)
-    student = await get_student_by_telegram_id(user_id)
-
-    # Filter ranked quizzes (in exam mode)
-    ranked_quizzes = [quiz for quiz in all_quizzes if is_exam_mode(quiz)]
+    # Filtering and the page slice happen in SQL
+    page_quizzes, total_count, page = await get_student_quiz_page(mentor, "ranked", page, QUIZZES_PER_PAGE)
 
-    if not ranked_quizzes:
+    if not page_quizzes:
         text = t("ranked_quizzes_header", lang) + "\n\n" + t("no_ranked_quizzes", lang)
         buttons = [
             [InlineKeyboardButton(text=t("btn_practice_quizzes", lang), callback_data="studentquiz_practice_0")]
@@ -545,21 +552,20 @@ async def show_student_ranked_quizzes(message, user_id: int, mentor, lang: str,
         return
 
     # Calculate pagination
-    total_pages = (len(ranked_quizzes) + QUIZZES_PER_PAGE - 1) // QUIZZES_PER_PAGE
-    start_idx = page * QUIZZES_PER_PAGE
-    end_idx = start_idx + QUIZZES_PER_PAGE
-    page_quizzes = ranked_quizzes[start_idx:end_idx]
+    total_pages = (total_count + QUIZZES_PER_PAGE - 1) // QUIZZES_PER_PAGE
+    student = await get_student_by_telegram_id(user_id)
+    attempts = await get_student_attempts_summary(student, [quiz.id for quiz in page_quizzes])
 
     # Build text
     text = t("ranked_quizzes_header", lang) + "\n\n"
     if total_pages > 1:
-        text += t("pagination_info", lang, page=page + 1, total=total_pages, count=len(ranked_quizzes)) + "\n\n"
+        text += t("pagination_info", lang, page=page + 1, total=total_pages, count=total_count) + "\n\n"
 
     # Build buttons
     buttons = []
     for quiz in page_quizzes:
-        attempt = await get_student_attempt(student, quiz)
-        if attempt and attempt.finished_at:
+        attempt = attempts.get(quiz.id, {}).get('latest')
+        if attempt:
             # Already completed - show score
             btn_text = f"✅ {quiz.title} — {attempt.score}/{attempt.total}"
             callback_data = f"viewquiz_{quiz.id}"
@@ -590,18 +596,12 @@ async def show_student_ranked_quizzes(message, user_id: int, mentor, lang: str,
 
 async def show_student_practice_quizzes(message, user_id: int, mentor, lang: str, page: int = 0, edit: bool = False):
     """Show practice quizzes for student with pagination (5 per page)"""
-    from bot.db import is_practice_mode
-
     QUIZZES_PER_PAGE = 5
 
-    # Get all active quizzes
-    all_quizzes = await get_active_quizzes_by_mentor(mentor)
-    student = await get_student_by_telegram_id(user_id)
-
-    # Filter practice quizzes
-    practice_quizzes = [quiz for quiz in all_quizzes if is_practice_mode(quiz)]
+    # Filtering and the page slice happen in SQL
+    page_quizzes, total_count, page = await get_student_quiz_page(mentor, "practice", page, QUIZZES_PER_PAGE)
 
-    if not practice_quizzes:
+    if not page_quizzes:
         text = t("practice_quizzes_header", lang) + "\n\n" + t("no_practice_quizzes", lang)
         buttons = [
             [InlineKeyboardButton(text=t("btn_ranked_quizzes", lang), callback_data="studentquiz_ranked_0")]
@@ -613,21 +613,20 @@ async def show_student_practice_quizzes(message, user_id: int, mentor, lang: str
         return
 
     # Calculate pagination
-    total_pages = (len(practice_quizzes) + QUIZZES_PER_PAGE - 1) // QUIZZES_PER_PAGE
-    start_idx = page * QUIZZES_PER_PAGE
-    end_idx = start_idx + QUIZZES_PER_PAGE
-    page_quizzes = practice_quizzes[start_idx:end_idx]
+    total_pages = (total_count + QUIZZES_PER_PAGE - 1) // QUIZZES_PER_PAGE
+    student = await get_student_by_telegram_id(user_id)
+    attempts = await get_student_attempts_summary(student, [quiz.id for quiz in page_quizzes])
 
     # Build text
     text = t("practice_quizzes_header", lang) + "\n\n"
     if total_pages > 1:
-        text += t("pagination_info", lang, page=page + 1, total=total_pages, count=len(practice_quizzes)) + "\n\n"
+        text += t("pagination_info", lang, page=page + 1, total=total_pages, count=total_count) + "\n\n"
 
     # Build buttons
     buttons = []
     for quiz in page_quizzes:
-        attempt = await get_student_attempt(student, quiz)
-        if attempt and attempt.finished_at:
+        attempt = attempts.get(quiz.id, {}).get('latest')
+        if attempt:
             # Already completed - show score and allow retake
             btn_text = f"✅ {quiz.title} — {attempt.score}/{attempt.total}"
             callback_data = f"viewquiz_{quiz.id}"
@@ -691,10 +690,13 @@ async def receive_quiz_file(message: Message, state: FSMContext, bot: Bot):
     # Download file
     file = await bot.get_file(message.document.file_id)
     file_bytes = await bot.download_file(file.file_path)
-    content = file_bytes.read().decode('utf-8')
+
+    # Only needed by mentors uploading quizzes, loaded on first use
+    from bot.utils.quiz_parser import parse_quiz_file
 
     try:
-        parsed = parse_quiz_file(content)
+        # Decoded and parsed line by line, errors carry the line number
+        parsed = parse_quiz_file(file_bytes)
     except ValueError as e:
         await message.answer(t("quiz_parse_error", lang) + f"\n\n{str(e)}", reply_markup=mentor_menu(lang))
         await state.clear()
@@ -702,11 +704,21 @@ async def receive_quiz_file(message: Message, state: FSMContext, bot: Bot):
 
     mentor = await get_mentor_by_telegram_id(message.from_user.id)
     title = parsed.get("title") or message.document.file_name.replace(".txt", "")
+    topic = parsed.get("topic")
+    questions = parsed["questions"]
+
+    # The parsed quiz goes to the draft store, FSM data keeps only its id
+    previous_draft = (await state.get_data()).get("draft_id")
+    if previous_draft:
+        await delete_quiz_draft(previous_draft)
+    draft_id = await save_quiz_draft(parsed)
 
     await state.set_state(QuizStates.waiting_quiz_confirm)
-    await state.update_data(parsed=parsed, title=title, topic=parsed.get("topic"), replace_mode=None)
+    await state.update_data(
+        draft_id=draft_id, title=title, topic=topic, question_count=len(questions), replace_mode=None
+    )
 
-    preview_text = build_quiz_preview_text(parsed, title, lang)
+    preview_text = build_quiz_preview_text(title, topic, len(questions), questions[0], lang)
 
     if await quiz_title_exists(mentor, title):
         buttons = [
@@ -755,14 +767,10 @@ async def show_all_questions(callback: CallbackQuery, state: FSMContext):
     """Show all quiz questions with pagination"""
     lang = await get_user_language(callback.from_user.id)
     data = await state.get_data()
-    parsed = data.get("parsed")
+    draft_id = data.get("draft_id")
+    count = data.get("question_count")
 
-    if not parsed:
-        await callback.answer(t("error", lang))
-        return
-
-    questions = parsed.get("questions", [])
-    if not questions:
+    if not draft_id or not count:
         await callback.answer(t("error", lang))
         return
 
@@ -770,19 +778,24 @@ async def show_all_questions(callback: CallbackQuery, state: FSMContext):
     per_page = 3  # Show 3 questions per page
 
     from bot.keyboards.menus import paginate
-    page_questions, nav_buttons, total_pages = paginate(
-        items=questions,
+    page_indexes, nav_buttons, total_pages = paginate(
+        items=range(count),
         page=page,
         per_page=per_page,
         callback_prefix="quizpreview_all",
         lang=lang
     )
 
+    # Only the questions shown on this page are loaded from the draft
+    page_questions = await get_quiz_draft_questions(draft_id, page_indexes)
+    if not page_questions:
+        await callback.answer(t("error", lang))
+        return
+
     # Build text for current page
-    text = t("quiz_all_questions_header", lang, current=page + 1, total=total_pages)
+    text = t("quiz_all_questions_header", lang, current=page_indexes[0] // per_page + 1, total=total_pages)
 
-    start_num = page * per_page
-    for i, q in enumerate(page_questions, start=start_num + 1):
+    for i, q in enumerate(page_questions, start=page_indexes[0] + 1):
         text += t(
             "quiz_question_item",
             lang,
@@ -814,14 +827,15 @@ async def back_to_preview(callback: CallbackQuery, state: FSMContext):
     """Return to quiz preview from all questions view"""
     lang = await get_user_language(callback.from_user.id)
     data = await state.get_data()
-    parsed = data.get("parsed")
+    draft_id = data.get("draft_id")
     title = data.get("title")
 
-    if not parsed or not title:
+    first_question = await get_quiz_draft_questions(draft_id, [0]) if draft_id else None
+    if not first_question or not title:
         await callback.answer(t("error", lang))
         return
 
-    preview_text = build_quiz_preview_text(parsed, title, lang)
+    preview_text = build_quiz_preview_text(title, data.get("topic"), data.get("question_count", 0), first_question[0], lang)
     mentor = await get_mentor_by_telegram_id(callback.from_user.id)
 
     if await quiz_title_exists(mentor, title):
@@ -875,11 +889,12 @@ async def quiz_publish_practice(callback: CallbackQuery, state: FSMContext):
     lang = await get_user_language(callback.from_user.id)
 
     data = await state.get_data()
-    parsed = data.get("parsed")
+    draft_id = data.get("draft_id")
     title = data.get("title")
     topic = data.get("topic")
     replace_mode = data.get("replace_mode")
 
+    parsed = await load_quiz_draft(draft_id) if draft_id else None
     if not parsed or not title:
         await state.clear()
         await callback.answer(t("error", lang))
@@ -891,37 +906,23 @@ async def quiz_publish_practice(callback: CallbackQuery, state: FSMContext):
         await callback.answer(t("error", lang))
         return
 
-    # Handle replace/copy mode
-    if replace_mode == "replace":
-        await archive_quizzes_by_title(mentor, title)
-    elif replace_mode == "copy":
+    # Handle copy mode (replace mode archives inside publish_quiz)
+    if replace_mode == "copy":
         title = await ensure_unique_quiz_title(mentor, title)
 
-    # Create practice quiz
-    from bot.db import Quiz
-    quiz = Quiz(
-        mentor=mentor,
-        title=title,
+    # Create practice quiz with all questions in one transaction
+    await publish_quiz(
+        mentor,
+        title,
+        parsed["questions"],
+        archive_existing=replace_mode == "replace",
         topic=topic,
         quiz_type='practice',
         max_attempts=999,  # unlimited
         is_active=True
     )
-    await sync_to_async(quiz.save)()
-
-    for i, q in enumerate(parsed["questions"], 1):
-        await create_quiz_question(
-            quiz=quiz,
-            question_text=q["text"],
-            option_a=q["option_a"],
-            option_b=q["option_b"],
-            option_c=q["option_c"],
-            option_d=q["option_d"],
-            correct_answer=q["correct"],
-            order=i,
-            time_bonus=q.get("time_bonus", 0)
-        )
 
+    await delete_quiz_draft(draft_id)
     await state.clear()
     await callback.message.edit_text(
         t("quiz_published_practice", lang, title=title),
@@ -1027,11 +1028,10 @@ async def quiz_ranked_receive_start_time(message: Message, state: FSMContext, bo
 
 async def save_ranked_quiz(callback, state: FSMContext, lang: str, bot: Bot, edit: bool = True):
     """Save ranked quiz with scheduling"""
-    from asgiref.sync import sync_to_async
     from datetime import datetime
 
     data = await state.get_data()
-    parsed = data.get("parsed")
+    draft_id = data.get("draft_id")
     title = data.get("title")
     topic = data.get("topic")
     replace_mode = data.get("replace_mode")
@@ -1042,6 +1042,7 @@ async def save_ranked_quiz(callback, state: FSMContext, lang: str, bot: Bot, edi
     available_from = datetime.fromisoformat(available_from_str) if available_from_str else None
     available_until = datetime.fromisoformat(available_until_str) if available_until_str else None
 
+    parsed = await load_quiz_draft(draft_id) if draft_id else None
     if not parsed or not title:
         await state.clear()
         if hasattr(callback, 'answer'):
@@ -1055,17 +1056,16 @@ async def save_ranked_quiz(callback, state: FSMContext, lang: str, bot: Bot, edi
             await callback.answer(t("error", lang))
         return
 
-    # Handle replace/copy mode
-    if replace_mode == "replace":
-        await archive_quizzes_by_title(mentor, title)
-    elif replace_mode == "copy":
+    # Handle copy mode (replace mode archives inside publish_quiz)
+    if replace_mode == "copy":
         title = await ensure_unique_quiz_title(mentor, title)
 
-    # Create ranked quiz
-    from bot.db import Quiz
-    quiz = Quiz(
-        mentor=mentor,
-        title=title,
+    # Create ranked quiz with all questions in one transaction
+    await publish_quiz(
+        mentor,
+        title,
+        parsed["questions"],
+        archive_existing=replace_mode == "replace",
         topic=topic,
         quiz_type='ranked',
         max_attempts=1,
@@ -1073,21 +1073,8 @@ async def save_ranked_quiz(callback, state: FSMContext, lang: str, bot: Bot, edi
         available_until=available_until,
         is_active=True
     )
-    await sync_to_async(quiz.save)()
-
-    for i, q in enumerate(parsed["questions"], 1):
-        await create_quiz_question(
-            quiz=quiz,
-            question_text=q["text"],
-            option_a=q["option_a"],
-            option_b=q["option_b"],
-            option_c=q["option_c"],
-            option_d=q["option_d"],
-            correct_answer=q["correct"],
-            order=i,
-            time_bonus=q.get("time_bonus", 0)
-        )
 
+    await delete_quiz_draft(draft_id)
     await state.clear()
 
     # Format dates for display (convert to local timezone)
@@ -1106,28 +1093,14 @@ async def save_ranked_quiz(callback, state: FSMContext, lang: str, bot: Bot, edi
 
     await callback.message.answer(t("quiz_ready_actions", lang), reply_markup=mentor_menu(lang))
 
-    # Send notifications to all students
-    students = await get_students_by_mentor(mentor)
-    notification_text_template = "new_ranked_quiz_notification"
-
-    for student in students:
-        try:
-            student_lang = await get_user_language(student.telegram_id)
-            notification_text = t(
-                notification_text_template,
-                student_lang,
-                title=title,
-                start=start_str,
-                end=end_str
-            )
-            await bot.send_message(
-                student.telegram_id,
-                notification_text,
-                parse_mode="HTML"
-            )
-        except Exception as e:
-            # Skip students who blocked the bot or have errors
-            pass
+    # Notify all students in the background
+    texts = {
+        student_lang: t("new_ranked_quiz_notification", student_lang, title=title, start=start_str, end=end_str)
+        for student_lang in LANGUAGES
+    }
+    broadcast = await create_broadcast(mentor, texts, kind='quiz')
+    if broadcast is not None:
+        submit_broadcast(broadcast.id)
 
     if hasattr(callback, 'answer'):
         await callback.answer()
@@ -1136,6 +1109,9 @@ async def save_ranked_quiz(callback, state: FSMContext, lang: str, bot: Bot, edi
 @router.callback_query(F.data == "quizcancel")
 async def quiz_cancel(callback: CallbackQuery, state: FSMContext):
     lang = await get_user_language(callback.from_user.id)
+    draft_id = (await state.get_data()).get("draft_id")
+    if draft_id:
+        await delete_quiz_draft(draft_id)
     await state.clear()
     await callback.message.edit_text(t("cancelled", lang))
     await callback.message.answer(t("quiz_ready_actions", lang), reply_markup=mentor_menu(lang))
@@ -1177,6 +1153,7 @@ async def manage_quiz(callback: CallbackQuery):
         [InlineKeyboardButton(text=archive_text, callback_data=f"quiztoggle_{quiz_id}")],
         [InlineKeyboardButton(text=t("btn_manage_questions", lang), callback_data=f"quizquestions_{quiz_id}")],
         [InlineKeyboardButton(text=t("btn_export_results", lang), callback_data=f"quizexport_{quiz_id}")],
+        [InlineKeyboardButton(text=t("btn_copy_quiz", lang), callback_data=f"quizcopy_{quiz_id}")],
         [InlineKeyboardButton(text=t("btn_back", lang), callback_data="back_quizzes")]
     ]
 
@@ -1377,12 +1354,42 @@ async def toggle_quiz_archive(callback: CallbackQuery):
             [InlineKeyboardButton(text=archive_text, callback_data=f"quiztoggle_{quiz.id}")],
             [InlineKeyboardButton(text=t("btn_manage_questions", lang), callback_data=f"quizquestions_{quiz.id}")],
             [InlineKeyboardButton(text=t("btn_export_results", lang), callback_data=f"quizexport_{quiz.id}")],
+            [InlineKeyboardButton(text=t("btn_copy_quiz", lang), callback_data=f"quizcopy_{quiz.id}")],
             [InlineKeyboardButton(text=t("btn_back", lang), callback_data="back_quizzes")]
         ]
 
         await callback.message.edit_text(text, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
 
 
+@router.callback_query(F.data.startswith("quizcopy_"))
+async def copy_existing_quiz(callback: CallbackQuery):
+    """Copy a quiz as a new practice quiz (questions are shared via the question bank)"""
+    if not await is_mentor(callback.from_user.id):
+        return
+    lang = await get_user_language(callback.from_user.id)
+    quiz_id = int(callback.data.replace("quizcopy_", ""))
+    quiz = await get_quiz_by_id(quiz_id)
+    mentor = await get_mentor_by_telegram_id(callback.from_user.id)
+
+    if not quiz or not mentor or quiz.mentor_id != mentor.id:
+        await callback.answer(t("error", lang))
+        return
+
+    title = await ensure_unique_quiz_title(mentor, quiz.title)
+    copy = await copy_quiz(quiz_id, title)
+    if not copy:
+        await callback.answer(t("error", lang))
+        return
+
+    buttons = [[InlineKeyboardButton(text=t("btn_manage_questions", lang), callback_data=f"quizquestions_{copy.id}")]]
+    await callback.message.answer(
+        t("quiz_copied", lang, title=escape_html(title)),
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons),
+        parse_mode="HTML"
+    )
+    await callback.answer()
+
+
 # ==================== MENTOR: MANAGE QUESTIONS ====================
 
 @router.callback_query(F.data.startswith("quizquestions_"))
@@ -1449,6 +1456,7 @@ async def quiz_question_detail(callback: CallbackQuery):
         d=escape_html(question.option_d),
         correct=question.correct_answer
     )
+    text += build_question_analytics_text(await get_question_analytics(question.content_id), question.correct_answer, lang)
 
     buttons = [
         [InlineKeyboardButton(text=t("btn_edit_question", lang), callback_data=f"quizqedit_{quiz_id}_{question_id}")],
@@ -1771,61 +1779,70 @@ async def apply_edit_value(message: Message, state: FSMContext):
 
 # ==================== MENTOR: EXPORT RESULTS ====================
 
+async def start_results_export(callback: CallbackQuery, bot: Bot, lang: str, **job):
+    """Export in the background (the file is sent when ready)"""
+    # Rarely used: the export worker is loaded and started on the first export
+    from bot.workers.exports import ExportJob, export_worker, submit_export, run_results_export
+
+    await callback.answer(t("quiz_export_started", lang))
+    if export_worker.bot is None:
+        await export_worker.start(bot)
+    job = ExportJob(callback.message.chat.id, lang, **job)
+    if submit_export(job):
+        return
+    # Worker not running: export right here
+    await run_results_export(bot, job)
+
+
 @router.callback_query(F.data.startswith("quizexport_"))
 async def export_quiz_results(callback: CallbackQuery, bot: Bot):
     if not await is_mentor(callback.from_user.id):
         return
     lang = await get_user_language(callback.from_user.id)
     quiz_id = int(callback.data.replace("quizexport_", ""))
+    mentor = await get_mentor_by_telegram_id(callback.from_user.id)
     quiz = await get_quiz_by_id(quiz_id)
 
-    if not quiz:
+    if not quiz or not mentor or quiz.mentor_id != mentor.id:
         await callback.answer(t("error", lang))
         return
 
-    attempts = await get_quiz_attempts(quiz)
-    if not attempts:
-        await callback.answer(t("quiz_export_empty", lang))
-        return
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "quiz_title",
-        "student_telegram_id",
-        "full_name",
-        "username",
-        "first_name",
-        "last_name",
-        "score",
-        "total",
-        "started_at",
-        "finished_at"
-    ])
-
-    for attempt in attempts:
-        student = attempt.student
-        writer.writerow([
-            quiz.title,
-            student.telegram_id,
-            student.full_name or "",
-            student.username or "",
-            student.first_name or "",
-            student.last_name or "",
-            attempt.score,
-            attempt.total,
-            attempt.started_at.isoformat() if attempt.started_at else "",
-            attempt.finished_at.isoformat() if attempt.finished_at else ""
-        ])
-
-    data = output.getvalue().encode("utf-8")
-    filename = f"quiz_{quiz.id}_results.csv"
-    await bot.send_document(
-        callback.message.chat.id,
-        BufferedInputFile(data, filename=filename),
-        caption=t("quiz_export_ready", lang)
-    )
-    await callback.answer()
+    await start_results_export(callback, bot, lang, filename=f"quiz_{quiz.id}_results.csv.gz",
+                               mentor_id=mentor.id, quiz_ids=[quiz.id])
+
+
+@router.callback_query(F.data.startswith("quizexportlist_"))
+async def export_quiz_list_results(callback: CallbackQuery, bot: Bot):
+    """All active or all archived quizzes in one file"""
+    if not await is_mentor(callback.from_user.id):
+        return
+    lang = await get_user_language(callback.from_user.id)
+    list_type = callback.data.replace("quizexportlist_", "")
+    mentor = await get_mentor_by_telegram_id(callback.from_user.id)
+
+    if not mentor or list_type not in ("active", "archived"):
+        await callback.answer(t("error", lang))
+        return
+
+    await start_results_export(callback, bot, lang, filename=f"quizzes_{list_type}_results.csv.gz",
+                               mentor_id=mentor.id, is_active=list_type == "active")
+
+
+@router.callback_query(F.data.startswith("seasonexport_"))
+async def export_season_results(callback: CallbackQuery, bot: Bot):
+    """Every attempt of the season, all quizzes, in one file"""
+    if not await is_mentor(callback.from_user.id):
+        return
+    lang = await get_user_language(callback.from_user.id)
+    season_id = int(callback.data.replace("seasonexport_", ""))
+    mentor = await get_mentor_by_telegram_id(callback.from_user.id)
+
+    if not mentor:
+        await callback.answer(t("error", lang))
+        return
+
+    await start_results_export(callback, bot, lang, filename=f"season_{season_id}_results.csv.gz",
+                               mentor_id=mentor.id, season_id=season_id)
 
 
 # ==================== STUDENT: VIEW PREVIOUS ATTEMPT ====================
@@ -1904,73 +1921,11 @@ async def leaderboard_page_handler(callback: CallbackQuery):
         await callback.answer(t("error", lang))
         return
 
-    # Get leaderboard based on mode
-    from bot.db import get_current_season, get_season_leaderboard
-
-    if mode == 'season':
-        season = await get_current_season(mentor)
-        leaderboard = await get_season_leaderboard(season, limit=10000)
-        title_suffix = f"\n<i>📅 {get_season_name(season, lang)}</i>"
-    else:  # alltime
-        leaderboard = await get_global_leaderboard(mentor, limit=10000)
-        title_suffix = "\n<i>📊 За все время</i>"
-
-    if not leaderboard:
+    text, keyboard = await build_mentor_leaderboard(mentor, lang, mode, page)
+    if text is None:
         await callback.message.edit_text(t("leaderboard_empty", lang))
         return
 
-    # Calculate pagination
-    total_students = len(leaderboard)
-    total_pages = (total_students + LEADERBOARD_PER_PAGE - 1) // LEADERBOARD_PER_PAGE or 1
-
-    # Ensure page is within bounds
-    page = max(0, min(page, total_pages - 1))
-
-    start = page * LEADERBOARD_PER_PAGE
-    end = start + LEADERBOARD_PER_PAGE
-    page_leaderboard = leaderboard[start:end]
-
-    # Build leaderboard text with real names
-    text = t("leaderboard_mentor_title", lang) + title_suffix
-    text += f"\n<i>{t('leaderboard_mentor_pagination', lang, total=total_students, page=page + 1, total_pages=total_pages)}</i>\n\n"
-
-    for i, (student, rating_score, avg_percentage, total_quizzes) in enumerate(page_leaderboard, start=start + 1):
-        # Show real student name for mentor
-        student_name = str(student)  # Uses Student.__str__() method
-        text += t("leaderboard_mentor_entry", lang,
-                 rank=i,
-                 name=escape_html(student_name),
-                 score=rating_score,
-                 percentage=avg_percentage,
-                 quizzes=total_quizzes)
-
-    text += t("leaderboard_footer", lang)
-
-    # Build keyboard with mode switcher and pagination
-    buttons = []
-
-    # Mode switcher (top row)
-    mode_row = []
-    if mode == 'season':
-        mode_row.append(InlineKeyboardButton(text="✅ Сезон", callback_data="noop"))
-        mode_row.append(InlineKeyboardButton(text="📊 Все время", callback_data=f"leadermode_alltime_{page}"))
-    else:
-        mode_row.append(InlineKeyboardButton(text="📅 Сезон", callback_data=f"leadermode_season_{page}"))
-        mode_row.append(InlineKeyboardButton(text="✅ Все время", callback_data="noop"))
-    buttons.append(mode_row)
-
-    # Pagination (if needed)
-    if total_pages > 1:
-        nav = []
-        if page > 0:
-            nav.append(InlineKeyboardButton(text="◀️", callback_data=f"leaderpage_{mode}_{page - 1}"))
-        nav.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
-            nav.append(InlineKeyboardButton(text="▶️", callback_data=f"leaderpage_{mode}_{page + 1}"))
-        buttons.append(nav)
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-
     await callback.message.edit_text(text, parse_mode="HTML", reply_markup=keyboard)
     await callback.answer()
 
@@ -1995,76 +1950,11 @@ async def leaderboard_mode_handler(callback: CallbackQuery):
         await callback.answer(t("error", lang))
         return
 
-    # Get leaderboard based on mode
-    from bot.db import get_current_season, get_season_leaderboard
-
-    if mode == 'season':
-        season = await get_current_season(mentor)
-        leaderboard = await get_season_leaderboard(season, limit=10000)
-        title_suffix = f"\n<i>📅 {get_season_name(season, lang)}</i>"
-    else:  # alltime
-        leaderboard = await get_global_leaderboard(mentor, limit=10000)
-        title_suffix = "\n<i>📊 За все время</i>"
-
-    if not leaderboard:
+    text, keyboard = await build_mentor_leaderboard(mentor, lang, mode, page, back_button=True)
+    if text is None:
         await callback.message.edit_text(t("leaderboard_empty", lang))
         return
 
-    # Calculate pagination
-    total_students = len(leaderboard)
-    total_pages = (total_students + LEADERBOARD_PER_PAGE - 1) // LEADERBOARD_PER_PAGE or 1
-
-    # Ensure page is within bounds
-    page = max(0, min(page, total_pages - 1))
-
-    start = page * LEADERBOARD_PER_PAGE
-    end = start + LEADERBOARD_PER_PAGE
-    page_leaderboard = leaderboard[start:end]
-
-    # Build leaderboard text with real names
-    text = t("leaderboard_mentor_title", lang) + title_suffix
-    text += f"\n<i>{t('leaderboard_mentor_pagination', lang, total=total_students, page=page + 1, total_pages=total_pages)}</i>\n\n"
-
-    for i, (student, rating_score, avg_percentage, total_quizzes) in enumerate(page_leaderboard, start=start + 1):
-        # Show real student name for mentor
-        student_name = str(student)  # Uses Student.__str__() method
-        text += t("leaderboard_mentor_entry", lang,
-                 rank=i,
-                 name=escape_html(student_name),
-                 score=rating_score,
-                 percentage=avg_percentage,
-                 quizzes=total_quizzes)
-
-    text += t("leaderboard_footer", lang)
-
-    # Build keyboard with mode switcher and pagination
-    buttons = []
-
-    # Mode switcher (top row)
-    mode_row = []
-    if mode == 'season':
-        mode_row.append(InlineKeyboardButton(text="✅ Сезон", callback_data="noop"))
-        mode_row.append(InlineKeyboardButton(text="📊 Все время", callback_data=f"leadermode_alltime_{page}"))
-    else:
-        mode_row.append(InlineKeyboardButton(text="📅 Сезон", callback_data=f"leadermode_season_{page}"))
-        mode_row.append(InlineKeyboardButton(text="✅ Все время", callback_data="noop"))
-    buttons.append(mode_row)
-
-    # Pagination (if needed)
-    if total_pages > 1:
-        nav = []
-        if page > 0:
-            nav.append(InlineKeyboardButton(text="◀️", callback_data=f"leaderpage_{mode}_{page - 1}"))
-        nav.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
-            nav.append(InlineKeyboardButton(text="▶️", callback_data=f"leaderpage_{mode}_{page + 1}"))
-        buttons.append(nav)
-
-    # Back button
-    buttons.append([InlineKeyboardButton(text=t("back", lang), callback_data="main_menu_mentor")])
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-
     try:
         await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
     except Exception:
@@ -2237,12 +2127,7 @@ async def show_question(message, question, current: int, total: int, lang: str,
              c=c_text,
              d=d_text)
 
-    buttons = [[
-        InlineKeyboardButton(text="A", callback_data=f"ans_{attempt_id}_{question.id}_A"),
-        InlineKeyboardButton(text="B", callback_data=f"ans_{attempt_id}_{question.id}_B"),
-        InlineKeyboardButton(text="C", callback_data=f"ans_{attempt_id}_{question.id}_C"),
-        InlineKeyboardButton(text="D", callback_data=f"ans_{attempt_id}_{question.id}_D"),
-    ]]
+    markup = quiz_answer_keyboard(attempt_id, question.id)
 
     time_bonus = getattr(question, "time_bonus", 0) or 0
     total_timeout = QUESTION_TIMEOUT + time_bonus
@@ -2252,12 +2137,12 @@ async def show_question(message, question, current: int, total: int, lang: str,
 
     if edit:
         try:
-            sent_message = await message.edit_text(text_with_timer, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
+            sent_message = await message.edit_text(text_with_timer, reply_markup=markup, parse_mode="HTML")
         except TelegramBadRequest:
             # Message was deleted by student — send a new one
-            sent_message = await bot.send_message(chat_id=message.chat.id, text=text_with_timer, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
+            sent_message = await bot.send_message(chat_id=message.chat.id, text=text_with_timer, reply_markup=markup, parse_mode="HTML")
     else:
-        sent_message = await message.answer(text_with_timer, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
+        sent_message = await message.answer(text_with_timer, reply_markup=markup, parse_mode="HTML")
 
     # Pin the quiz message
     try:
@@ -2281,7 +2166,7 @@ async def show_question(message, question, current: int, total: int, lang: str,
 
     # Start countdown updater task — always use sent_message so countdown targets the actual message
     countdown_task = asyncio.create_task(
-        update_countdown(sent_message, base_text, buttons, end_time, lang)
+        update_countdown(sent_message, base_text, markup, end_time, lang)
     )
 
     # Start timeout task
@@ -2292,8 +2177,9 @@ async def show_question(message, question, current: int, total: int, lang: str,
     active_timers[attempt_id] = (timeout_task, countdown_task)
 
 
-async def update_countdown(message, base_text: str, buttons: list, end_time: float, lang: str):
+async def update_countdown(message, base_text: str, markup: InlineKeyboardMarkup, end_time: float, lang: str):
     """Update countdown timer - shows seconds remaining"""
+    seconds = t('quiz_seconds', lang)
     try:
         last_displayed = None
         while True:
@@ -2305,8 +2191,8 @@ async def update_countdown(message, base_text: str, buttons: list, end_time: flo
             if remaining != last_displayed:
                 last_displayed = remaining
                 try:
-                    text_with_timer = base_text + f"\n\n⏱ {remaining} {t('quiz_seconds', lang)}"
-                    await message.edit_text(text_with_timer, reply_markup=InlineKeyboardMarkup(inline_keyboard=buttons), parse_mode="HTML")
+                    text_with_timer = base_text + f"\n\n⏱ {remaining} {seconds}"
+                    await message.edit_text(text_with_timer, reply_markup=markup, parse_mode="HTML")
                 except Exception:
                     pass  # Message might be deleted or already modified
 
@@ -2388,6 +2274,7 @@ async def question_timeout(message, attempt_id: int, question_id: int, current:
         if current_index >= len(question_ids):
             # Quiz finished
             await finish_quiz_attempt(attempt_id, score)
+            enqueue_post_quiz(attempt_id)
 
             # Unpin quiz message
             pinned_chat_id = data.get("pinned_chat_id")
@@ -2491,6 +2378,7 @@ async def handle_answer(callback: CallbackQuery, state: FSMContext, bot: Bot):
     if current_index >= len(question_ids):
         # Quiz finished
         await finish_quiz_attempt(attempt_id, score)
+        enqueue_post_quiz(attempt_id)
 
         # Unpin quiz message
         pinned_chat_id = data.get("pinned_chat_id")
@@ -2629,37 +2517,34 @@ async def show_mentor_leaderboard(message: Message, lang: str, mode: str = 'seas
         await message.answer(t("error", lang))
         return
 
-    # Get leaderboard based on mode
-    from bot.db import get_current_season, get_season_leaderboard
-
-    if mode == 'season':
-        season = await get_current_season(mentor)
-        leaderboard = await get_season_leaderboard(season, limit=10000)
-        title_suffix = f"\n<i>📅 {get_season_name(season, lang)}</i>"
-    else:  # alltime
-        leaderboard = await get_global_leaderboard(mentor, limit=10000)
-        title_suffix = "\n<i>📊 За все время</i>"
-
-    if not leaderboard:
+    text, keyboard = await build_mentor_leaderboard(mentor, lang, mode, page)
+    if text is None:
         await message.answer(t("leaderboard_empty", lang))
         return
 
-    # Calculate pagination
-    total_students = len(leaderboard)
-    total_pages = (total_students + LEADERBOARD_PER_PAGE - 1) // LEADERBOARD_PER_PAGE or 1
+    await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
 
-    # Ensure page is within bounds
-    page = max(0, min(page, total_pages - 1))
 
-    start = page * LEADERBOARD_PER_PAGE
-    end = start + LEADERBOARD_PER_PAGE
-    page_leaderboard = leaderboard[start:end]
+async def build_mentor_leaderboard(mentor, lang: str, mode: str, page: int, back_button: bool = False):
+    """
+    Text and keyboard of one mentor leaderboard page, (None, None) if the board is empty.
+    Only the page's rows are read (see get_leaderboard_page).
+    """
+    board, season = await get_leaderboard_page(mentor, mode, page, LEADERBOARD_PER_PAGE)
+    if not board.total:
+        return None, None
+
+    if mode == 'season':
+        title_suffix = f"\n<i>📅 {get_season_name(season, lang)}</i>"
+    else:  # alltime
+        title_suffix = "\n<i>📊 За все время</i>"
+    page = board.number
 
     # Build leaderboard text with real names
     text = t("leaderboard_mentor_title", lang) + title_suffix
-    text += f"\n<i>{t('leaderboard_mentor_pagination', lang, total=total_students, page=page + 1, total_pages=total_pages)}</i>\n\n"
+    text += f"\n<i>{t('leaderboard_mentor_pagination', lang, total=board.total, page=page + 1, total_pages=board.total_pages)}</i>\n\n"
 
-    for i, (student, rating_score, avg_percentage, total_quizzes) in enumerate(page_leaderboard, start=start + 1):
+    for i, (student, rating_score, avg_percentage, total_quizzes) in enumerate(board.items, start=board.start + 1):
         # Show real student name for mentor
         student_name = str(student)  # Uses Student.__str__() method
         text += t("leaderboard_mentor_entry", lang,
@@ -2685,14 +2570,19 @@ async def show_mentor_leaderboard(message: Message, lang: str, mode: str = 'seas
     buttons.append(mode_row)
 
     # Pagination (if needed)
-    if total_pages > 1:
+    if board.total_pages > 1:
         nav = []
         if page > 0:
             nav.append(InlineKeyboardButton(text="◀️", callback_data=f"leaderpage_{mode}_{page - 1}"))
-        nav.append(InlineKeyboardButton(text=f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
+        nav.append(InlineKeyboardButton(text=f"{page + 1}/{board.total_pages}", callback_data="noop"))
+        if page < board.total_pages - 1:
             nav.append(InlineKeyboardButton(text="▶️", callback_data=f"leaderpage_{mode}_{page + 1}"))
         buttons.append(nav)
 
-    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
-    await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
+    if mode == 'season':
+        buttons.append([InlineKeyboardButton(text=t("btn_export_season", lang), callback_data=f"seasonexport_{season.id}")])
+
+    if back_button:
+        buttons.append([InlineKeyboardButton(text=t("back", lang), callback_data="main_menu_mentor")])
+
+    return text, InlineKeyboardMarkup(inline_keyboard=buttons)
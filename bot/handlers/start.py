@@ -1,6 +1,6 @@
 from aiogram import Router, F, Bot
-from aiogram.types import Message, CallbackQuery
-from aiogram.filters import Command
+from aiogram.types import Message, CallbackQuery, ChatMemberUpdated
+from aiogram.filters import Command, ChatMemberUpdatedFilter, KICKED, MEMBER
 from aiogram.fsm.context import FSMContext
 
 from bot.keyboards import mentor_menu, student_menu, language_keyboard
@@ -8,7 +8,7 @@ from bot.texts import t
 from bot.db import (
     is_mentor, get_mentor_by_telegram_id, get_all_mentors,
     get_or_create_student, assign_student_to_mentor,
-    get_user_language, set_user_language
+    get_user_language, set_user_language, set_student_bot_blocked
 )
 
 router = Router()
@@ -142,3 +142,16 @@ async def cmd_cancel(message: Message, bot: Bot, state: FSMContext):
 async def btn_cancel(message: Message, bot: Bot, state: FSMContext):
     await state.clear()
     await cmd_start(message, bot, state, True)
+
+
+# ==================== BOT BLOCKED / UNBLOCKED ====================
+
+@router.my_chat_member(F.chat.type == "private", ChatMemberUpdatedFilter(member_status_changed=KICKED))
+async def bot_blocked(event: ChatMemberUpdated):
+    """Student blocked the bot: broadcasts skip them until they unblock it"""
+    await set_student_bot_blocked(event.from_user.id, True)
+
+
+@router.my_chat_member(F.chat.type == "private", ChatMemberUpdatedFilter(member_status_changed=MEMBER))
+async def bot_unblocked(event: ChatMemberUpdated):
+    await set_student_bot_blocked(event.from_user.id, False)
@@ -3,13 +3,16 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from bot.keyboards import topics_for_view, files_for_view, materials_submenu
+from bot.keyboards.menus import ITEMS_PER_PAGE
 from bot.texts import t
 from bot.db import (
     is_mentor, get_student_mentor, get_mentor_by_telegram_id,
-    get_topics_by_mentor, get_topic_by_id, get_materials_by_topic,
+    get_topics_page, get_topic_by_id, get_materials_page,
     get_material_by_id, get_materials_count_by_topics,
-    get_student_by_telegram_id, record_download, get_user_language
+    get_student_by_telegram_id, get_user_language
 )
+from bot.utils.pagination import parse_page_callback
+from bot.workers.downloads import record_download
 
 router = Router()
 
@@ -35,26 +38,28 @@ async def view_materials(message: Message, state: FSMContext):
         await message.answer(t("not_assigned", lang))
         return
 
-    topics = await get_topics_by_mentor(mentor)
+    keyboard = await build_topics_view_keyboard(mentor, lang)
 
-    if not topics:
+    if keyboard is None:
         await message.answer(t("no_materials_yet", lang))
         return
 
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_view(topics, materials_count, lang, page=0)
+    await message.answer(t("lesson_materials", lang), reply_markup=keyboard, parse_mode="HTML")
 
-    if not keyboard.inline_keyboard:
-        await message.answer(t("no_materials_yet", lang))
-        return
 
-    await message.answer(t("lesson_materials", lang), reply_markup=keyboard, parse_mode="HTML")
+async def build_topics_view_keyboard(mentor, lang: str, page: int = 0, cursor: str = None):
+    """Keyboard with one page of topics that have materials, None if there are none"""
+    topics_page = await get_topics_page(mentor, page, ITEMS_PER_PAGE, cursor, with_materials=True)
+    if not topics_page.total:
+        return None
+    materials_count = await get_materials_count_by_topics(topics_page.items)
+    return topics_for_view(topics_page, materials_count, lang)
 
 
 @router.callback_query(F.data.startswith("viewpage_"))
 async def view_page(callback: CallbackQuery):
     lang = await get_user_language(callback.from_user.id)
-    page = int(callback.data.replace("viewpage_", ""))
+    _, page, cursor = parse_page_callback(callback.data, "viewpage")
     
     if await is_mentor(callback.from_user.id):
         mentor = await get_mentor_by_telegram_id(callback.from_user.id)
@@ -65,10 +70,11 @@ async def view_page(callback: CallbackQuery):
         await callback.answer(t("error", lang))
         return
         
-    topics = await get_topics_by_mentor(mentor)
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_view(topics, materials_count, lang, page=page)
-    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    keyboard = await build_topics_view_keyboard(mentor, lang, page, cursor)
+    if keyboard is None:
+        await callback.message.edit_text(t("no_materials_yet", lang))
+    else:
+        await callback.message.edit_reply_markup(reply_markup=keyboard)
     await callback.answer()
 
 
@@ -77,12 +83,12 @@ async def view_topic_files(callback: CallbackQuery):
     lang = await get_user_language(callback.from_user.id)
     topic_id = int(callback.data.replace("view_", ""))
     topic = await get_topic_by_id(topic_id)
-    materials = await get_materials_by_topic(topic)
+    materials_page = await get_materials_page(topic_id, 0, ITEMS_PER_PAGE)
 
-    keyboard = files_for_view(materials, topic_id, lang, page=0)
+    keyboard = files_for_view(materials_page, topic_id, lang)
     
     await callback.message.edit_text(
-        t("topic_files", lang, name=topic.name, count=len(materials)),
+        t("topic_files", lang, name=topic.name, count=materials_page.total),
         reply_markup=keyboard,
         parse_mode="HTML"
     )
@@ -92,13 +98,12 @@ async def view_topic_files(callback: CallbackQuery):
 @router.callback_query(F.data.startswith("filespage_"))
 async def files_page(callback: CallbackQuery):
     lang = await get_user_language(callback.from_user.id)
-    parts = callback.data.split("_")
-    topic_id = int(parts[1])
-    page = int(parts[2])
+    # filespage_{topic_id}_{page}[_{cursor}]
+    parts, page, cursor = parse_page_callback(callback.data, "filespage")
+    topic_id = int(parts[0])
 
-    topic = await get_topic_by_id(topic_id)
-    materials = await get_materials_by_topic(topic)
-    keyboard = files_for_view(materials, topic_id, lang, page=page)
+    materials_page = await get_materials_page(topic_id, page, ITEMS_PER_PAGE, cursor)
+    keyboard = files_for_view(materials_page, topic_id, lang)
     await callback.message.edit_reply_markup(reply_markup=keyboard)
     await callback.answer()
 
@@ -113,7 +118,7 @@ async def send_file(callback: CallbackQuery, bot: Bot):
         if not await is_mentor(callback.from_user.id):
             student = await get_student_by_telegram_id(callback.from_user.id)
             if student:
-                await record_download(student, material)
+                record_download(student.id, material.id)
         
         await bot.send_document(
             callback.message.chat.id,
@@ -139,11 +144,9 @@ async def back_to_view(callback: CallbackQuery):
         await callback.answer(t("error", lang))
         return
         
-    topics = await get_topics_by_mentor(mentor)
-    materials_count = await get_materials_count_by_topics(topics)
-    keyboard = topics_for_view(topics, materials_count, lang, page=0)
+    keyboard = await build_topics_view_keyboard(mentor, lang)
 
-    if not keyboard.inline_keyboard:
+    if keyboard is None:
         await callback.message.edit_text(t("no_materials_yet", lang))
         return
 
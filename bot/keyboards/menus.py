@@ -1,5 +1,7 @@
+from functools import wraps
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
-from bot.texts import t
+from bot.texts import t, CATALOG, DEFAULT_LANG
+from bot.utils.pagination import Page, encode_cursor
 from typing import List, Callable, Any, Optional, Tuple
 
 ITEMS_PER_PAGE = 5
@@ -40,18 +42,45 @@ def paginate(
     end = start + per_page
     page_items = items[start:end]
 
-    nav_buttons = []
-
-    # Build callback data with optional extra_data
     def make_callback(p: int) -> str:
         if extra_data:
             return f"{callback_prefix}_{extra_data}_{p}"
         return f"{callback_prefix}_{p}"
 
+    nav_buttons = _nav_buttons(
+        page, total_pages, lang,
+        prev_callback=make_callback(page - 1),
+        next_callback=make_callback(page + 1)
+    )
+
+    return page_items, nav_buttons, total_pages
+
+
+def page_nav_buttons(page: Page, callback_prefix: str, lang: str, extra_data: str = "") -> List[InlineKeyboardButton]:
+    """
+    Navigation row for a page read from the database (bot.utils.pagination).
+
+    The buttons carry a cursor to the first / last item shown, so the
+    neighbouring page is read with a keyset condition instead of OFFSET.
+    Callback data: {callback_prefix}_[{extra_data}_]{page}_{cursor}
+    """
+    if not page.items:
+        return []
+    base = f"{callback_prefix}_{extra_data}_" if extra_data else f"{callback_prefix}_"
+    return _nav_buttons(
+        page.number, page.total_pages, lang,
+        prev_callback=f"{base}{page.number - 1}_{encode_cursor('p', page.items[0].pk)}",
+        next_callback=f"{base}{page.number + 1}_{encode_cursor('n', page.items[-1].pk)}"
+    )
+
+
+def _nav_buttons(page: int, total_pages: int, lang: str, prev_callback: str, next_callback: str) -> List[InlineKeyboardButton]:
+    nav_buttons = []
+
     if page > 0:
         nav_buttons.append(InlineKeyboardButton(
             text=t("btn_prev", lang),
-            callback_data=make_callback(page - 1)
+            callback_data=prev_callback
         ))
 
     if total_pages > 1:
@@ -63,24 +92,51 @@ def paginate(
     if page < total_pages - 1:
         nav_buttons.append(InlineKeyboardButton(
             text=t("btn_next", lang),
-            callback_data=make_callback(page + 1)
+            callback_data=next_callback
         ))
 
-    return page_items, nav_buttons, total_pages
+    return nav_buttons
 
 
 # ==================== BASIC MENUS ====================
 
+def per_language(build: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Build a static keyboard once per language and reuse it.
+
+    aiogram types are frozen, so one markup object can be sent any number of
+    times; callers must not change the lists inside it. Unknown languages get
+    the default language's keyboard, as t() would give its texts.
+    """
+    cache = {}
+
+    @wraps(build)
+    def keyboard(lang: str, *args):
+        if lang not in CATALOG:
+            lang = DEFAULT_LANG
+        key = (lang, *args)
+        markup = cache.get(key)
+        if markup is None:
+            markup = cache[key] = build(lang, *args)
+        return markup
+
+    return keyboard
+
+
+_LANGUAGE_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="Русский", callback_data="lang_ru"),
+        InlineKeyboardButton(text="Qaraqalpaq", callback_data="lang_qq"),
+        InlineKeyboardButton(text="English", callback_data="lang_en")
+    ]
+])
+
+
 def language_keyboard() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="Русский", callback_data="lang_ru"),
-            InlineKeyboardButton(text="Qaraqalpaq", callback_data="lang_qq"),
-            InlineKeyboardButton(text="English", callback_data="lang_en")
-        ]
-    ])
+    return _LANGUAGE_KEYBOARD
 
 
+@per_language
 def mentor_menu(lang: str) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
         keyboard=[
@@ -92,6 +148,7 @@ def mentor_menu(lang: str) -> ReplyKeyboardMarkup:
     )
 
 
+@per_language
 def materials_submenu(lang: str) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
         keyboard=[
@@ -102,6 +159,7 @@ def materials_submenu(lang: str) -> ReplyKeyboardMarkup:
     )
 
 
+@per_language
 def student_menu(lang: str) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
         keyboard=[
@@ -115,13 +173,19 @@ def student_menu(lang: str) -> ReplyKeyboardMarkup:
 
 def profile_setup_keyboard(lang: str, telegram_name: str = None) -> ReplyKeyboardMarkup:
     """Keyboard for profile setup with optional Telegram name button"""
+    return _profile_setup_keyboard(lang, bool(telegram_name))
+
+
+@per_language
+def _profile_setup_keyboard(lang: str, with_telegram_name: bool) -> ReplyKeyboardMarkup:
     keyboard = []
-    if telegram_name:
+    if with_telegram_name:
         keyboard.append([KeyboardButton(text=t("btn_use_telegram_name", lang))])
     keyboard.append([KeyboardButton(text=t("btn_cancel", lang))])
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
 
+@per_language
 def cancel_menu(lang: str) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text=t("btn_cancel", lang))]],
@@ -139,23 +203,17 @@ def topics_for_upload(topics, lang: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def topics_for_manage(topics, materials_count: dict, lang: str, page: int = 0) -> InlineKeyboardMarkup:
-    page_topics, nav_buttons, _ = paginate(
-        items=topics,
-        page=page,
-        per_page=ITEMS_PER_PAGE,
-        callback_prefix="managepage",
-        lang=lang
-    )
-
+def topics_for_manage(page: Page, materials_count: dict, lang: str) -> InlineKeyboardMarkup:
+    """page: topics page from get_topics_page, materials_count: counts for those topics"""
     buttons = []
-    for topic in page_topics:
+    for topic in page.items:
         count = materials_count.get(topic.id, 0)
         buttons.append([InlineKeyboardButton(
             text=f"📁 {topic.name}  •  {count} 📄",
             callback_data=f"manage_{topic.id}"
         )])
 
+    nav_buttons = page_nav_buttons(page, "managepage", lang)
     if nav_buttons:
         buttons.append(nav_buttons)
 
@@ -172,49 +230,32 @@ def files_for_manage(materials, topic_id: int, lang: str) -> InlineKeyboardMarku
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def topics_for_view(topics, materials_count: dict, lang: str, page: int = 0) -> InlineKeyboardMarkup:
-    topics_with_materials = [tp for tp in topics if materials_count.get(tp.id, 0) > 0]
-
-    page_topics, nav_buttons, _ = paginate(
-        items=topics_with_materials,
-        page=page,
-        per_page=ITEMS_PER_PAGE,
-        callback_prefix="viewpage",
-        lang=lang
-    )
-
+def topics_for_view(page: Page, materials_count: dict, lang: str) -> InlineKeyboardMarkup:
+    """page: topics with materials from get_topics_page(with_materials=True)"""
     buttons = []
-    for topic in page_topics:
+    for topic in page.items:
         count = materials_count.get(topic.id, 0)
         buttons.append([InlineKeyboardButton(
             text=f"📂 {topic.name}  •  {count} 📄",
             callback_data=f"view_{topic.id}"
         )])
 
+    nav_buttons = page_nav_buttons(page, "viewpage", lang)
     if nav_buttons:
         buttons.append(nav_buttons)
 
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def files_for_view(materials, topic_id: int, lang: str, page: int = 0) -> InlineKeyboardMarkup:
-    page_materials, nav_buttons, _ = paginate(
-        items=materials,
-        page=page,
-        per_page=ITEMS_PER_PAGE,
-        callback_prefix="filespage",
-        lang=lang,
-        extra_data=str(topic_id)
-    )
-
+def files_for_view(page: Page, topic_id: int, lang: str) -> InlineKeyboardMarkup:
     buttons = []
-    start_num = page * ITEMS_PER_PAGE
-    for i, m in enumerate(page_materials, start=start_num + 1):
+    for i, m in enumerate(page.items, start=page.start + 1):
         buttons.append([InlineKeyboardButton(
             text=f"{i}. {m.title}",
             callback_data=f"getfile_{m.id}"
         )])
 
+    nav_buttons = page_nav_buttons(page, "filespage", lang, extra_data=str(topic_id))
     if nav_buttons:
         buttons.append(nav_buttons)
 
@@ -224,34 +265,25 @@ def files_for_view(materials, topic_id: int, lang: str, page: int = 0) -> Inline
 
 # ==================== STUDENTS FOR MESSAGING ====================
 
-def students_for_message(students, lang: str, page: int = 0, show_broadcast: bool = True) -> InlineKeyboardMarkup:
+def students_for_message(page: Page, lang: str, show_broadcast: bool = True) -> InlineKeyboardMarkup:
     """
     Show list of students for selecting to send a message.
 
     Args:
-        students: List of student objects
+        page: Page of students from get_students_page
         lang: Language code
-        page: Current page (0-indexed)
         show_broadcast: Whether to show "Message All" button
     """
-    page_students, nav_buttons, total_pages = paginate(
-        items=students,
-        page=page,
-        per_page=ITEMS_PER_PAGE,
-        callback_prefix="msgpage",
-        lang=lang
-    )
-
     buttons = []
 
     # Add "Message All Students" button at the top if there are multiple students
-    if show_broadcast and len(students) > 1:
+    if show_broadcast and page.total > 1:
         buttons.append([InlineKeyboardButton(
-            text=f"📢 {t('btn_message_all', lang)} ({len(students)})",
+            text=f"📢 {t('btn_message_all', lang)} ({page.total})",
             callback_data="msgstudent_all"
         )])
 
-    for student in page_students:
+    for student in page.items:
         # Show full name if available, otherwise Telegram name or ID
         name = student.full_name or f"{student.first_name} {student.last_name}".strip() or f"ID: {student.telegram_id}"
         # Add username if available
@@ -263,6 +295,7 @@ def students_for_message(students, lang: str, page: int = 0, show_broadcast: boo
             callback_data=f"msgstudent_{student.id}"
         )])
 
+    nav_buttons = page_nav_buttons(page, "msgpage", lang)
     if nav_buttons:
         buttons.append(nav_buttons)
 
@@ -291,3 +324,43 @@ def confirm_broadcast_keyboard(lang: str, student_count: int) -> InlineKeyboardM
             )
         ]
     ])
+
+
+# ==================== QUESTIONS ====================
+
+def question_reply_keyboard(questions, lang: str, start: int = 1, nav_buttons=None) -> InlineKeyboardMarkup:
+    """
+    Reply buttons for anonymous questions: one "Reply" button for a single
+    question notification, numbered buttons (5 per row) for digests and the inbox.
+    Callback data: reply_{question_id}_{student_telegram_id}_{message_id}
+    """
+    def reply_callback(q) -> str:
+        return f"reply_{q.id}_{q.student_telegram_id or 0}_{q.message_id or 0}"
+
+    if len(questions) == 1 and not nav_buttons and start == 1:
+        return InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text=t("btn_reply", lang), callback_data=reply_callback(questions[0]))]
+        ])
+
+    numbered = [
+        InlineKeyboardButton(text=f"💬 {number}", callback_data=reply_callback(q))
+        for number, q in enumerate(questions, start=start)
+    ]
+    buttons = [numbered[i:i + 5] for i in range(0, len(numbered), 5)]
+    if nav_buttons:
+        buttons.append(nav_buttons)
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+# ==================== QUIZ ====================
+
+def quiz_answer_keyboard(attempt_id: int, question_id: int) -> InlineKeyboardMarkup:
+    """
+    A/B/C/D row of a quiz question. Built once per question and reused for
+    every countdown edit of the question message.
+    Callback data: ans_{attempt_id}_{question_id}_{letter}
+    """
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text=letter, callback_data=f"ans_{attempt_id}_{question_id}_{letter}")
+        for letter in "ABCD"
+    ]])
@@ -6,11 +6,11 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from bot.db import is_mentor, get_student_mentor, get_user_language
-from bot.texts import t, TEXTS
+from bot.texts import t, CATALOG
 
 
 def _all_localized_texts(key: str) -> set[str]:
-    return {texts[key] for texts in TEXTS.values() if key in texts}
+    return {texts[key] for texts in CATALOG.values()}
 
 
 LANGUAGE_BUTTON_TEXTS = _all_localized_texts("btn_language")
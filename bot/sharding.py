@@ -0,0 +1,375 @@
+"""
+Sharded update handling: one ingest process, N worker processes.
+
+The ingest process receives updates (long polling or webhook) and appends
+each one to a Redis stream picked by its user id:
+
+    studymate:updates:<partition>    partition = user id % partitions
+
+Worker i of N reads the partitions p with p % N == i through a consumer
+group and feeds the updates to its own Dispatcher. Every update of a user is
+therefore handled by the same worker process, where that user's quiz timers,
+session timers and throttling state live, in the order it was received: a
+worker handles different users concurrently and one user's updates one after
+another. Entries are acknowledged (XACK) once handled.
+
+Entries a worker read but never acknowledged (it crashed or was stopped
+mid-update) are claimed again after CLAIM_IDLE seconds by the worker owning
+the partition, so handling is at-least-once and a claimed update may run
+after a newer one of the same user. Changing the number of workers moves
+partitions, and the users in them, to other workers; quiz timers running at
+that moment are lost, as on a restart.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger('studymate')
+
+STREAM_PREFIX = 'studymate:updates:'
+GROUP = 'workers'
+# Approximate length each stream is trimmed to (handled entries are kept until then)
+STREAM_MAXLEN = 100000
+# Seconds before an unacknowledged entry is taken over
+CLAIM_IDLE = 60
+# Seconds between two log lines about updates dropped by a full publisher buffer
+DROP_LOG_INTERVAL = 10
+
+
+def stream_name(partition: int) -> str:
+    return f"{STREAM_PREFIX}{partition}"
+
+
+def update_user_id(update: dict) -> int:
+    """Id of the user (or chat) an update comes from, the update_id if it has neither"""
+    for value in update.values():
+        if isinstance(value, dict):
+            for key in ('from', 'user', 'chat', 'sender_chat'):
+                sender = value.get(key)
+                if isinstance(sender, dict) and 'id' in sender:
+                    return sender['id']
+    return update.get('update_id', 0)
+
+
+def partition_of(update: dict, partitions: int) -> int:
+    return update_user_id(update) % partitions
+
+
+def _stream_entries(response) -> list:
+    """[(stream, entries)] from XREADGROUP (a list with RESP2, a dict with RESP3)"""
+    if not response:
+        return []
+    return list(response.items()) if isinstance(response, dict) else response
+
+
+class UpdatePublisher:
+    """Ingest side: appends updates to their partition's stream in batches, in arrival order"""
+
+    def __init__(self, redis, partitions: int, batch_size: int = 500, max_buffer: int = 50000):
+        self.redis = redis
+        self.partitions = partitions
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer  # updates kept while Redis is unavailable
+
+        self.buffer: deque = deque()
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        # Updates waiting for buffer space keep their order
+        self._waiting = asyncio.Lock()
+        self._drops_logged = 0
+        self._drop_logged_at = 0.0
+
+        # Metrics
+        self.published = 0
+        self.dropped = 0
+        self.errors = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Update publisher started ({self.partitions} partitions)")
+
+    async def stop(self):
+        """Stop the loop and write what is buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            while self.buffer:
+                await self.flush()
+        except Exception as e:
+            logger.error(f"Update publisher: {len(self.buffer)} updates not written: {e}")
+        logger.info(f"Update publisher stopped: {self.metrics()}")
+
+    def metrics(self) -> dict:
+        return {
+            'buffered': len(self.buffer),
+            'published': self.published,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
+    # ==================== PUBLISHING ====================
+
+    def has_room(self) -> bool:
+        return len(self.buffer) < self.max_buffer
+
+    def publish(self, update: dict) -> bool:
+        """Queue an update for its stream. Never blocks; False (and logged) if the buffer is full."""
+        if not self.has_room():
+            self.dropped += 1
+            now = time.monotonic()
+            if now - self._drop_logged_at >= DROP_LOG_INTERVAL:
+                logger.error(f"Update publisher: buffer full ({len(self.buffer)} updates, Redis unavailable?), "
+                             f"{self.dropped - self._drops_logged} updates dropped, "
+                             f"last {update.get('update_id')}")
+                self._drops_logged = self.dropped
+                self._drop_logged_at = now
+            return False
+        self.buffer.append(update)
+        self._wakeup.set()
+        return True
+
+    async def handle(self, update: dict):
+        """WebhookServer handler: publish instead of handling (the server checks has_room first)"""
+        self.publish(update)
+
+    async def middleware(self, handler, event, data):
+        """
+        dp.update outer middleware (long polling): publish instead of handling.
+        While the buffer is full it waits, which stops polling once
+        UPDATE_CONCURRENCY updates are waiting, so Telegram keeps the rest.
+        """
+        update = event.model_dump(mode='json', by_alias=True, exclude_none=True)
+        async with self._waiting:
+            while not self.has_room():
+                await asyncio.sleep(0.1)
+            self.publish(update)
+
+    async def flush(self) -> int:
+        """Write up to batch_size buffered updates in one round trip"""
+        batch = [self.buffer.popleft() for _ in range(min(self.batch_size, len(self.buffer)))]
+        if not batch:
+            return 0
+        pipe = self.redis.pipeline(transaction=False)
+        for update in batch:
+            pipe.xadd(stream_name(partition_of(update, self.partitions)),
+                      {'u': json.dumps(update, ensure_ascii=False)},
+                      maxlen=STREAM_MAXLEN, approximate=True)
+        try:
+            await pipe.execute()
+        except Exception:
+            # Back in front, so the order is kept
+            self.buffer.extendleft(reversed(batch))
+            raise
+        self.published += len(batch)
+        return len(batch)
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.buffer:
+                try:
+                    await self.flush()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Update publisher: write failed ({len(self.buffer)} buffered): {e}")
+                    await asyncio.sleep(1)
+
+
+class UpdateConsumer:
+    """Worker side: feeds the updates of its partitions to the dispatcher, one user at a time"""
+
+    def __init__(self, dispatcher, bot, redis, index: int, workers: int, partitions: int,
+                 concurrency: int = 50, max_pending: int = 1000, batch_size: int = 100):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.redis = redis
+        self.index = index
+        self.consumer = f"worker-{index}"
+        self.streams = [stream_name(p) for p in range(partitions) if p % workers == index]
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        self.workflow_data = {}
+        # user id -> entries waiting for that user's previous update
+        self.users: dict[int, deque] = {}
+        self.in_flight: set = set()
+        self.tasks: list[asyncio.Task] = []
+        self.user_tasks: set[asyncio.Task] = set()
+        self._handling: asyncio.Semaphore | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+        # Metrics
+        self.received = 0
+        self.handled = 0
+        self.failed = 0
+        self.claimed = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self):
+        self._handling = asyncio.Semaphore(self.concurrency)
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.workflow_data = {
+            'dispatcher': self.dispatcher,
+            'bots': [self.bot],
+            **self.dispatcher.workflow_data,
+        }
+        for stream in self.streams:
+            try:
+                await self.redis.xgroup_create(stream, GROUP, id='0', mkstream=True)
+            except ResponseError as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+        await self.dispatcher.emit_startup(bot=self.bot, **self.workflow_data)
+        self.tasks = [
+            asyncio.create_task(self._read_loop()),
+            asyncio.create_task(self._claim_loop()),
+        ]
+        logger.info(f"Update consumer {self.consumer} started ({len(self.streams)} partitions, "
+                    f"concurrency {self.concurrency})")
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop reading, wait up to timeout for the updates read. The rest is claimed again later."""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.user_tasks:
+            _, pending = await asyncio.wait(self.user_tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.dispatcher.emit_shutdown(bot=self.bot, **self.workflow_data)
+        logger.info(f"Update consumer {self.consumer} stopped: {self.metrics()}")
+
+    async def wait(self):
+        """Until the read or claim loop fails, then raise its error (the process should restart)"""
+        done, _ = await asyncio.wait(self.tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+        raise RuntimeError(f"Update consumer {self.consumer}: reading stopped")
+
+    def metrics(self) -> dict:
+        return {
+            'received': self.received,
+            'handled': self.handled,
+            'failed': self.failed,
+            'claimed': self.claimed,
+            'pending': len(self.in_flight),
+            'users': len(self.users),
+        }
+
+    # ==================== READING ====================
+
+    async def _read(self, positions: dict, block: int | None = None) -> list:
+        """XREADGROUP, retried every second while Redis is unavailable"""
+        while True:
+            try:
+                response = await self.redis.xreadgroup(GROUP, self.consumer, positions,
+                                                       count=self.batch_size, block=block)
+                return _stream_entries(response)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Update consumer {self.consumer}: read failed: {e}")
+                await asyncio.sleep(1)
+
+    async def _read_loop(self):
+        # Entries this consumer read before a restart first, then new ones
+        positions = {stream: '0' for stream in self.streams}
+        while positions:
+            for stream, entries in await self._read(positions):
+                if entries:
+                    positions[stream] = entries[-1][0]
+                    for entry_id, fields in entries:
+                        await self._schedule(stream, entry_id, fields)
+                else:
+                    del positions[stream]
+
+        positions = {stream: '>' for stream in self.streams}
+        while True:
+            for stream, entries in await self._read(positions, block=5000):
+                for entry_id, fields in entries:
+                    await self._schedule(stream, entry_id, fields)
+
+    async def _claim_loop(self):
+        """Take over entries left unacknowledged by a stopped worker"""
+        while True:
+            await asyncio.sleep(CLAIM_IDLE)
+            for stream in self.streams:
+                try:
+                    _, entries, *_ = await self.redis.xautoclaim(
+                        stream, GROUP, self.consumer, min_idle_time=CLAIM_IDLE * 1000, count=self.batch_size
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Update consumer {self.consumer}: claim failed: {e}")
+                    continue
+                for entry_id, fields in entries:
+                    if (stream, entry_id) not in self.in_flight:
+                        self.claimed += 1
+                        await self._schedule(stream, entry_id, fields)
+
+    # ==================== HANDLING ====================
+
+    async def _schedule(self, stream: str, entry_id: str, fields: dict | None):
+        """Queue an entry behind its user's earlier updates (waits while max_pending are queued)"""
+        try:
+            update = json.loads(fields['u'])
+        except (TypeError, KeyError, ValueError) as e:
+            # Trimmed or deleted from the stream while pending, or not an update
+            logger.warning(f"Update consumer {self.consumer}: skipping entry {entry_id} of {stream} "
+                           f"without an update ({e!r})")
+            await self._ack(stream, entry_id)
+            return
+        await self._slots.acquire()
+        self.received += 1
+        self.in_flight.add((stream, entry_id))
+        user_id = update_user_id(update)
+        queue = self.users.get(user_id)
+        if queue is None:
+            queue = self.users[user_id] = deque()
+            task = asyncio.create_task(self._handle_user(user_id, queue))
+            self.user_tasks.add(task)
+            task.add_done_callback(self.user_tasks.discard)
+        queue.append((stream, entry_id, update))
+
+    async def _handle_user(self, user_id: int, queue: deque):
+        try:
+            while queue:
+                stream, entry_id, update = queue[0]
+                async with self._handling:
+                    try:
+                        await self.dispatcher.feed_raw_update(self.bot, update, **self.workflow_data)
+                        self.handled += 1
+                    except Exception as e:
+                        self.failed += 1
+                        logger.error(f"Update consumer {self.consumer}: update {update.get('update_id')} "
+                                     f"failed: {e}", exc_info=True)
+                await self._ack(stream, entry_id)
+                queue.popleft()
+                self.in_flight.discard((stream, entry_id))
+                self._slots.release()
+        finally:
+            self.users.pop(user_id, None)
+
+    async def _ack(self, stream: str, entry_id: str):
+        try:
+            await self.redis.xack(stream, GROUP, entry_id)
+        except Exception as e:
+            # Claimed and handled again later
+            logger.warning(f"Update consumer {self.consumer}: ack of {entry_id} failed: {e}")
@@ -1,3 +1,9 @@
+import logging
+from string import Formatter
+from types import MappingProxyType
+
+logger = logging.getLogger('studymate')
+
 TEXTS = {
     "ru": {
         # ===== LANGUAGE =====
@@ -111,6 +117,8 @@ TEXTS = {
         "no_questions": "📭 Новых вопросов нет.\n\nВопросы от учеников появятся здесь.",
         "unanswered_questions": "❓ Вопросов без ответа ({count}):\n\n",
         "anonymous_question": "❓ <b>Анонимный вопрос:</b>\n\n{text}",
+        "question_digest": "❓ <b>Новые анонимные вопросы ({count}):</b>\n\n",
+        "tap_number_to_reply": "💬 Нажмите на номер вопроса, чтобы ответить.",
         "btn_answered": "✅ Отвечено",
         "btn_reply": "💬 Ответить",
         "marked_answered": "✅ Отмечено!",
@@ -136,6 +144,10 @@ TEXTS = {
         "sending_broadcast": "📤 Отправка... {sent}/{total}",
         "broadcast_complete": "✅ Сообщение отправлено {sent} ученикам!",
         "broadcast_complete_partial": "⚠️ Отправлено: {sent}, не доставлено: {failed}",
+        "search_prompt": "🔍 Введите название материала, теста или имя ученика:",
+        "search_too_short": "🔍 Введите хотя бы 2 символа.",
+        "search_results": "🔍 Найдено по запросу «{query}»:",
+        "search_no_results": "🔍 По запросу «{query}» ничего не найдено.",
         "back_to_menu": "↩️ Возврат в меню",
 
         # ===== ERRORS =====
@@ -208,9 +220,14 @@ TEXTS = {
         "quiz_restarted": "✅ Квиз перезапущен! Вопросы перемешаны.",
         "quiz_deleted": "✅ Квиз удалён!",
         "quiz_archived": "🗄️ Квиз архивирован.",
+        "quiz_copied": "➕ Создана копия: <b>{title}</b> (практика).",
         "quiz_unarchived": "♻️ Квиз возвращён из архива.",
         "quiz_questions_title": "📋 <b>{title}</b>\n\nВопросов: {count}",
         "quiz_question_detail": "❓ <b>Вопрос</b>\n\n{question}\n\nA) {a}\nB) {b}\nC) {c}\nD) {d}\n\n<b>Правильный:</b> {correct}",
+        "quiz_question_analytics": "\n\n📊 <b>Статистика</b> ({responses} ответов)\nВерно: {p}% · Дискриминация: {disc}\nA: {a} · B: {b} · C: {c} · D: {d} · Время вышло: {timeout}%",
+        "quiz_question_too_easy": "💤 Слишком лёгкий: почти все отвечают верно",
+        "quiz_question_too_hard": "🧱 Слишком сложный: мало кто отвечает верно",
+        "quiz_question_misleading": "⚠️ Вводит в заблуждение: проверьте правильный ответ и формулировку",
         "enter_question_text": "❓ Введите текст вопроса:",
         "enter_option_a": "A) Введите вариант A:",
         "enter_option_b": "B) Введите вариант B:",
@@ -225,6 +242,10 @@ TEXTS = {
         "quiz_edit_prompt": "✏️ Что хотите изменить?",
         "quiz_export_ready": "📤 Готово! Файл с результатами.",
         "quiz_export_empty": "🗒️ Пока нет попыток.",
+        "quiz_export_started": "⏳ Готовлю файл с результатами, пришлю его, как только он будет готов.",
+        "quiz_export_failed": "⚠️ Не удалось подготовить файл с результатами. Попробуйте позже.",
+        "btn_export_all": "📤 Экспорт всех результатов",
+        "btn_export_season": "📤 Экспорт результатов сезона",
         "quiz_mentor_list": "📝 <b>Ваши квизы:</b>",
         "quiz_item_mentor": "📝 {title} • {questions} вопр. • {attempts} попыток",
         "quiz_item_student": "📝 {title}",
@@ -418,6 +439,8 @@ TEXTS = {
         "no_questions": "📭 Jańa sorawlar joq.\n\nOqıwshılardan sorawlar usı jerde payda boladı.",
         "unanswered_questions": "❓ Juwap berilmegen sorawlar ({count}):\n\n",
         "anonymous_question": "❓ <b>Anonim soraw:</b>\n\n{text}",
+        "question_digest": "❓ <b>Jańa anonim sorawlar ({count}):</b>\n\n",
+        "tap_number_to_reply": "💬 Juwap beriw ushın soraw nomerin basıń.",
         "btn_answered": "✅ Juwap berildi",
         "btn_reply": "💬 Juwap beriw",
         "marked_answered": "✅ Belgilendi!",
@@ -443,6 +466,10 @@ TEXTS = {
         "sending_broadcast": "📤 Jiberiliwde... {sent}/{total}",
         "broadcast_complete": "✅ Xabar {sent} oqıwshıǵa jiberildi!",
         "broadcast_complete_partial": "⚠️ Jiberildi: {sent}, jiberilmedi: {failed}",
+        "search_prompt": "🔍 Material, test atın yamasa oqıwshı atın jazıń:",
+        "search_too_short": "🔍 Keminde 2 belgi jazıń.",
+        "search_results": "🔍 «{query}» boyınsha tabıldı:",
+        "search_no_results": "🔍 «{query}» boyınsha hesh nárse tabılmadı.",
         "back_to_menu": "↩️ Menyuge qaytıw",
 
         # ===== ERRORS =====
@@ -515,9 +542,14 @@ TEXTS = {
         "quiz_restarted": "✅ Kviz qayta baslandı! Sorawlar aralastırıldı.",
         "quiz_deleted": "✅ Kviz óshirildi!",
         "quiz_archived": "🗄️ Kviz arhivke salındı.",
+        "quiz_copied": "➕ Nusqa jaratıldı: <b>{title}</b> (praktika).",
         "quiz_unarchived": "♻️ Kviz arhivten qaytarıldı.",
         "quiz_questions_title": "📋 <b>{title}</b>\n\nSorawlar: {count}",
         "quiz_question_detail": "❓ <b>Soraw</b>\n\n{question}\n\nA) {a}\nB) {b}\nC) {c}\nD) {d}\n\n<b>Dúris:</b> {correct}",
+        "quiz_question_analytics": "\n\n📊 <b>Statistika</b> ({responses} juwap)\nDúris: {p}% · Ajıratıw: {disc}\nA: {a} · B: {b} · C: {c} · D: {d} · Waqıt pitti: {timeout}%",
+        "quiz_question_too_easy": "💤 Júdá ańsat: derlik hámme dúris juwap beredi",
+        "quiz_question_too_hard": "🧱 Júdá qıyın: az adam dúris juwap beredi",
+        "quiz_question_misleading": "⚠️ Adastıradı: dúris juwap hám sorawdıń mazmunın tekseriń",
         "enter_question_text": "❓ Soraw tekstin kirgiziń:",
         "enter_option_a": "A) A nusqa:",
         "enter_option_b": "B) B nusqa:",
@@ -532,6 +564,10 @@ TEXTS = {
         "quiz_edit_prompt": "✏️ Neni ózgertemiz?",
         "quiz_export_ready": "📤 Tayyar! Nátijeler faylı.",
         "quiz_export_empty": "🗒️ Házir heshkim tapsırmadı.",
+        "quiz_export_started": "⏳ Nátijeler faylın tayarlap atırman, tayar bolıwı menen jiberemen.",
+        "quiz_export_failed": "⚠️ Nátijeler faylın tayarlaw múmkin bolmadı. Keyinirek urınıp kóriń.",
+        "btn_export_all": "📤 Barlıq nátijelerdi eksport",
+        "btn_export_season": "📤 Sezon nátijelerin eksport",
         "quiz_mentor_list": "📝 <b>Sizdiń kvizler:</b>",
         "quiz_item_mentor": "📝 {title} • {questions} soraw • {attempts} talaban",
         "quiz_item_student": "📝 {title}",
@@ -725,6 +761,8 @@ TEXTS = {
         "no_questions": "📭 No new questions.\n\nQuestions from students will appear here.",
         "unanswered_questions": "❓ Unanswered questions ({count}):\n\n",
         "anonymous_question": "❓ <b>Anonymous question:</b>\n\n{text}",
+        "question_digest": "❓ <b>New anonymous questions ({count}):</b>\n\n",
+        "tap_number_to_reply": "💬 Tap a question number to reply.",
         "btn_answered": "✅ Answered",
         "btn_reply": "💬 Reply",
         "marked_answered": "✅ Marked!",
@@ -750,6 +788,10 @@ TEXTS = {
         "sending_broadcast": "📤 Sending... {sent}/{total}",
         "broadcast_complete": "✅ Message sent to {sent} students!",
         "broadcast_complete_partial": "⚠️ Sent: {sent}, failed: {failed}",
+        "search_prompt": "🔍 Enter a material or quiz title, or a student's name:",
+        "search_too_short": "🔍 Enter at least 2 characters.",
+        "search_results": "🔍 Results for «{query}»:",
+        "search_no_results": "🔍 Nothing found for «{query}».",
         "back_to_menu": "↩️ Back to menu",
 
         # ===== ERRORS =====
@@ -822,9 +864,14 @@ TEXTS = {
         "quiz_restarted": "✅ Quiz restarted! Questions shuffled.",
         "quiz_deleted": "✅ Quiz deleted!",
         "quiz_archived": "🗄️ Quiz archived.",
+        "quiz_copied": "➕ Copy created: <b>{title}</b> (practice).",
         "quiz_unarchived": "♻️ Quiz restored from archive.",
         "quiz_questions_title": "📋 <b>{title}</b>\n\nQuestions: {count}",
         "quiz_question_detail": "❓ <b>Question</b>\n\n{question}\n\nA) {a}\nB) {b}\nC) {c}\nD) {d}\n\n<b>Correct:</b> {correct}",
+        "quiz_question_analytics": "\n\n📊 <b>Statistics</b> ({responses} answers)\nCorrect: {p}% · Discrimination: {disc}\nA: {a} · B: {b} · C: {c} · D: {d} · Timed out: {timeout}%",
+        "quiz_question_too_easy": "💤 Too easy: almost everyone answers correctly",
+        "quiz_question_too_hard": "🧱 Too hard: few students answer correctly",
+        "quiz_question_misleading": "⚠️ Misleading: check the correct answer and wording",
         "enter_question_text": "❓ Enter the question text:",
         "enter_option_a": "A) Enter option A:",
         "enter_option_b": "B) Enter option B:",
@@ -839,6 +886,10 @@ TEXTS = {
         "quiz_edit_prompt": "✏️ What do you want to change?",
         "quiz_export_ready": "📤 Done! Results file attached.",
         "quiz_export_empty": "🗒️ No attempts yet.",
+        "quiz_export_started": "⏳ Preparing the results file, I'll send it as soon as it's ready.",
+        "quiz_export_failed": "⚠️ Couldn't prepare the results file. Please try again later.",
+        "btn_export_all": "📤 Export all results",
+        "btn_export_season": "📤 Export season results",
         "quiz_mentor_list": "📝 <b>Your quizzes:</b>",
         "quiz_item_mentor": "📝 {title} • {questions} q. • {attempts} attempts",
         "quiz_item_student": "📝 {title}",
@@ -924,12 +975,97 @@ TEXTS = {
 DEFAULT_LANG = "ru"
 
 
+# ==================== COMPILED CATALOG ====================
+
+class _KeepMissing(dict):
+    """format_map() mapping that leaves unknown placeholders as they are"""
+
+    def __missing__(self, name):
+        return "{" + name + "}"
+
+
+def _fields(template: str) -> frozenset:
+    """Placeholder names of a template (ValueError if it is malformed)"""
+    return frozenset(name for _, name, _, _ in Formatter().parse(template) if name is not None)
+
+
+def compile_catalog(texts: dict, default_lang: str = DEFAULT_LANG):
+    """
+    Compile TEXTS into read-only per-language tables.
+
+    Every language gets every key of the default language (its own text, or
+    the default one when it is missing). Returns (tables, formatted, problems):
+    tables maps lang -> {key: text}, formatted maps the keys that need
+    str.format to their placeholder names, problems lists the missing keys,
+    extra keys, placeholder mismatches and malformed templates found.
+    """
+    default = texts[default_lang]
+    problems = []
+    formatted = {}
+
+    for key, template in default.items():
+        try:
+            fields = _fields(template)
+        except ValueError as e:
+            problems.append(f"{default_lang}.{key}: malformed template ({e})")
+            continue
+        if fields or "{" in template or "}" in template:
+            formatted[key] = fields
+
+    tables = {}
+    for lang, table in texts.items():
+        compiled = {}
+        for key, template in default.items():
+            text = table.get(key)
+            if text is None:
+                problems.append(f"{lang}.{key}: missing")
+                text = template
+            elif lang != default_lang:
+                # A translation may add placeholders to a plain text, which t() would send unformatted
+                expected = formatted.get(key, frozenset())
+                try:
+                    fields = _fields(text)
+                except ValueError as e:
+                    problems.append(f"{lang}.{key}: malformed template ({e})")
+                    if key in formatted:
+                        text = template
+                else:
+                    if fields != expected:
+                        problems.append(
+                            f"{lang}.{key}: placeholders {sorted(fields)}, {default_lang} has {sorted(expected)}"
+                        )
+            compiled[key] = text
+        for key in table.keys() - default.keys():
+            problems.append(f"{lang}.{key}: not in {default_lang}")
+        tables[lang] = compiled
+
+    return tables, formatted, problems
+
+
+# Plain dicts for t() (a dict lookup is faster than one through a mappingproxy),
+# read-only views of them for everything else
+_TABLES, _FORMATTED, CATALOG_PROBLEMS = compile_catalog(TEXTS)
+_DEFAULT_TABLE = _TABLES[DEFAULT_LANG]
+CATALOG = MappingProxyType({lang: MappingProxyType(table) for lang, table in _TABLES.items()})
+FORMATTED = MappingProxyType(_FORMATTED)
+LANGUAGES = tuple(CATALOG)
+
+for _problem in CATALOG_PROBLEMS:
+    logger.warning(f"Text catalog: {_problem}")
+
+
 def t(key: str, lang: str = None, **kwargs) -> str:
     """Get text by key with optional formatting"""
-    if lang is None:
-        lang = DEFAULT_LANG
-    text = TEXTS.get(lang, TEXTS[DEFAULT_LANG]).get(key, key)
-    return text.format(**kwargs) if kwargs else text
+    text = _TABLES.get(lang, _DEFAULT_TABLE).get(key)
+    if text is None:
+        return key
+    if kwargs and key in _FORMATTED:
+        try:
+            return text.format_map(kwargs)
+        except KeyError as e:
+            logger.error(f"Text {key} ({lang}): no value for placeholder {e}")
+            return text.format_map(_KeepMissing(kwargs))
+    return text
 
 
 def get_season_name(season, lang: str = None) -> str:
@@ -0,0 +1,129 @@
+"""
+Database-side pagination for inline list screens.
+
+A page is read with LIMIT and a keyset condition instead of loading the
+whole list and slicing it: the nav buttons carry a compact cursor - "n" or
+"p" plus the base36 id of the last / first row shown - and the next
+(previous) page is the rows after (before) that row in the list ordering.
+The "page/total" counter comes from a COUNT query.
+
+Callback data is {prefix}_[{extra}_]{page}_{cursor}. Without a cursor
+(first page, buttons sent before cursors existed) the page is read with
+OFFSET, which is also the fallback when the cursor row was deleted.
+
+Ordering fields must be non-null; the primary key is added as the last
+ordering field so the order is total.
+"""
+from collections import namedtuple
+
+from django.db.models import Q
+
+
+class Page(namedtuple('Page', ['items', 'total', 'number', 'per_page'])):
+    """One page of a list: items, total row count, page number (0-indexed, clamped)"""
+    __slots__ = ()
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, (self.total + self.per_page - 1) // self.per_page)
+
+    @property
+    def start(self) -> int:
+        """Position of the first item in the whole list (0-indexed)"""
+        return self.number * self.per_page
+
+
+# ==================== CURSORS ====================
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def encode_cursor(direction: str, pk: int) -> str:
+    """'n' (rows after pk) or 'p' (rows before pk) + base36 pk"""
+    digits = ''
+    pk = int(pk)
+    while True:
+        pk, rest = divmod(pk, 36)
+        digits = _DIGITS[rest] + digits
+        if not pk:
+            return direction + digits
+
+
+def decode_cursor(cursor: str | None):
+    """Returns (direction, pk) or None for a missing / malformed cursor"""
+    if not cursor or cursor[0] not in ('n', 'p'):
+        return None
+    try:
+        return cursor[0], int(cursor[1:], 36)
+    except ValueError:
+        return None
+
+
+def parse_page_callback(data: str, prefix: str) -> tuple[list, int, str | None]:
+    """
+    Split "{prefix}_[{extra}_]{page}[_{cursor}]".
+    Returns (extra parts, page, cursor or None).
+    """
+    parts = data[len(prefix) + 1:].split('_')
+    cursor = parts.pop() if parts and parts[-1][:1] in ('n', 'p') else None
+    page = int(parts.pop()) if parts and parts[-1].isdigit() else 0
+    return parts, page, cursor
+
+
+# ==================== QUERIES ====================
+
+def _ordering(queryset) -> list:
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering or [])
+    if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+        ordering.append('pk')
+    return ordering
+
+
+def _keyset_filter(ordering: list, values: tuple, forward: bool) -> Q:
+    """Rows strictly after (forward) or before the row with these ordering values"""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'gt' if forward != field.startswith('-') else 'lt'
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _reverse(ordering: list) -> list:
+    return [field[1:] if field.startswith('-') else '-' + field for field in ordering]
+
+
+def keyset_page(queryset, page: int, per_page: int, cursor: str | None = None) -> Page:
+    """
+    One page of an ordered queryset (model ordering if none is set).
+
+    With a cursor from page_nav_buttons the page is read with a keyset
+    condition, so the cost doesn't depend on how deep the page is.
+    """
+    total = queryset.count()
+    if not total:
+        return Page([], 0, 0, per_page)
+    last_page = (total - 1) // per_page
+    page = max(0, min(page, last_page))
+
+    ordering = _ordering(queryset)
+    decoded = decode_cursor(cursor)
+    if decoded and page > 0:
+        direction, pk = decoded
+        names = [field.lstrip('-') for field in ordering]
+        values = queryset.model._default_manager.filter(pk=pk).values_list(*names).first()
+        if values is not None:
+            if direction == 'n':
+                items = list(queryset.filter(_keyset_filter(ordering, values, True)).order_by(*ordering)[:per_page])
+            else:
+                items = list(queryset.filter(_keyset_filter(ordering, values, False))
+                             .order_by(*_reverse(ordering))[:per_page])[::-1]
+            # Fewer rows than expected: the list changed, re-read by position below
+            if len(items) == per_page or (direction == 'n' and items and page == last_page):
+                return Page(items, total, page, per_page)
+
+    start = page * per_page
+    return Page(list(queryset.order_by(*ordering)[start:start + per_page]), total, page, per_page)
+
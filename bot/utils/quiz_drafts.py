@@ -0,0 +1,151 @@
+"""
+Staging store for uploaded quizzes waiting to be published.
+
+The parsed quiz is kept here under a draft id and FSM data keeps only the id,
+so FSM reads stay small however large the quiz is. Each question is stored
+zlib-compressed in its own field of a Redis hash, so preview pages load only
+the questions they show:
+
+    quizdraft:{draft_id}   hash: "meta" -> {"title", "topic", "count"},
+                                 "0", "1", ... -> question dicts
+
+Drafts expire after DRAFT_TTL. Without Redis an in-process dict is used.
+"""
+import json
+import logging
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+
+from backend.core.redis_client import get_redis
+
+logger = logging.getLogger('studymate')
+
+DRAFT_TTL = 6 * 3600  # seconds
+MEMORY_MAX_DRAFTS = 200
+
+# Fallback when Redis is unavailable: draft_id -> (expires_at, {field: compressed})
+_memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+
+def _key(draft_id: str) -> str:
+    return f"quizdraft:{draft_id}"
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def _memory_get(draft_id: str):
+    entry = _memory.get(draft_id)
+    if entry is None:
+        return None
+    expires_at, fields = entry
+    if expires_at < time.monotonic():
+        _memory.pop(draft_id, None)
+        return None
+    return fields
+
+
+def _redis():
+    # Values are compressed bytes
+    return get_redis(decode_responses=False)
+
+
+def save_draft(parsed: dict) -> str:
+    """Store a parsed quiz (see parse_quiz_file), return its draft id"""
+    draft_id = uuid.uuid4().hex[:16]
+    questions = parsed.get("questions", [])
+    fields = {
+        "meta": _pack({"title": parsed.get("title"), "topic": parsed.get("topic"), "count": len(questions)}),
+        **{str(i): _pack(q) for i, q in enumerate(questions)},
+    }
+
+    client = _redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.hset(_key(draft_id), mapping=fields)
+            pipe.expire(_key(draft_id), DRAFT_TTL)
+            pipe.execute()
+            return draft_id
+        except Exception as e:
+            logger.warning(f"Quiz draft not saved to Redis ({e}), keeping it in memory")
+
+    _memory[draft_id] = (time.monotonic() + DRAFT_TTL, fields)
+    while len(_memory) > MEMORY_MAX_DRAFTS:
+        _memory.popitem(last=False)
+    return draft_id
+
+
+def _get_fields(draft_id: str, names: list) -> list | None:
+    """Raw field values (None for missing fields), None if the draft doesn't exist"""
+    fields = _memory_get(draft_id)
+    if fields is not None:
+        return [fields.get(name) for name in names]
+
+    client = _redis()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline()
+        pipe.hmget(_key(draft_id), ["meta", *names])
+        pipe.expire(_key(draft_id), DRAFT_TTL)
+        values, _ = pipe.execute()
+    except Exception as e:
+        logger.warning(f"Quiz draft {draft_id} unavailable: {e}")
+        return None
+    if values[0] is None:
+        return None
+    return values[1:]
+
+
+def get_draft_meta(draft_id: str) -> dict | None:
+    """{"title", "topic", "count"} or None if the draft expired"""
+    values = _get_fields(draft_id, ["meta"])
+    return _unpack(values[0]) if values and values[0] else None
+
+
+def get_draft_questions(draft_id: str, indexes) -> list | None:
+    """Questions at the given positions or None if the draft expired"""
+    values = _get_fields(draft_id, [str(i) for i in indexes])
+    if values is None:
+        return None
+    return [_unpack(value) for value in values if value is not None]
+
+
+def load_draft(draft_id: str) -> dict | None:
+    """The whole parsed quiz (for publishing) or None if the draft expired"""
+    meta = get_draft_meta(draft_id)
+    if meta is None:
+        return None
+    questions = get_draft_questions(draft_id, range(meta["count"]))
+    if questions is None or len(questions) != meta["count"]:
+        return None
+    return {"title": meta["title"], "topic": meta["topic"], "questions": questions}
+
+
+def delete_draft(draft_id: str):
+    if _memory.pop(draft_id, None) is not None:
+        return
+    client = _redis()
+    if client is not None:
+        try:
+            client.delete(_key(draft_id))
+        except Exception as e:
+            logger.warning(f"Quiz draft {draft_id} not deleted: {e}")
+
+
+# Async wrappers for handlers
+save_quiz_draft = sync_to_async(save_draft, thread_sensitive=False)
+get_quiz_draft_meta = sync_to_async(get_draft_meta, thread_sensitive=False)
+get_quiz_draft_questions = sync_to_async(get_draft_questions, thread_sensitive=False)
+load_quiz_draft = sync_to_async(load_draft, thread_sensitive=False)
+delete_quiz_draft = sync_to_async(delete_draft, thread_sensitive=False)
@@ -1,10 +1,135 @@
+"""
+Quiz file parser.
+
+Single pass over the lines of the file (a string, a text stream or a binary
+stream decoded line by line), so large question banks are parsed in linear
+time without loading the decoded file into memory first. File format:
+
+    Тема: HTML
+    1. Какой тег создаёт ссылку?
+    A) <link>
+    B*) <a>
+    C) <href>
+    D) <url>
+
+    2#. Question with +5 seconds (## = +10 seconds)
+    ...
+
+A question starts with a line beginning with "<number>.", optionally with
+difficulty markers "#" / "##" before the dot. Every line up to the first
+option is question text (blank lines are kept for code blocks).
+"""
+import io
 import re
 
+TOPIC_RE = re.compile(r'^(Тема|Topic|Tema):\s*(.+)$', re.IGNORECASE)
+QUESTION_RE = re.compile(r'^(\d+)(#{1,2})?\.')
+OPTION_START_RE = re.compile(r'^([A-D])(\*)?\)\s*', re.IGNORECASE)
+OPTION_RE = re.compile(r'^([A-D])(\*)?\)\s*(.+)$', re.IGNORECASE)
+
+TIME_BONUS = {None: 0, "#": 5, "##": 10}
+
+
+class QuizParseError(ValueError):
+    """Invalid quiz file. line/column are 1-based (None if not tied to a position)."""
+
+    def __init__(self, message: str, line: int = None, column: int = None):
+        self.message = message
+        self.line = line
+        self.column = column
+        if line is None:
+            super().__init__(message)
+        elif column is None:
+            super().__init__(f"Line {line}: {message}")
+        else:
+            super().__init__(f"Line {line}, column {column}: {message}")
+
+
+class _Question:
+    """Question being parsed"""
+
+    def __init__(self, number: str, marks: str, line: int, column: int):
+        self.number = number
+        self.marks = marks
+        self.line = line
+        self.column = column  # where the question text starts
+        self.text_lines = []
+        self.in_options = False
+        self.content_lines = 0
+        self.options = {"A": None, "B": None, "C": None, "D": None}
+        self.correct = None
+
+    def feed(self, text: str):
+        """Feed one stripped line of the question body"""
+        if text:
+            self.content_lines += 1
+        if not self.in_options:
+            if not text:
+                # Empty lines are part of question text (for spacing in code blocks)
+                self.text_lines.append('')
+                return
+            if not OPTION_START_RE.match(text):
+                self.text_lines.append(text)
+                return
+            self.in_options = True
+
+        if not text:
+            return
+        # Match options like "A)" or "A*)"
+        option_match = OPTION_RE.match(text)
+        if option_match:
+            letter = option_match.group(1).upper()
+            self.options[letter] = option_match.group(3).strip()
+            if option_match.group(2) == '*':
+                self.correct = letter
+
+    def build(self, last_line: int) -> dict:
+        if self.content_lines < 2:
+            raise QuizParseError(f"Question {self.number} has insufficient content", self.line)
+
+        # Join question lines (preserve line breaks for code blocks)
+        question_text = '\n'.join(self.text_lines).strip()
+        if not question_text:
+            raise QuizParseError(f"Question {self.number} has no text", self.line, self.column)
+        if not self.in_options:
+            raise QuizParseError(f"Question {self.number} has no options", self.line)
+
+        # Validate all options are present
+        for letter in ["A", "B", "C", "D"]:
+            if self.options[letter] is None:
+                raise QuizParseError(f"Question {self.number} missing option {letter}", last_line)
+        if self.correct is None:
+            raise QuizParseError(f"Question {self.number} has no correct answer marked with *", self.line)
+
+        return {
+            "text": question_text,
+            "option_a": self.options["A"],
+            "option_b": self.options["B"],
+            "option_c": self.options["C"],
+            "option_d": self.options["D"],
+            "correct": self.correct,
+            "time_bonus": TIME_BONUS[self.marks]
+        }
+
 
-def parse_quiz_file(content: str) -> dict:
+def _decode_line(raw: bytes, line_no: int) -> str:
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Everything before e.start is valid, so it gives the character column (BOM not counted)
+        column = len(raw[:e.start].decode('utf-8').lstrip('\ufeff')) + 1
+        raise QuizParseError(f"File is not valid UTF-8 ({e.reason})", line_no, column) from e
+
+
+def parse_quiz_file(source) -> dict:
     """
     Parse quiz file content.
 
+    Args:
+        source: file content (str), a text stream, or a binary stream such
+            as the downloaded file, whose lines are decoded as UTF-8 one at a
+            time (so an invalid byte is reported at its line and column)
+
     Returns:
         {
             "title": "HTML",
@@ -16,16 +141,17 @@ def parse_quiz_file(content: str) -> dict:
                     "option_b": "<a>",
                     "option_c": "<href>",
                     "option_d": "<url>",
-                    "correct": "B"
+                    "correct": "B",
+                    "time_bonus": 0
                 },
                 ...
             ]
         }
 
     Raises:
-        ValueError: If format is invalid
+        QuizParseError (a ValueError): If format is invalid
     """
-    lines = content.strip().split('\n')
+    lines = io.StringIO(source) if isinstance(source, str) else source
 
     result = {
         "title": None,
@@ -33,105 +159,55 @@ def parse_quiz_file(content: str) -> dict:
         "questions": []
     }
 
-    # Check for topic/title in first line
-    if lines:
-        first_line = lines[0].strip()
-        topic_match = re.match(r'^(Тема|Topic|Tema):\s*(.+)$', first_line, re.IGNORECASE)
-        if topic_match:
-            result["topic"] = topic_match.group(2).strip()
-            result["title"] = result["topic"]
-            lines = lines[1:]
-
-    # Join remaining content and split by question numbers
-    content = '\n'.join(lines)
-
-    # Pattern to match questions starting with number + optional difficulty markers (#/##) + dot
-    # Examples: "1.", "2#.", "3##."
-    question_pattern = r'(\d+)(#{1,2})?\.\s*(.+?)(?=\n\d+(?:#{1,2})?\.|$)'
-    questions_raw = re.findall(question_pattern, content, re.DOTALL)
-
-    if not questions_raw:
-        raise ValueError("No questions found in file")
-
-    for q_num, q_marks, q_content in questions_raw:
-        q_lines = q_content.strip().split('\n')
-
-        if len(q_lines) < 2:
-            raise ValueError(f"Question {q_num} has insufficient content")
-
-        # NEW LOGIC: Collect all lines until first option as question text
-        question_lines = []
-        option_start_index = None
-
-        for i, line in enumerate(q_lines):
-            line = line.strip()
-            if not line:
-                # Empty lines are part of question text (for spacing in code blocks)
-                question_lines.append('')
-                continue
-
-            # Check if this line is an option (A), B), C), D))
-            if re.match(r'^([A-D])(\*)?\)\s*', line, re.IGNORECASE):
-                option_start_index = i
-                break
-            else:
-                # This line is part of the question
-                question_lines.append(line)
-
-        if not question_lines:
-            raise ValueError(f"Question {q_num} has no text")
-
-        if option_start_index is None:
-            raise ValueError(f"Question {q_num} has no options")
-
-        # Join question lines (preserve line breaks for code blocks)
-        question_text = '\n'.join(question_lines).strip()
-
-        # Parse options starting from option_start_index
-        options = {"A": None, "B": None, "C": None, "D": None}
-        correct_answer = None
-
-        for line in q_lines[option_start_index:]:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Match options like "A)" or "A*)"
-            option_match = re.match(r'^([A-D])(\*)?\)\s*(.+)$', line, re.IGNORECASE)
-            if option_match:
-                letter = option_match.group(1).upper()
-                is_correct = option_match.group(2) == '*'
-                option_text = option_match.group(3).strip()
-
-                options[letter] = option_text
-                if is_correct:
-                    correct_answer = letter
-
-        # Validate all options are present
-        for letter in ["A", "B", "C", "D"]:
-            if options[letter] is None:
-                raise ValueError(f"Question {q_num} missing option {letter}")
-
-        if correct_answer is None:
-            raise ValueError(f"Question {q_num} has no correct answer marked with *")
-
-        time_bonus = 0
-        if q_marks == "#":
-            time_bonus = 5
-        elif q_marks == "##":
-            time_bonus = 10
-
-        result["questions"].append({
-            "text": question_text,
-            "option_a": options["A"],
-            "option_b": options["B"],
-            "option_c": options["C"],
-            "option_d": options["D"],
-            "correct": correct_answer,
-            "time_bonus": time_bonus
-        })
+    question = None
+    seen_content = False
+    last_content_line = 0
+    line_no = 0
+    try:
+        for line_no, raw in enumerate(lines, 1):
+            if isinstance(raw, bytes):
+                raw = _decode_line(raw, line_no)
+            raw = raw.rstrip('\r\n')
+            if line_no == 1:
+                raw = raw.lstrip('\ufeff')
+            text = raw.strip()
+
+            # Check for topic/title in first non-empty line
+            if not seen_content and text:
+                seen_content = True
+                topic_match = TOPIC_RE.match(text)
+                if topic_match:
+                    result["topic"] = topic_match.group(2).strip()
+                    result["title"] = result["topic"]
+                    continue
+
+            # Inside a question only unindented "<number>." lines start the next one
+            question_match = QUESTION_RE.match(raw if question is not None else text)
+            if question_match:
+                if question is None:
+                    raw = text
+                if question is not None:
+                    result["questions"].append(question.build(last_content_line))
+                rest = raw[question_match.end():]
+                column = question_match.end() + len(rest) - len(rest.lstrip()) + 1
+                question = _Question(question_match.group(1), question_match.group(2), line_no, column)
+                text = rest.strip()
+                if not text:
+                    continue
+
+            # Text before the first question is ignored
+            if question is not None:
+                question.feed(text)
+                if text:
+                    last_content_line = line_no
+    except UnicodeDecodeError as e:
+        # A text stream decodes in chunks: the position in the file is unknown
+        raise QuizParseError(f"File is not valid UTF-8 ({e.reason})") from e
+
+    if question is not None:
+        result["questions"].append(question.build(last_content_line))
 
     if not result["questions"]:
-        raise ValueError("No valid questions parsed")
+        raise QuizParseError("No questions found in file")
 
     return result
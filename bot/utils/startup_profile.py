@@ -0,0 +1,170 @@
+"""
+Startup profile: where the time between process start and the first update goes.
+
+Enabled with STARTUP_PROFILE=1 (python run_bot.py). run_bot.py imports this
+module before anything else, so the import hook sees every later import:
+
+- imports: time spent executing each module, in total (with the modules it
+  imports) and on its own, summed per top-level package. Timing adds some
+  overhead of its own; compare runs with each other, not with a normal start
+- phases: named startup steps (django.setup, handler imports, worker start...)
+- marks: moments relative to start, e.g. receiving updates, first update
+
+The report is logged once the first update arrives. Only imports on the main
+thread are timed. Without STARTUP_PROFILE nothing is installed.
+"""
+import importlib.abc
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger('studymate')
+
+STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Wraps the loader of every module found by the other finders with a timer"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.main_thread = threading.main_thread().ident
+
+    def find_spec(self, name, path, target=None):
+        started = time.perf_counter()
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    loader = spec.loader
+                    # Built-in and frozen importers are classes shared by all their modules
+                    if loader is not None and not isinstance(loader, type) and hasattr(loader, 'exec_module'):
+                        loader.exec_module = self._timed(name, loader.exec_module)
+                    return spec
+            return None
+        finally:
+            # Finding a module doesn't count as the importing module's own time
+            if self.profile._nested and threading.get_ident() == self.main_thread:
+                self.profile._nested[-1] += time.perf_counter() - started
+
+    def _timed(self, name, exec_module):
+        profile = self.profile
+
+        def timed_exec_module(module):
+            if threading.get_ident() != self.main_thread:
+                return exec_module(module)
+            profile._nested.append(0.0)
+            started = time.perf_counter()
+            try:
+                return exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                nested = profile._nested.pop()
+                if profile._nested:
+                    profile._nested[-1] += elapsed
+                profile.imports[name] = (elapsed, elapsed - nested)
+
+        return timed_exec_module
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.enabled = False
+        # module -> (seconds with nested imports, seconds on its own)
+        self.imports: dict[str, tuple[float, float]] = {}
+        self.phases: list[tuple[str, float]] = []
+        self.marks: list[tuple[str, float]] = []
+        self._nested: list[float] = []
+        self._finder = None
+        self._first_update = False
+        self._reported = False
+
+    def install(self):
+        """Start timing imports (no-op unless STARTUP_PROFILE is set)"""
+        if not STARTUP_PROFILE or self._finder is not None:
+            return
+        self.enabled = True
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a startup step"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.phases.append((name, time.perf_counter() - started))
+
+    def mark(self, name: str):
+        """Record a moment (seconds since start)"""
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.started))
+
+    # ==================== REPORT ====================
+
+    def report(self, top: int = 25) -> str:
+        lines = ["Startup profile (ms since this module was imported):"]
+        for name, at in self.marks:
+            lines.append(f"  {at * 1000:9.1f}  {name}")
+
+        lines.append("Phases:")
+        for name, seconds in self.phases:
+            lines.append(f"  {seconds * 1000:9.1f}  {name}")
+
+        packages = defaultdict(float)
+        for name, (_, own) in self.imports.items():
+            packages[name.partition('.')[0]] += own
+        lines.append(f"Imports by package ({len(self.imports)} modules, own time):")
+        for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {seconds * 1000:9.1f}  {package}")
+
+        lines.append("Slowest modules (own / with imports):")
+        slowest = sorted(self.imports.items(), key=lambda item: -item[1][1])[:top]
+        for name, (total, own) in slowest:
+            lines.append(f"  {own * 1000:9.1f} / {total * 1000:9.1f}  {name}")
+
+        project = sorted(
+            ((name, times) for name, times in self.imports.items() if name.partition('.')[0] in ('bot', 'backend')),
+            key=lambda item: -item[1][1]
+        )[:top]
+        lines.append("Project modules (own / with imports):")
+        for name, (total, own) in project:
+            lines.append(f"  {own * 1000:9.1f} / {total * 1000:9.1f}  {name}")
+        return "\n".join(lines)
+
+    def log_report(self):
+        """Log the report once and stop timing imports"""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        self.uninstall()
+        logger.info(self.report())
+
+    async def first_update_middleware(self, handler, event, data):
+        """dp.update outer middleware: marks the first update and logs the report after it"""
+        if self._first_update:
+            return await handler(event, data)
+        self._first_update = True
+        self.mark("first update received")
+        try:
+            return await handler(event, data)
+        finally:
+            self.mark("first update handled")
+            self.log_report()
+
+
+startup_profile = StartupProfile()
@@ -0,0 +1,194 @@
+"""
+Webhook ingestion: Telegram POSTs updates to an aiohttp server instead of the
+bot long-polling getUpdates. run_bot.py uses it when WEBHOOK_URL is set.
+
+- Secret token: setWebhook registers the secret and Telegram sends it back in
+  the X-Telegram-Bot-Api-Secret-Token header. Requests without it get 401.
+- Deduplication: Telegram delivers an update again when the previous delivery
+  failed or timed out, also after the bot restarted. Recent update_ids are
+  remembered in memory and, when Redis is available, in Redis (SET NX with a
+  TTL), so every update is handled once.
+- Bounded concurrency: an update is answered 200 right away and handled in a
+  background task, at most `concurrency` at a time. When max_pending updates
+  are already waiting, new ones get 503 and are not marked as seen, so
+  Telegram delivers them again later instead of the process queueing them
+  without limit. The same goes for a handler without room (has_room), e.g.
+  the publisher of sharded workers while Redis is unavailable.
+
+Run one webhook process: with UPDATE_ROLE=single it also runs the jobs that
+must exist once (see run_bot.py). To spread the work over processes, run it
+as the ingest process of sharded workers (bot/sharding.py).
+"""
+import asyncio
+import hmac
+import logging
+from collections import deque
+
+from aiohttp import web
+from asgiref.sync import sync_to_async
+
+from backend.core.redis_client import USE_REDIS, get_redis
+
+logger = logging.getLogger('studymate')
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+# Telegram keeps undelivered updates for 24 hours
+DEDUP_TTL = 24 * 3600
+
+
+class RecentUpdates:
+    """update_ids seen recently: the last `size` in memory, all of DEDUP_TTL in Redis"""
+
+    def __init__(self, bot_id: int, size: int = 10000):
+        self.key_prefix = f"studymate:update:{bot_id}:"
+        self._order: deque = deque(maxlen=size)
+        self._seen: set = set()
+
+    async def claim(self, update_id: int) -> bool:
+        """True the first time an update_id is claimed (also before a restart, with Redis)"""
+        if update_id in self._seen:
+            return False
+        if len(self._order) == self._order.maxlen:
+            self._seen.discard(self._order[0])
+        self._order.append(update_id)
+        self._seen.add(update_id)
+        if not USE_REDIS:
+            return True
+        return await self._claim_shared(update_id)
+
+    @sync_to_async(thread_sensitive=False)
+    def _claim_shared(self, update_id: int) -> bool:
+        client = get_redis()
+        if client is None:
+            return True
+        try:
+            return bool(client.set(f"{self.key_prefix}{update_id}", 1, nx=True, ex=DEDUP_TTL))
+        except Exception as e:
+            # Better to handle a rare duplicate than to drop the update
+            logger.warning(f"Webhook: update {update_id} not checked in Redis: {e}")
+            return True
+
+
+class WebhookServer:
+    """aiohttp server feeding webhook updates to the dispatcher"""
+
+    def __init__(self, dispatcher, bot, url: str, secret: str, path: str = '/telegram/webhook',
+                 concurrency: int = 50, max_pending: int = 1000, handler=None, has_room=None):
+        self.dispatcher = dispatcher
+        # async handler(update dict) used instead of the dispatcher (e.g. UpdatePublisher.handle)
+        self.handler = handler
+        # has_room() -> False: new updates get 503 (e.g. UpdatePublisher.has_room)
+        self.has_room = has_room
+        self.bot = bot
+        self.url = url.rstrip('/') + path
+        self.path = path
+        self.secret = secret
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+
+        self.recent = RecentUpdates(bot.id)
+        self.workflow_data = {}
+        self.tasks: set[asyncio.Task] = set()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._runner: web.AppRunner | None = None
+
+        # Metrics
+        self.received = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.overloaded = 0
+        self.processed = 0
+        self.failed = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, host: str = '0.0.0.0', port: int = 8080):
+        """Listen on host:port, register the webhook with Telegram and emit the dispatcher startup"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.workflow_data = {
+            'dispatcher': self.dispatcher,
+            'bots': [self.bot],
+            **self.dispatcher.workflow_data,
+        }
+
+        app = web.Application()
+        app.router.add_post(self.path, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+        await self.bot.set_webhook(
+            self.url,
+            secret_token=self.secret,
+            allowed_updates=self.dispatcher.resolve_used_update_types(),
+            max_connections=max(1, min(self.concurrency, 100)),
+        )
+        await self.dispatcher.emit_startup(bot=self.bot, **self.workflow_data)
+        logger.info(f"Webhook server listening on {host}:{port}{self.path} "
+                    f"(concurrency {self.concurrency}, max pending {self.max_pending})")
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Stop accepting updates and wait up to `timeout` seconds for the ones being
+        handled. The webhook stays registered: Telegram keeps new updates until an
+        instance is back.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self.tasks:
+            _, pending = await asyncio.wait(self.tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        await self.dispatcher.emit_shutdown(bot=self.bot, **self.workflow_data)
+        logger.info(f"Webhook server stopped: {self.metrics()}")
+
+    def metrics(self) -> dict:
+        return {
+            'received': self.received,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'overloaded': self.overloaded,
+            'processed': self.processed,
+            'failed': self.failed,
+            'pending': len(self.tasks),
+        }
+
+    # ==================== UPDATES ====================
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, '').encode('utf-8', 'surrogateescape')
+        if not hmac.compare_digest(token, self.secret.encode()):
+            self.rejected += 1
+            return web.Response(status=401)
+        try:
+            update = await request.json()
+            update_id = int(update['update_id'])
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400)
+
+        self.received += 1
+        if len(self.tasks) >= self.max_pending or (self.has_room is not None and not self.has_room()):
+            # Telegram retries later; refusing is cheaper than an unbounded backlog
+            self.overloaded += 1
+            return web.Response(status=503)
+        if not await self.recent.claim(update_id):
+            self.duplicates += 1
+            return web.Response()
+
+        task = asyncio.create_task(self._process(update))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return web.Response()
+
+    async def _process(self, update: dict):
+        async with self._semaphore:
+            try:
+                if self.handler is not None:
+                    await self.handler(update)
+                else:
+                    await self.dispatcher.feed_raw_update(self.bot, update, **self.workflow_data)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Webhook: update {update.get('update_id')} failed: {e}", exc_info=True)
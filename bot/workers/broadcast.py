@@ -0,0 +1,222 @@
+"""
+Background broadcast sending.
+
+A broadcast is persisted first (Broadcast + one BroadcastDelivery per
+recipient, with Telegram ID and language resolved in one query) and the
+handler returns immediately. Deliveries are sent here in batches with
+bounded concurrency and a global rate limit below Telegram's ~30 messages
+per second. TelegramRetryAfter pauses all sending for the requested time and
+the message is retried.
+
+Delivery is at-least-once: results are stored after every batch, so after a
+restart unfinished broadcasts resume with their pending deliveries. On a
+clean stop messages already sent are recorded; after a crash the batch that
+was in flight may be sent twice. Students who blocked the bot are marked on
+Student.bot_blocked_at and skipped by later broadcasts.
+"""
+import asyncio
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError
+
+from bot.texts import t
+from bot.db import (
+    get_broadcast, get_unfinished_broadcast_ids, get_pending_deliveries,
+    record_broadcast_results, finish_broadcast
+)
+
+logger = logging.getLogger('studymate')
+
+
+class BroadcastWorker:
+    """Runs broadcast jobs as asyncio tasks sharing one rate limit"""
+
+    def __init__(self, concurrency: int = 10, rate: float = 25.0, batch_size: int = 50,
+                 max_retries: int = 3, report_interval: float = 3.0):
+        self.concurrency = concurrency
+        self.rate = rate  # messages per second, across all broadcasts
+        self.batch_size = batch_size
+        self.max_retries = max_retries  # RetryAfter retries per message
+        self.report_interval = report_interval
+
+        self.bot: Bot | None = None
+        # broadcast_id -> task
+        self.jobs: dict[int, asyncio.Task] = {}
+        self._resume_task: asyncio.Task | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._rate_lock: asyncio.Lock | None = None
+        self._next_send = 0.0
+        self._paused_until = 0.0
+
+        # Metrics
+        self.sent = 0
+        self.failed = 0
+        self.blocked = 0
+        self.retry_after = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, bot: Bot, poll_interval: float = None):
+        """
+        poll_interval: also pick up new broadcasts every poll_interval seconds, for
+        broadcasts created by other processes (sharded workers, see bot/sharding.py)
+        """
+        self.bot = bot
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rate_lock = asyncio.Lock()
+        # Resume in the background so polling doesn't wait for the database
+        self._resume_task = asyncio.create_task(self._resume(poll_interval))
+        logger.info(f"Broadcast worker started (concurrency {self.concurrency}, {self.rate}/s)")
+
+    async def _resume(self, poll_interval: float = None):
+        while True:
+            try:
+                ids = [broadcast_id for broadcast_id in await get_unfinished_broadcast_ids()
+                       if broadcast_id not in self.jobs]
+            except Exception as e:
+                logger.error(f"Broadcast worker: resume failed: {e}", exc_info=True)
+                ids = []
+            for broadcast_id in ids:
+                self.submit(broadcast_id)
+            if ids:
+                logger.info(f"Broadcast worker: resumed {len(ids)} broadcasts")
+            if not poll_interval:
+                return
+            await asyncio.sleep(poll_interval)
+
+    async def stop(self):
+        """Cancel running broadcasts. Pending deliveries are resumed on next start."""
+        if self._resume_task is not None:
+            self._resume_task.cancel()
+            await asyncio.gather(self._resume_task, return_exceptions=True)
+            self._resume_task = None
+        tasks = list(self.jobs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.jobs = {}
+        logger.info(f"Broadcast worker stopped: {self.metrics()}")
+
+    def submit(self, broadcast_id: int) -> bool:
+        """
+        Start sending a persisted broadcast. Never blocks.
+        Returns False if the worker is not running (the broadcast is resumed on next start).
+        """
+        if self.bot is None:
+            return False
+        if broadcast_id not in self.jobs:
+            task = asyncio.create_task(self._run(broadcast_id))
+            task.add_done_callback(lambda _: self.jobs.pop(broadcast_id, None))
+            self.jobs[broadcast_id] = task
+        return True
+
+    # ==================== SENDING ====================
+
+    async def _run(self, broadcast_id: int):
+        try:
+            broadcast = await get_broadcast(broadcast_id)
+            if broadcast is None:
+                return
+            last_report = time.monotonic()
+            while True:
+                batch = await get_pending_deliveries(broadcast_id, self.batch_size)
+                if not batch:
+                    break
+                tasks = [asyncio.ensure_future(self._deliver(broadcast.texts, *row)) for row in batch]
+                try:
+                    results = await asyncio.gather(*tasks)
+                except asyncio.CancelledError:
+                    # Keep what was already sent so the resumed broadcast doesn't send it again
+                    done = [task.result() for task in tasks if task.done() and not task.cancelled()]
+                    if done:
+                        await record_broadcast_results(broadcast_id, done)
+                    raise
+                sent, failed, blocked = await record_broadcast_results(broadcast_id, results)
+                if time.monotonic() - last_report >= self.report_interval:
+                    last_report = time.monotonic()
+                    await self._report(broadcast, t(
+                        "sending_broadcast", broadcast.report_lang, sent=sent, total=broadcast.total
+                    ))
+
+            broadcast = await finish_broadcast(broadcast_id)
+            lang = broadcast.report_lang
+            if broadcast.failed or broadcast.blocked:
+                text = t("broadcast_complete_partial", lang, sent=broadcast.sent,
+                         failed=broadcast.failed + broadcast.blocked)
+            else:
+                text = t("broadcast_complete", lang, sent=broadcast.sent)
+            await self._report(broadcast, text)
+            logger.info(f"Broadcast {broadcast_id} done: sent={broadcast.sent}, "
+                        f"failed={broadcast.failed}, blocked={broadcast.blocked}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Left unfinished in the database, resumed on next start
+            logger.error(f"Broadcast {broadcast_id} failed: {e}", exc_info=True)
+
+    async def _deliver(self, texts: dict, delivery_id: int, student_id: int, telegram_id: int,
+                       language: str) -> tuple:
+        """Send one message. Returns (delivery_id, student_id, status, error)."""
+        text = texts.get(language) or next(iter(texts.values()))
+        async with self._semaphore:
+            for _ in range(self.max_retries + 1):
+                await self._throttle()
+                try:
+                    await self.bot.send_message(telegram_id, text, parse_mode="HTML")
+                    self.sent += 1
+                    return delivery_id, student_id, 'sent', ''
+                except TelegramRetryAfter as e:
+                    self.retry_after += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                    logger.warning(f"Broadcast: flood limit, pausing {e.retry_after}s")
+                except TelegramForbiddenError as e:
+                    self.blocked += 1
+                    return delivery_id, student_id, 'blocked', str(e)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failed += 1
+                    return delivery_id, student_id, 'failed', f"{type(e).__name__}: {e}"
+        self.failed += 1
+        return delivery_id, student_id, 'failed', "Too many flood limit retries"
+
+    async def _throttle(self):
+        """Wait for the next send slot (global rate limit and RetryAfter pause)"""
+        async with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_send, self._paused_until)
+            self._next_send = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _report(self, broadcast, text: str):
+        if not broadcast.report_chat_id or not broadcast.report_message_id:
+            return
+        try:
+            await self.bot.edit_message_text(
+                text, chat_id=broadcast.report_chat_id, message_id=broadcast.report_message_id
+            )
+        except Exception:
+            # Message deleted or not modified
+            pass
+
+    # ==================== METRICS ====================
+
+    def metrics(self) -> dict:
+        return {
+            'running': len(self.jobs),
+            'sent': self.sent,
+            'failed': self.failed,
+            'blocked': self.blocked,
+            'retry_after': self.retry_after,
+        }
+
+
+broadcast_worker = BroadcastWorker()
+
+
+def submit_broadcast(broadcast_id: int) -> bool:
+    """Start sending a broadcast created with bot.db.create_broadcast"""
+    return broadcast_worker.submit(broadcast_id)
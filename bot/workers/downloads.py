@@ -0,0 +1,169 @@
+"""
+Write-behind download log.
+
+send_file only appends (student_id, material_id, time) to an in-memory buffer
+and sends the document right away. The buffer is flushed with one bulk_create
+every few seconds (or as soon as it holds batch_size events), and the days
+that got new downloads are rolled up into DownloadDaily / DailyActiveStudent
+every rollup_interval seconds, which is what the mentor stats screen reads.
+
+Events still buffered are flushed on stop. A crash loses at most the last
+flush_interval seconds of download events (statistics only). On start the
+last two days are rolled up again in case the previous process stopped
+before its rollup.
+
+With several worker processes (UPDATE_ROLE=worker) every one flushes its own
+events, but only one rolls up: rollups of the same day running at the same
+time would conflict. That one rolls up today and yesterday every time, since
+it can't know which days the other processes flushed.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from bot.db import save_downloads, rollup_download_days
+
+logger = logging.getLogger('studymate')
+
+
+class DownloadLog:
+    """Buffer of download events flushed in batches"""
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 5.0, rollup_interval: float = 60.0,
+                 max_buffer: int = 50000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rollup_interval = rollup_interval
+        self.max_buffer = max_buffer  # events kept while the database is unavailable
+
+        self.buffer: list[tuple] = []
+        # Local dates with flushed downloads not rolled up yet
+        self.dirty_dates: set = set()
+        self.rollups = True
+        self.all_processes = False
+        self.tasks: list[asyncio.Task] = []
+        self._flush_now: asyncio.Event | None = None
+
+        # Metrics
+        self.recorded = 0
+        self.flushed = 0
+        self.skipped = 0  # student or material deleted before the flush
+        self.dropped = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, rollups: bool = True, all_processes: bool = False):
+        """
+        rollups=False: only write events (another process rolls up).
+        all_processes: the rollups cover events written by other processes too.
+        """
+        self.rollups = rollups
+        self.all_processes = all_processes
+        self._flush_now = asyncio.Event()
+        self.tasks = [asyncio.create_task(self._flush_loop())]
+        if rollups:
+            self._mark_recent_days()
+            self.tasks.append(asyncio.create_task(self._rollup_loop()))
+        logger.info(f"Download log started (flush every {self.flush_interval}s, batch {self.batch_size})")
+
+    async def stop(self):
+        """Cancel loops, then flush and roll up what is left"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        try:
+            await self.flush()
+            if self.rollups:
+                await self.rollup()
+        except Exception as e:
+            logger.error(f"Download log: final flush failed: {e}", exc_info=True)
+        logger.info(f"Download log stopped: {self.metrics()}")
+
+    # ==================== BUFFER ====================
+
+    def record(self, student_id: int, material_id: int):
+        """Log a download. Never blocks."""
+        if len(self.buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self.buffer.append((student_id, material_id, timezone.now()))
+        self.recorded += 1
+        if len(self.buffer) >= self.batch_size and self._flush_now is not None:
+            self._flush_now.set()
+
+    async def flush(self) -> int:
+        """Write buffered events. On failure they are put back for the next flush."""
+        events, self.buffer = self.buffer, []
+        if not events:
+            return 0
+        try:
+            saved = await save_downloads(events)
+        except Exception:
+            self.buffer[:0] = events
+            raise
+        self.flushed += saved
+        self.skipped += len(events) - saved
+        self.dirty_dates.update(timezone.localdate(downloaded_at) for _, _, downloaded_at in events)
+        return len(events)
+
+    def _mark_recent_days(self):
+        today = timezone.localdate()
+        self.dirty_dates.update({today, today - timedelta(days=1)})
+
+    async def rollup(self) -> int:
+        if self.all_processes:
+            self._mark_recent_days()
+        dates, self.dirty_dates = self.dirty_dates, set()
+        if not dates:
+            return 0
+        try:
+            return await rollup_download_days(dates)
+        except Exception:
+            self.dirty_dates |= dates
+            raise
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Download log flush failed ({len(self.buffer)} buffered): {e}", exc_info=True)
+
+    async def _rollup_loop(self):
+        while True:
+            try:
+                await self.rollup()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Download rollup failed: {e}", exc_info=True)
+            await asyncio.sleep(self.rollup_interval)
+
+    # ==================== METRICS ====================
+
+    def metrics(self) -> dict:
+        return {
+            'buffered': len(self.buffer),
+            'recorded': self.recorded,
+            'flushed': self.flushed,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+        }
+
+
+download_log = DownloadLog()
+
+
+def record_download(student_id: int, material_id: int):
+    """Log a material download (written to the database in the background)"""
+    download_log.record(student_id, material_id)
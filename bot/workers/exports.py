@@ -0,0 +1,145 @@
+"""
+Background quiz results exports.
+
+The export handlers only submit a job and answer right away. The job streams
+the attempts into a temporary .csv.gz file in a worker thread (see
+backend.quizzes.exports), sends it as a document to the mentor's chat and
+deletes the file. At most `concurrency` exports run at a time, the rest wait
+for a slot; a second tap on the same export while it is queued or running is
+ignored.
+
+The module is loaded and the worker started by the first export, so bots
+that never export don't import it. Jobs are not persisted: exports running
+on stop are cancelled and the mentor simply asks again.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from collections import namedtuple
+
+from aiogram import Bot
+from aiogram.types import FSInputFile
+
+from bot.texts import t
+from bot.db import write_quiz_results_export
+
+logger = logging.getLogger('studymate')
+
+# Scope as in backend.quizzes.exports.results_queryset
+ExportJob = namedtuple('ExportJob', ['chat_id', 'lang', 'filename', 'mentor_id', 'quiz_ids', 'is_active', 'season_id'],
+                       defaults=[None, None, None])
+
+
+async def send_results_export(bot: Bot, job: ExportJob) -> int:
+    """Write the export to a temporary file and send it. Returns the number of rows."""
+    fd, path = tempfile.mkstemp(prefix='studymate-export-', suffix='.csv.gz')
+    os.close(fd)
+    try:
+        rows = await write_quiz_results_export(path, job.mentor_id, quiz_ids=job.quiz_ids,
+                                               is_active=job.is_active, season_id=job.season_id)
+        if not rows:
+            await bot.send_message(job.chat_id, t("quiz_export_empty", job.lang))
+        else:
+            await bot.send_document(job.chat_id, FSInputFile(path, filename=job.filename),
+                                    caption=t("quiz_export_ready", job.lang))
+        return rows
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            # Still open in the export thread after a cancel (Windows)
+            logger.warning(f"Export: could not remove {path}")
+
+
+async def run_results_export(bot: Bot, job: ExportJob) -> int | None:
+    """send_results_export that tells the mentor about a failure. Returns None if it failed."""
+    try:
+        return await send_results_export(bot, job)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Export {job.filename} for chat {job.chat_id} failed: {e}", exc_info=True)
+        try:
+            await bot.send_message(job.chat_id, t("quiz_export_failed", job.lang))
+        except Exception:
+            pass
+        return None
+
+
+class ExportWorker:
+    """Runs export jobs as asyncio tasks, a few at a time"""
+
+    def __init__(self, concurrency: int = 2):
+        self.concurrency = concurrency
+
+        self.bot: Bot | None = None
+        # (chat_id, filename) -> task
+        self.jobs: dict[tuple, asyncio.Task] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+
+        # Metrics
+        self.exports = 0
+        self.rows = 0
+        self.failed = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, bot: Bot):
+        self.bot = bot
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info(f"Export worker started (concurrency {self.concurrency})")
+
+    async def stop(self):
+        """Cancel queued and running exports"""
+        tasks = list(self.jobs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.jobs = {}
+        self.bot = None
+        logger.info(f"Export worker stopped: {self.metrics()}")
+
+    # ==================== JOBS ====================
+
+    def submit(self, job: ExportJob) -> bool:
+        """
+        Start an export in the background. Never blocks.
+        Returns False if the worker is not running (caller runs it directly).
+        """
+        if self.bot is None:
+            return False
+        key = (job.chat_id, job.filename)
+        if key in self.jobs:
+            return True
+        task = asyncio.create_task(self._run(job))
+        self.jobs[key] = task
+        task.add_done_callback(lambda _: self.jobs.pop(key, None))
+        return True
+
+    async def _run(self, job: ExportJob):
+        async with self._semaphore:
+            rows = await run_results_export(self.bot, job)
+        if rows is None:
+            self.failed += 1
+        else:
+            self.exports += 1
+            self.rows += rows
+
+    # ==================== METRICS ====================
+
+    def metrics(self) -> dict:
+        return {
+            'running': len(self.jobs),
+            'exports': self.exports,
+            'rows': self.rows,
+            'failed': self.failed,
+        }
+
+
+export_worker = ExportWorker()
+
+
+def submit_export(job: ExportJob) -> bool:
+    """Start a results export (the file is sent to job.chat_id when ready)"""
+    return export_worker.submit(job)
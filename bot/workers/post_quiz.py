@@ -0,0 +1,173 @@
+"""
+Background post-quiz processing.
+
+finish_quiz_attempt only commits the attempt so the student gets the result
+immediately. Streak, season rating and leaderboard index updates run here.
+Question analytics of quizzes with new attempts are refreshed on every sweep.
+
+Delivery is at-least-once: the database (QuizAttempt.processed_at) is the
+source of truth, the in-memory queue is only a fast path. Attempts that were
+dropped (queue full, crash, restart) are picked up by the periodic sweep, and
+process_finished_attempt is idempotent.
+"""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from bot.db import (
+    process_finished_attempt, get_unprocessed_attempt_ids, get_post_quiz_backlog,
+    refresh_stale_question_analytics
+)
+
+logger = logging.getLogger('studymate')
+
+
+class PostQuizWorker:
+    """Bounded queue of finished attempt ids processed by a few asyncio tasks"""
+
+    def __init__(self, maxsize: int = 1000, concurrency: int = 2, sweep_interval: float = 60.0,
+                 lag_warning: float = 30.0):
+        self.maxsize = maxsize
+        self.concurrency = concurrency
+        self.sweep_interval = sweep_interval
+        self.lag_warning = lag_warning
+
+        self.queue: asyncio.Queue | None = None
+        # attempt_id -> monotonic enqueue time (for lag metrics and de-duplication)
+        self.pending: dict[int, float] = {}
+        self.tasks: list[asyncio.Task] = []
+
+        # Metrics
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        self.tasks.append(asyncio.create_task(self._sweep_loop()))
+        logger.info(f"Post-quiz worker started ({self.concurrency} consumers, queue size {self.maxsize})")
+
+    async def stop(self, timeout: float = 10.0):
+        """Drain the queue (up to timeout), then cancel tasks. Leftovers are swept on next start."""
+        if self.queue is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Post-quiz worker stopped with {self.queue.qsize()} attempts queued")
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        logger.info(f"Post-quiz worker stopped: {self.metrics()}")
+
+    # ==================== QUEUE ====================
+
+    def enqueue(self, attempt_id: int) -> bool:
+        """
+        Schedule processing of a finished attempt. Never blocks.
+        Returns False if the attempt was left for the sweep (worker not running or queue full).
+        """
+        if self.queue is None:
+            self.dropped += 1
+            return False
+        if attempt_id in self.pending:
+            return True
+        try:
+            self.queue.put_nowait(attempt_id)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.pending[attempt_id] = time.monotonic()
+        return True
+
+    async def _consume(self):
+        while True:
+            attempt_id = await self.queue.get()
+            try:
+                if await process_finished_attempt(attempt_id):
+                    self.processed += 1
+                    self._record_lag(attempt_id, time.monotonic() - self.pending.get(attempt_id, time.monotonic()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Left unprocessed in the database, the sweep will retry it
+                self.failed += 1
+                logger.error(f"Post-quiz processing failed for attempt {attempt_id}: {e}", exc_info=True)
+            finally:
+                self.pending.pop(attempt_id, None)
+                self.queue.task_done()
+
+    def _record_lag(self, attempt_id: int, lag: float):
+        """Lag = time from enqueue until processing finished"""
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.lag_warning:
+            logger.warning(f"Post-quiz processing of attempt {attempt_id} lagged {lag:.1f}s")
+
+    # ==================== SWEEP ====================
+
+    async def sweep(self, finished_before=None) -> int:
+        """Enqueue finished attempts that were never processed. Returns number enqueued."""
+        ids = await get_unprocessed_attempt_ids(limit=self.maxsize, finished_before=finished_before)
+        return sum(1 for attempt_id in ids if attempt_id not in self.pending and self.enqueue(attempt_id))
+
+    async def _sweep_loop(self):
+        # Startup: pick up everything left by the previous process
+        try:
+            count = await self.sweep()
+            if count:
+                logger.info(f"Post-quiz worker: resumed {count} unprocessed attempts")
+        except Exception as e:
+            logger.error(f"Post-quiz startup sweep failed: {e}", exc_info=True)
+
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                # Grace period so attempts that are already queued aren't enqueued twice
+                count = await self.sweep(finished_before=timezone.now() - timedelta(seconds=self.sweep_interval))
+                backlog, oldest_age = await get_post_quiz_backlog()
+                if count or backlog:
+                    level = logging.WARNING if oldest_age > self.lag_warning else logging.INFO
+                    logger.log(level, f"Post-quiz worker: {self.metrics()}, backlog={backlog}, "
+                                      f"oldest_unprocessed={oldest_age:.0f}s, swept={count}")
+                self.max_lag = 0.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Post-quiz sweep failed: {e}", exc_info=True)
+
+            try:
+                await refresh_stale_question_analytics()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Question analytics refresh failed: {e}", exc_info=True)
+
+    # ==================== METRICS ====================
+
+    def metrics(self) -> dict:
+        return {
+            'queued': self.queue.qsize() if self.queue else 0,
+            'processed': self.processed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'last_lag': round(self.last_lag, 3),
+            'max_lag': round(self.max_lag, 3),
+        }
+
+
+post_quiz_worker = PostQuizWorker()
+
+
+def enqueue_post_quiz(attempt_id: int) -> bool:
+    """Schedule streak/rating updates for a finished attempt"""
+    return post_quiz_worker.enqueue(attempt_id)
@@ -0,0 +1,201 @@
+"""
+Coalesced mentor notifications for anonymous questions.
+
+receive_question saves the question and hands it to the notifier. The first
+question for a mentor opens a window (QUESTION_DIGEST_WINDOW seconds, 0 =
+send right away); everything that arrives for the same mentor inside the
+window is sent as one digest message with a reply button per question, so a
+burst of questions after a lecture is one message instead of a burst that
+hits Telegram's per-chat limits. A digest is sent early once it holds
+max_batch questions.
+
+Question.notified_at is set after the digest is sent. On start, questions of
+the last resume_window that were never sent (restart inside a window) are
+sent again; pending digests are sent on stop.
+
+With sharded workers (UPDATE_ROLE=worker) each process keeps its own windows
+and students are spread over the workers, so one mentor can get up to one
+digest per worker for the same window.
+"""
+import asyncio
+import html
+import logging
+import os
+from collections import namedtuple
+from datetime import timedelta
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from django.utils import timezone
+
+from bot.texts import t
+from bot.keyboards.menus import question_reply_keyboard
+from bot.db import get_user_language, mark_questions_notified, get_unnotified_questions
+
+logger = logging.getLogger('studymate')
+
+QUESTION_DIGEST_WINDOW = float(os.getenv('QUESTION_DIGEST_WINDOW', '30'))
+
+# Same attribute names as Question, so keyboards accept both
+PendingQuestion = namedtuple('PendingQuestion', ['id', 'student_telegram_id', 'message_id', 'text'])
+
+# Telegram allows 4096 characters per message
+DIGEST_TEXT_BUDGET = 3500
+
+
+def build_question_digest(questions: list, lang: str) -> tuple[str, object]:
+    """Text and keyboard of a mentor notification for one or more questions"""
+    if len(questions) == 1:
+        # A single question keeps the original format
+        return t("anonymous_question", lang, text=html.escape(questions[0].text)), question_reply_keyboard(questions, lang)
+
+    limit = max(DIGEST_TEXT_BUDGET // len(questions), 100)
+    text = t("question_digest", lang, count=len(questions))
+    for number, question in enumerate(questions, 1):
+        body = question.text if len(question.text) <= limit else question.text[:limit] + "..."
+        text += f"<b>{number}.</b> {html.escape(body)}\n\n"
+    text += t("tap_number_to_reply", lang)
+    return text, question_reply_keyboard(questions, lang)
+
+
+async def send_question_digest(bot: Bot, mentor_telegram_id: int, questions: list, max_retries: int = 3) -> bool:
+    """Send one notification for the questions and mark them notified. Returns False if sending failed."""
+    lang = await get_user_language(mentor_telegram_id)
+    text, keyboard = build_question_digest(questions, lang)
+    for attempt in range(max_retries + 1):
+        try:
+            await bot.send_message(mentor_telegram_id, text, parse_mode="HTML", reply_markup=keyboard)
+            await mark_questions_notified([question.id for question in questions])
+            return True
+        except TelegramRetryAfter as e:
+            if attempt == max_retries:
+                return False
+            logger.warning(f"Question digest: flood limit for mentor {mentor_telegram_id}, waiting {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+    return False
+
+
+class QuestionNotifier:
+    """Per-mentor buffers of new questions flushed as digests"""
+
+    def __init__(self, window: float = QUESTION_DIGEST_WINDOW, max_batch: int = 10,
+                 resume_window: timedelta = timedelta(hours=24)):
+        self.window = window
+        self.max_batch = max_batch  # one reply button per question
+        self.resume_window = resume_window
+
+        self.bot: Bot | None = None
+        # mentor telegram_id -> questions waiting for the window to close
+        self.pending: dict[int, list[PendingQuestion]] = {}
+        self.timers: dict[int, asyncio.Task] = {}
+        self.sending: set[asyncio.Task] = set()
+        self._resume_task: asyncio.Task | None = None
+
+        # Metrics
+        self.questions = 0
+        self.digests = 0
+        self.failed = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self, bot: Bot, resume: bool = True):
+        """resume=False: leave unsent questions to another process (sharded workers)"""
+        self.bot = bot
+        if resume:
+            # Resume in the background so polling doesn't wait for the database
+            self._resume_task = asyncio.create_task(self._resume())
+        logger.info(f"Question notifier started (window {self.window}s)")
+
+    async def _resume(self):
+        try:
+            rows = await get_unnotified_questions(timezone.now() - self.resume_window)
+        except Exception as e:
+            logger.error(f"Question notifier: resume failed: {e}", exc_info=True)
+            return
+        for mentor_telegram_id, *question in rows:
+            batch = self.pending.setdefault(mentor_telegram_id, [])
+            # Questions that arrived since start are already buffered
+            if all(pending.id != question[0] for pending in batch):
+                batch.append(PendingQuestion(*question))
+        for mentor_telegram_id in {row[0] for row in rows}:
+            self._flush_soon(mentor_telegram_id)
+        if rows:
+            logger.info(f"Question notifier: resumed {len(rows)} questions")
+
+    async def stop(self):
+        """Send what is buffered right away"""
+        if self._resume_task is not None:
+            self._resume_task.cancel()
+            await asyncio.gather(self._resume_task, return_exceptions=True)
+            self._resume_task = None
+        for task in self.timers.values():
+            task.cancel()
+        self.timers = {}
+        for mentor_telegram_id in list(self.pending):
+            self._flush_soon(mentor_telegram_id)
+        await asyncio.gather(*self.sending, return_exceptions=True)
+        self.bot = None
+        logger.info(f"Question notifier stopped: {self.metrics()}")
+
+    # ==================== BUFFER ====================
+
+    def notify(self, mentor_telegram_id: int, question) -> bool:
+        """
+        Queue a new question for the mentor's next digest. Never blocks.
+        Returns False if the notifier is not running (caller sends it directly).
+        """
+        if self.bot is None:
+            return False
+        self.questions += 1
+        batch = self.pending.setdefault(mentor_telegram_id, [])
+        batch.append(PendingQuestion(question.id, question.student_telegram_id, question.message_id, question.text))
+        if self.window <= 0 or len(batch) >= self.max_batch:
+            self._flush_soon(mentor_telegram_id)
+        elif mentor_telegram_id not in self.timers:
+            self.timers[mentor_telegram_id] = asyncio.create_task(self._flush_later(mentor_telegram_id))
+        return True
+
+    async def _flush_later(self, mentor_telegram_id: int):
+        await asyncio.sleep(self.window)
+        self.timers.pop(mentor_telegram_id, None)
+        self._flush_soon(mentor_telegram_id)
+
+    def _flush_soon(self, mentor_telegram_id: int):
+        timer = self.timers.pop(mentor_telegram_id, None)
+        if timer is not None:
+            timer.cancel()
+        task = asyncio.create_task(self._flush(mentor_telegram_id))
+        self.sending.add(task)
+        task.add_done_callback(self.sending.discard)
+
+    async def _flush(self, mentor_telegram_id: int):
+        questions = self.pending.pop(mentor_telegram_id, [])
+        if not questions or self.bot is None:
+            return
+        try:
+            if await send_question_digest(self.bot, mentor_telegram_id, questions):
+                self.digests += 1
+                return
+            logger.warning(f"Question digest for mentor {mentor_telegram_id} not sent (flood limit)")
+        except Exception as e:
+            logger.error(f"Question digest for mentor {mentor_telegram_id} failed: {e}", exc_info=True)
+        # Left with notified_at unset, sent again on next start
+        self.failed += 1
+
+    # ==================== METRICS ====================
+
+    def metrics(self) -> dict:
+        return {
+            'buffered': sum(len(batch) for batch in self.pending.values()),
+            'questions': self.questions,
+            'digests': self.digests,
+            'failed': self.failed,
+        }
+
+
+question_notifier = QuestionNotifier()
+
+
+def notify_mentor(mentor_telegram_id: int, question) -> bool:
+    """Add a saved question to the mentor's next digest (False if the notifier isn't running)"""
+    return question_notifier.notify(mentor_telegram_id, question)
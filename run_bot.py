@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import logging
 import os
 import sys
@@ -6,18 +7,33 @@ import signal
 import platform
 from dotenv import load_dotenv
 
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.fsm.storage.redis import RedisStorage
-
 load_dotenv()
 
-import django
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.core.settings')
-django.setup()
+# First, so STARTUP_PROFILE=1 can time every import below
+from bot.utils.startup_profile import startup_profile
+startup_profile.install()
+
+with startup_profile.phase("import aiogram"):
+    from aiogram import Bot, Dispatcher
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+    from aiogram.fsm.storage.memory import MemoryStorage
+
+with startup_profile.phase("django.setup"):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.core.settings')
+    django.setup()
 
-from bot.handlers import routers
-from bot.middleware import StudentMentorCheckMiddleware, ErrorHandlerMiddleware, ThrottlingMiddleware
+with startup_profile.phase("import handlers"):
+    from bot.handlers import routers
+    from bot.middleware import StudentMentorCheckMiddleware, ErrorHandlerMiddleware, ThrottlingMiddleware
+
+with startup_profile.phase("import workers"):
+    from bot.workers.post_quiz import post_quiz_worker
+    from bot.workers.broadcast import broadcast_worker
+    from bot.workers.downloads import download_log
+    from bot.workers.question_digest import question_notifier
+startup_profile.mark("imports done")
 
 # ==================== LOGGING SETUP ====================
 
@@ -55,13 +71,111 @@ if not BOT_TOKEN:
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 USE_REDIS = os.getenv('USE_REDIS', 'true').lower() == 'true'
 
+# Bot API server, e.g. a local telegram-bot-api (default: api.telegram.org)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
+
+# Webhook mode (see bot/webhook.py) when WEBHOOK_URL is set, long polling otherwise
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram/webhook')
+# Derived from the token, so it stays the same across restarts and deploys
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET') or hashlib.sha256(f"webhook:{BOT_TOKEN}".encode()).hexdigest()
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('PORT') or os.getenv('WEBHOOK_PORT', '8080'))
+# Updates handled at the same time (both modes)
+UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', '50'))
+
+# Sharded processes (see bot/sharding.py and run_workers.py): "ingest" receives
+# updates into Redis streams, "worker" handles partitions of them. "single"
+# (default) receives and handles updates in this process.
+UPDATE_ROLE = os.getenv('UPDATE_ROLE', 'single')
+WORKERS = int(os.getenv('WORKERS', '1'))
+UPDATE_PARTITIONS = int(os.getenv('UPDATE_PARTITIONS', '64'))
+
+
+def _worker_index() -> int:
+    """WORKER_INDEX, or the dyno number on Heroku (worker.1 -> 0)"""
+    if os.getenv('WORKER_INDEX'):
+        return int(os.getenv('WORKER_INDEX'))
+    number = os.getenv('DYNO', '').rpartition('.')[2]
+    return int(number) - 1 if number.isdigit() else 0
+
+
+WORKER_INDEX = _worker_index()
+
+if UPDATE_ROLE not in ('single', 'ingest', 'worker'):
+    raise ValueError(f"UPDATE_ROLE must be single, ingest or worker, not {UPDATE_ROLE!r}")
+if UPDATE_ROLE != 'single' and not USE_REDIS:
+    raise ValueError("UPDATE_ROLE=ingest/worker needs Redis (USE_REDIS=true)")
+if UPDATE_ROLE == 'worker' and not 0 <= WORKER_INDEX < WORKERS:
+    raise ValueError(f"WORKER_INDEX {WORKER_INDEX} is not below WORKERS {WORKERS}")
+
 # ==================== MAIN ====================
 
+async def receive_updates(bot: Bot, dp: Dispatcher, publisher=None):
+    """
+    Long polling, or the webhook server when WEBHOOK_URL is set. Runs until cancelled.
+    With a publisher (UPDATE_ROLE=ingest) updates go to it instead of the handlers.
+    """
+    if not WEBHOOK_URL:
+        if publisher is not None:
+            dp.update.outer_middleware(publisher.middleware)
+        # getUpdates fails while a webhook is set (e.g. by a deployed instance)
+        await bot.delete_webhook()
+        # Signals are handled by main(), not by aiogram
+        await dp.start_polling(bot, handle_signals=False, tasks_concurrency_limit=UPDATE_CONCURRENCY)
+        return
+
+    from bot.webhook import WebhookServer
+    server = WebhookServer(dp, bot, WEBHOOK_URL, WEBHOOK_SECRET, path=WEBHOOK_PATH,
+                           concurrency=UPDATE_CONCURRENCY, max_pending=UPDATE_CONCURRENCY * 20,
+                           handler=publisher.handle if publisher is not None else None,
+                           has_room=publisher.has_room if publisher is not None else None)
+    await server.start(WEBHOOK_HOST, WEBHOOK_PORT)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+async def run_updates(bot: Bot, dp: Dispatcher):
+    """
+    Receive and/or handle updates as UPDATE_ROLE says. Runs until cancelled, or
+    raises when a worker stopped reading its streams (the process should restart).
+    """
+    if UPDATE_ROLE == 'single':
+        await receive_updates(bot, dp)
+        return
+
+    from backend.core.redis_client import create_async_redis
+    from bot.sharding import UpdatePublisher, UpdateConsumer
+    redis = create_async_redis()
+    try:
+        if UPDATE_ROLE == 'ingest':
+            publisher = UpdatePublisher(redis, UPDATE_PARTITIONS)
+            await publisher.start()
+            try:
+                await receive_updates(bot, dp, publisher)
+            finally:
+                await publisher.stop()
+        else:
+            consumer = UpdateConsumer(dp, bot, redis, WORKER_INDEX, WORKERS, UPDATE_PARTITIONS,
+                                      concurrency=UPDATE_CONCURRENCY, max_pending=UPDATE_CONCURRENCY * 20)
+            await consumer.start()
+            try:
+                await consumer.wait()
+            finally:
+                await consumer.stop()
+    finally:
+        await redis.aclose()
+
+
 async def main():
     # Setup storage
     if USE_REDIS:
         try:
             import ssl
+            # Imported only when used (the redis client is a sizeable import)
+            from aiogram.fsm.storage.redis import RedisStorage
             from redis.asyncio import Redis
 
             # Configure SSL for Heroku Redis (uses self-signed certs)
@@ -95,9 +209,17 @@ async def main():
         logger.warning("Using MemoryStorage - FSM state will be lost on restart!")
         storage = MemoryStorage()
 
-    bot = Bot(token=BOT_TOKEN)
+    session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None
+    bot = Bot(token=BOT_TOKEN, session=session)
     dp = Dispatcher(storage=storage)
 
+    if startup_profile.enabled:
+        async def on_startup():
+            startup_profile.mark("receiving updates")
+
+        dp.update.outer_middleware(startup_profile.first_update_middleware)
+        dp.startup.register(on_startup)
+
     # Add middlewares (order matters!)
     # 1. Throttling first - prevents spam before processing
     dp.message.middleware(ThrottlingMiddleware(rate_limit=0.5))
@@ -118,10 +240,37 @@ async def main():
     logger.info("Bot is starting...")
     logger.info(f"Platform: {platform.system()}")
     logger.info(f"Storage: {type(storage).__name__}")
+    if UPDATE_ROLE == 'worker':
+        logger.info(f"Updates: worker {WORKER_INDEX + 1} of {WORKERS} (concurrency {UPDATE_CONCURRENCY})")
+    else:
+        logger.info(f"Updates: {'webhook' if WEBHOOK_URL else 'long polling'}"
+                    f"{' into Redis streams' if UPDATE_ROLE == 'ingest' else ''} (concurrency {UPDATE_CONCURRENCY})")
+
+    # Background jobs run where updates are handled. Broadcasts (one rate limit
+    # per bot), download rollups (concurrent rollups of a day conflict) and
+    # resuming unsent questions run in one process only.
+    handles_updates = UPDATE_ROLE != 'ingest'
+    primary = UPDATE_ROLE == 'single' or (UPDATE_ROLE == 'worker' and WORKER_INDEX == 0)
     logger.info(f"Handlers registered: {len(routers)} routers")
 
+    with startup_profile.phase("start workers"):
+        if handles_updates:
+            # Background streak/rating updates after quizzes
+            await post_quiz_worker.start()
+            # Batched download logging and daily rollups
+            await download_log.start(rollups=primary, all_processes=UPDATE_ROLE == 'worker')
+            # Anonymous questions sent to mentors as digests
+            await question_notifier.start(bot, resume=primary)
+        if primary:
+            # Broadcast sending (resumes broadcasts interrupted by a restart, and
+            # picks up the ones other workers created)
+            await broadcast_worker.start(bot, poll_interval=5.0 if UPDATE_ROLE == 'worker' else None)
+    startup_profile.mark("workers started")
+
     # Setup graceful shutdown (platform-specific)
     is_windows = platform.system() == 'Windows'
+    # Exit status 1 when updates stopped on an error, so a supervisor restarts the bot
+    failed = False
 
     if not is_windows:
         # Unix-like systems: use signal handlers
@@ -136,49 +285,68 @@ async def main():
             loop.add_signal_handler(sig, lambda s=sig: signal_handler(s))
 
         try:
-            # Start polling in background
-            polling_task = asyncio.create_task(dp.start_polling(bot))
+            # Receive updates in background
+            updates_task = asyncio.create_task(run_updates(bot, dp))
 
-            # Wait for shutdown signal
-            await shutdown_event.wait()
+            # Wait for shutdown signal (or the task failing)
+            shutdown_task = asyncio.create_task(shutdown_event.wait())
+            await asyncio.wait([updates_task, shutdown_task], return_when=asyncio.FIRST_COMPLETED)
+            shutdown_task.cancel()
 
-            logger.info("Stopping polling...")
-            polling_task.cancel()
+            logger.info("Stopping updates...")
+            updates_task.cancel()
 
             try:
-                await polling_task
+                await updates_task
             except asyncio.CancelledError:
                 pass
 
         except Exception as e:
+            failed = True
             logger.error(f"Error during bot execution: {e}", exc_info=True)
     else:
         # Windows: use try/except for KeyboardInterrupt
         logger.info("Running on Windows - using Ctrl+C for shutdown")
         try:
-            await dp.start_polling(bot)
+            await run_updates(bot, dp)
         except asyncio.CancelledError:
-            logger.info("Polling cancelled")
+            logger.info("Updates cancelled")
         except Exception as e:
+            failed = True
             logger.error(f"Error during bot execution: {e}", exc_info=True)
 
     # Cleanup (common for all platforms)
+    if handles_updates:
+        await post_quiz_worker.stop()
+        await download_log.stop()
+        await question_notifier.stop()
+    if primary:
+        await broadcast_worker.stop()
+    # Quiz results exports (only loaded if a mentor exported something)
+    exports = sys.modules.get('bot.workers.exports')
+    if exports is not None:
+        await exports.export_worker.stop()
+
     logger.info("Closing bot session...")
     await bot.session.close()
 
     # Close Redis storage if used
-    if USE_REDIS and isinstance(storage, RedisStorage):
+    if USE_REDIS and not isinstance(storage, MemoryStorage):
         try:
             await storage.close()
             logger.info("Redis storage closed")
         except:
             pass
 
+    if failed:
+        logger.error("Bot stopped after an error")
+        return 1
     logger.info("Bot stopped successfully")
+    return 0
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        sys.exit(asyncio.run(main()))
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
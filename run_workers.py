@@ -0,0 +1,79 @@
+"""
+Run the bot as one ingest process and N worker processes (see bot/sharding.py).
+
+    python run_workers.py              # one worker per CPU core
+    python run_workers.py --workers 4
+
+Every process is `python run_bot.py` with UPDATE_ROLE, WORKERS and
+WORKER_INDEX set. A process that exits is started again after a second.
+SIGTERM / SIGINT are passed on to all of them, and this script waits for
+them to finish their shutdown.
+
+Needs Redis (REDIS_URL). On Heroku run the roles as separate dynos instead:
+
+    ingest: UPDATE_ROLE=ingest python run_bot.py
+    worker: UPDATE_ROLE=worker python run_bot.py    # WORKERS = number of worker dynos
+"""
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('run_workers')
+
+RUN_BOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'run_bot.py')
+
+
+def spawn(name: str, role: str, workers: int, index: int = 0) -> subprocess.Popen:
+    env = dict(os.environ, UPDATE_ROLE=role, WORKERS=str(workers), WORKER_INDEX=str(index))
+    process = subprocess.Popen([sys.executable, RUN_BOT], env=env)
+    logger.info(f"Started {name} (pid {process.pid})")
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one ingest process and N update workers")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WORKERS') or os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    # name -> (role, index)
+    roles = {f"worker {i + 1}/{args.workers}": ('worker', i) for i in range(args.workers)}
+    roles['ingest'] = ('ingest', 0)
+    processes = {name: spawn(name, role, args.workers, index) for name, (role, index) in roles.items()}
+
+    stopping = False
+
+    def stop(sig, frame):
+        nonlocal stopping
+        stopping = True
+        logger.info(f"Received {signal.Signals(sig).name}, stopping {len(processes)} processes...")
+        for process in processes.values():
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        time.sleep(1)
+        for name, process in processes.items():
+            if not stopping and process.poll() is not None:
+                logger.warning(f"{name} exited with code {process.returncode}, restarting")
+                role, index = roles[name]
+                processes[name] = spawn(name, role, args.workers, index)
+
+    for process in processes.values():
+        process.wait()
+    logger.info("All processes stopped")
+
+
+if __name__ == '__main__':
+    main()
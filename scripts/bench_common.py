@@ -0,0 +1,51 @@
+"""
+Shared setup for the benchmark scripts in this directory.
+
+Benchmarks run against a throwaway SQLite database by default, so they never
+touch real data. Set BENCH_DATABASE_URL to benchmark against e.g. a scratch
+PostgreSQL database instead (it will be migrated and filled with fake rows).
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """Point Django at the benchmark database, migrate it and return its URL"""
+    sys.path.insert(0, ROOT)
+    database_url = os.getenv('BENCH_DATABASE_URL')
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix='studymate-bench-'), 'bench.sqlite3')
+        database_url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('USE_REDIS', 'false')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.core.settings')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return database_url
+
+
+def measure(fn, repeat: int = 5) -> dict:
+    """Run fn repeat times, return best/median wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {'best': min(timings), 'median': statistics.median(timings)}
+
+
+def report(label: str, result: dict, baseline: dict = None):
+    line = f"{label:<40} best {result['best']:9.2f} ms   median {result['median']:9.2f} ms"
+    if baseline:
+        line += f"   x{baseline['median'] / max(result['median'], 1e-9):.1f}"
+    print(line)
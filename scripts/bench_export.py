@@ -0,0 +1,120 @@
+"""
+Benchmark: quiz results export.
+
+Fills the database with --attempts finished attempts of --students students
+over --quizzes quizzes of one mentor and exports all of them into one file:
+ORM objects with select_related + CSV built in StringIO and encoded (the old
+export) vs values_list().iterator() streamed through gzip to disk. Reports
+time and peak Python memory (tracemalloc) of each, and the file sizes.
+
+Usage:
+    python scripts/bench_export.py [--attempts 100000] [--quizzes 20] [--students 2000]
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import tempfile
+import tracemalloc
+from datetime import timedelta
+
+from bench_common import setup_django, measure, report
+
+
+def fill(attempts: int, quizzes: int, students: int):
+    from django.db import transaction
+    from django.utils import timezone
+    from backend.mentors.models import Mentor
+    from backend.quizzes.models import Quiz, QuizAttempt
+    from backend.students.models import Student
+
+    rnd = random.Random(42)
+    now = timezone.now()
+    with transaction.atomic():
+        mentor = Mentor.objects.create(telegram_id=1, name="M", group_chat_id=-1)
+        quiz_objs = Quiz.objects.bulk_create([Quiz(mentor=mentor, title=f"Quiz {i}") for i in range(quizzes)])
+        student_objs = Student.objects.bulk_create([
+            Student(telegram_id=1000 + i, mentor=mentor, first_name=f"First{i}", last_name=f"Last{i}",
+                    username=f"user{i}", full_name=f"First{i} Last{i}")
+            for i in range(students)
+        ], batch_size=1000)
+        rows = []
+        for i in range(attempts):
+            finished = now - timedelta(minutes=i)
+            rows.append(QuizAttempt(student=rnd.choice(student_objs), quiz=rnd.choice(quiz_objs),
+                                    score=rnd.randint(0, 20), total=20, finished_at=finished))
+            if len(rows) == 5000:
+                QuizAttempt.objects.bulk_create(rows)
+                rows = []
+        QuizAttempt.objects.bulk_create(rows)
+    return mentor
+
+
+def export_in_memory(mentor) -> bytes:
+    """The previous export: model instances and the whole file in memory"""
+    from backend.quizzes.models import QuizAttempt
+    from backend.quizzes.exports import RESULT_COLUMNS
+
+    attempts = list(QuizAttempt.objects.filter(quiz__mentor=mentor, finished_at__isnull=False)
+                    .select_related('student', 'quiz').order_by('quiz_id', 'finished_at'))
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(RESULT_COLUMNS)
+    for attempt in attempts:
+        student = attempt.student
+        writer.writerow([
+            attempt.quiz.title, student.telegram_id, student.full_name or "", student.username or "",
+            student.first_name or "", student.last_name or "", attempt.score, attempt.total,
+            attempt.started_at.isoformat() if attempt.started_at else "",
+            attempt.finished_at.isoformat() if attempt.finished_at else "",
+        ])
+    return output.getvalue().encode("utf-8")
+
+
+def peak_memory(fn) -> float:
+    """Peak traced allocations of one call, MiB"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attempts', type=int, default=100000)
+    parser.add_argument('--quizzes', type=int, default=20)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    from django.db import connection
+    from backend.quizzes.exports import results_queryset, write_results_csv
+
+    print(f"Database: {database_url} ({connection.vendor})")
+    print(f"{args.attempts} attempts, {args.quizzes} quizzes, {args.students} students\n")
+    mentor = fill(args.attempts, args.quizzes, args.students)
+    path = os.path.join(tempfile.mkdtemp(prefix='studymate-bench-'), 'export.csv.gz')
+
+    def in_memory():
+        return export_in_memory(mentor)
+
+    def streamed():
+        return write_results_csv(path, results_queryset(mentor.id))
+
+    assert streamed() == args.attempts
+    base = measure(in_memory, args.repeat)
+    report("in memory (ORM + StringIO)", base)
+    report("streamed gzip (values_list iterator)", measure(streamed, args.repeat), base)
+
+    print(f"\nPeak memory: in memory {peak_memory(in_memory):.1f} MiB, "
+          f"streamed {peak_memory(streamed):.1f} MiB")
+    print(f"File size: csv {len(in_memory()) / 2 ** 20:.1f} MiB, "
+          f"csv.gz {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
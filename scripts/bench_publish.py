@@ -0,0 +1,102 @@
+"""
+Benchmark: publishing and reordering a large quiz.
+
+Compares the previous approach (quiz.save() then one create_quiz_question
+call per question, each its own executor hop and autocommit; shuffle with
+one save() per question) with publish_quiz (one transaction, bulk_create)
+and the bulk_update shuffle.
+
+Usage:
+    python scripts/bench_publish.py [--questions 500]
+"""
+import argparse
+import asyncio
+
+from bench_common import setup_django, measure, report
+
+
+def make_questions(count: int) -> list:
+    return [
+        {
+            "text": f"Question {i}?",
+            "option_a": "Alpha", "option_b": "Beta", "option_c": "Gamma", "option_d": "Delta",
+            "correct": "ABCD"[i % 4],
+            "time_bonus": 0,
+        }
+        for i in range(count)
+    ]
+
+
+async def legacy_publish(mentor, questions):
+    from asgiref.sync import sync_to_async
+    from bot.db import Quiz, create_quiz_question
+
+    quiz = Quiz(mentor=mentor, title="Legacy", quiz_type='practice', max_attempts=999, is_active=True)
+    await sync_to_async(quiz.save)()
+    for i, q in enumerate(questions, 1):
+        await create_quiz_question(
+            quiz=quiz,
+            question_text=q["text"],
+            option_a=q["option_a"],
+            option_b=q["option_b"],
+            option_c=q["option_c"],
+            option_d=q["option_d"],
+            correct_answer=q["correct"],
+            order=i,
+            time_bonus=q.get("time_bonus", 0)
+        )
+    return quiz
+
+
+async def bulk_publish(mentor, questions):
+    from bot.db import publish_quiz
+
+    return await publish_quiz(mentor, "Bulk", questions, quiz_type='practice', max_attempts=999, is_active=True)
+
+
+def legacy_shuffle(quiz):
+    import random
+    from backend.quizzes.models import QuizQuestion
+
+    questions = list(QuizQuestion.objects.filter(quiz=quiz))
+    random.shuffle(questions)
+    for i, question in enumerate(questions, 1):
+        question.order = i
+        question.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    from backend.mentors.models import Mentor
+    from backend.quizzes.models import QuizQuestion
+    from bot.db import shuffle_quiz_questions
+
+    print(f"Database: {database_url}")
+    print(f"{args.questions} questions per quiz\n")
+
+    mentor = Mentor.objects.create(telegram_id=1, name='Bench', group_chat_id=-1)
+    questions = make_questions(args.questions)
+
+    quizzes = []
+    base = measure(lambda: quizzes.append(asyncio.run(legacy_publish(mentor, questions))), args.repeat)
+    report("publish, one call per question", base)
+    report("publish_quiz (bulk, one transaction)",
+           measure(lambda: quizzes.append(asyncio.run(bulk_publish(mentor, questions))), args.repeat), base)
+    assert all(QuizQuestion.objects.filter(quiz=quiz).count() == args.questions for quiz in quizzes)
+
+    quiz = quizzes[-1]
+    base = measure(lambda: legacy_shuffle(quiz), args.repeat)
+    report("shuffle, save() per question", base)
+    report("shuffle, bulk_update",
+           measure(lambda: asyncio.run(shuffle_quiz_questions(quiz)), args.repeat), base)
+    orders = sorted(QuizQuestion.objects.filter(quiz=quiz).values_list('order', flat=True))
+    assert orders == list(range(1, args.questions + 1))
+
+
+if __name__ == '__main__':
+    main()
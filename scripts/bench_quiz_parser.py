@@ -0,0 +1,160 @@
+"""
+Benchmark: quiz file parser.
+
+Compares the previous regex parser (DOTALL lazy match with a lookahead per
+question, then re-matching every line) with the single-pass line parser in
+bot/utils/quiz_parser.py, on realistic and adversarial inputs. Both parsers
+must return the same result for every valid input.
+
+Usage:
+    python scripts/bench_quiz_parser.py [--questions 10000]
+"""
+import argparse
+import io
+import random
+import re
+import sys
+
+from bench_common import ROOT, measure, report
+
+sys.path.insert(0, ROOT)
+
+
+def legacy_parse_quiz_file(content: str) -> dict:
+    """Parser as it was before the line-oriented rewrite"""
+    lines = content.strip().split('\n')
+    result = {"title": None, "topic": None, "questions": []}
+
+    if lines:
+        topic_match = re.match(r'^(Тема|Topic|Tema):\s*(.+)$', lines[0].strip(), re.IGNORECASE)
+        if topic_match:
+            result["topic"] = topic_match.group(2).strip()
+            result["title"] = result["topic"]
+            lines = lines[1:]
+
+    content = '\n'.join(lines)
+    question_pattern = r'(\d+)(#{1,2})?\.\s*(.+?)(?=\n\d+(?:#{1,2})?\.|$)'
+    questions_raw = re.findall(question_pattern, content, re.DOTALL)
+    if not questions_raw:
+        raise ValueError("No questions found in file")
+
+    for q_num, q_marks, q_content in questions_raw:
+        q_lines = q_content.strip().split('\n')
+        if len(q_lines) < 2:
+            raise ValueError(f"Question {q_num} has insufficient content")
+
+        question_lines = []
+        option_start_index = None
+        for i, line in enumerate(q_lines):
+            line = line.strip()
+            if not line:
+                question_lines.append('')
+                continue
+            if re.match(r'^([A-D])(\*)?\)\s*', line, re.IGNORECASE):
+                option_start_index = i
+                break
+            question_lines.append(line)
+
+        if not question_lines:
+            raise ValueError(f"Question {q_num} has no text")
+        if option_start_index is None:
+            raise ValueError(f"Question {q_num} has no options")
+
+        options = {"A": None, "B": None, "C": None, "D": None}
+        correct_answer = None
+        for line in q_lines[option_start_index:]:
+            line = line.strip()
+            if not line:
+                continue
+            option_match = re.match(r'^([A-D])(\*)?\)\s*(.+)$', line, re.IGNORECASE)
+            if option_match:
+                letter = option_match.group(1).upper()
+                options[letter] = option_match.group(3).strip()
+                if option_match.group(2) == '*':
+                    correct_answer = letter
+
+        for letter in ["A", "B", "C", "D"]:
+            if options[letter] is None:
+                raise ValueError(f"Question {q_num} missing option {letter}")
+        if correct_answer is None:
+            raise ValueError(f"Question {q_num} has no correct answer marked with *")
+
+        result["questions"].append({
+            "text": '\n'.join(question_lines).strip(),
+            "option_a": options["A"],
+            "option_b": options["B"],
+            "option_c": options["C"],
+            "option_d": options["D"],
+            "correct": correct_answer,
+            "time_bonus": {"#": 5, "##": 10}.get(q_marks, 0)
+        })
+
+    if not result["questions"]:
+        raise ValueError("No valid questions parsed")
+    return result
+
+
+def question_block(number: int, text: str, marks: str = "") -> str:
+    correct = "ABCD"[number % 4]
+    options = "\n".join(
+        f"{letter}{'*' if letter == correct else ''}) Option {letter} for question {number}"
+        for letter in "ABCD"
+    )
+    return f"{number}{marks}. {text}\n{options}\n"
+
+
+def realistic_bank(questions: int) -> str:
+    """Short questions, some multi-line code blocks, some with time bonus markers"""
+    random.seed(1)
+    blocks = ["Тема: Python"]
+    for n in range(1, questions + 1):
+        if n % 10 == 0:
+            text = "What does this print?\n\ndef f(x):\n    return x * 2\n\nprint(f(21))"
+        else:
+            text = f"Question {n}: " + " ".join(random.choice(["list", "dict", "tuple", "set", "loop"]) for _ in range(12))
+        blocks.append(question_block(n, text, random.choice(["", "", "#", "##"])))
+    return "\n".join(blocks)
+
+
+def long_text_bank(questions: int, text_lines: int) -> str:
+    """Few questions with very long code listings (lazy .+? crawls through them)"""
+    code = "\n".join(f"    x{i} = compute({i}, 'value {i}')" for i in range(text_lines))
+    return "\n".join(question_block(n, f"Read the code:\n{code}") for n in range(1, questions + 1))
+
+
+def numeric_lines_bank(questions: int) -> str:
+    """Adversarial: question texts full of indented numbered lines that are not question starts"""
+    steps = "\n".join(f"  {i}. step {i}" for i in range(1, 200))
+    return "\n".join(question_block(n, f"Order the steps:\n{steps}") for n in range(1, questions + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    from bot.utils.quiz_parser import parse_quiz_file
+
+    inputs = [
+        (f"realistic, {args.questions} questions", realistic_bank(args.questions)),
+        ("long code listings, 20 x 5000 lines", long_text_bank(20, 5000)),
+        ("indented numbered lines, 500 questions", numeric_lines_bank(500)),
+    ]
+
+    for label, content in inputs:
+        size = len(content.encode('utf-8')) / 1024 / 1024
+        print(f"\n{label} ({size:.1f} MB)")
+        expected = legacy_parse_quiz_file(content)
+        assert parse_quiz_file(content) == expected, "parsers disagree"
+        data = content.encode('utf-8')
+        stream = lambda: parse_quiz_file(io.BytesIO(data))
+        assert stream() == expected, "streamed parse disagrees"
+
+        base = measure(lambda: legacy_parse_quiz_file(data.decode('utf-8')), args.repeat)
+        report("  regex parser (decode + parse)", base)
+        report("  line parser (streamed)", measure(stream, args.repeat), base)
+
+
+if __name__ == '__main__':
+    main()
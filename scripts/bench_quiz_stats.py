@@ -0,0 +1,106 @@
+"""
+Benchmark: quiz statistics over first attempts.
+
+Compares the previous approach (MIN(started_at) per student, then one
+Q(student_id=…, started_at=…) OR-branch per student) with the
+is_first_attempt flag + partial index.
+
+Usage:
+    python scripts/bench_quiz_stats.py [--quizzes 10] [--attempts 2000]
+"""
+import argparse
+import random
+from datetime import timedelta
+
+from bench_common import setup_django, measure, report
+
+
+def legacy_quiz_stats(quiz_ids):
+    from django.db.models import Avg, Count, Min, Q
+    from backend.quizzes.models import QuizAttempt
+
+    first_attempts = QuizAttempt.objects.filter(
+        quiz_id__in=quiz_ids, finished_at__isnull=False
+    ).values('quiz_id', 'student_id').annotate(first_started=Min('started_at'))
+
+    conditions = Q()
+    for fa in first_attempts:
+        conditions |= Q(quiz_id=fa['quiz_id'], student_id=fa['student_id'], started_at=fa['first_started'])
+
+    return list(QuizAttempt.objects.filter(
+        quiz_id__in=quiz_ids, finished_at__isnull=False
+    ).filter(conditions).values('quiz_id').annotate(attempts=Count('id'), avg_score=Avg('score')))
+
+
+def flagged_quiz_stats(quiz_ids):
+    from django.db.models import Avg, Count
+    from backend.quizzes.models import QuizAttempt
+
+    return list(QuizAttempt.objects.filter(
+        quiz_id__in=quiz_ids, is_first_attempt=True
+    ).values('quiz_id').annotate(attempts=Count('id'), avg_score=Avg('score')).order_by())
+
+
+def populate(quizzes: int, attempts: int):
+    from django.db.models import F
+    from django.utils import timezone
+    from backend.mentors.models import Mentor
+    from backend.students.models import Student
+    from backend.quizzes.models import Quiz, QuizAttempt
+
+    random.seed(42)
+    mentor = Mentor.objects.create(telegram_id=1, name='Bench', group_chat_id=-1)
+    # ~1.3 attempts per student: most students have one attempt, some retry
+    students = Student.objects.bulk_create([
+        Student(telegram_id=1000 + i, full_name=f'Student {i}', mentor=mentor)
+        for i in range(int(attempts / 1.3))
+    ])
+    now = timezone.now()
+    quiz_ids = []
+    for q in range(quizzes):
+        quiz = Quiz.objects.create(mentor=mentor, title=f'Quiz {q}')
+        quiz_ids.append(quiz.id)
+        rows = []
+        for i in range(attempts):
+            student = students[i % len(students)]
+            rows.append(QuizAttempt(
+                student=student, quiz=quiz, score=random.randint(0, 20), total=20,
+                finished_at=now - timedelta(minutes=attempts - i),
+                is_first_attempt=i < len(students)
+            ))
+        QuizAttempt.objects.bulk_create(rows, batch_size=1000)
+    # started_at is auto_now_add, so set it afterwards
+    QuizAttempt.objects.update(started_at=F('finished_at') - timedelta(minutes=5))
+    return quiz_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quizzes', type=int, default=10)
+    parser.add_argument('--attempts', type=int, default=2000, help="Attempts per quiz")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    from django.db import DatabaseError
+    print(f"Database: {database_url}")
+    quiz_ids = populate(args.quizzes, args.attempts)
+    print(f"{args.quizzes} quizzes x {args.attempts} attempts\n")
+
+    for label, ids in (("one quiz", quiz_ids[:1]), (f"{len(quiz_ids)} quizzes", quiz_ids)):
+        flagged = sorted((r['quiz_id'], r['attempts']) for r in flagged_quiz_stats(ids))
+        try:
+            legacy = sorted((r['quiz_id'], r['attempts']) for r in legacy_quiz_stats(ids))
+        except DatabaseError as e:
+            # SQLite rejects the OR tree outright beyond ~1000 students
+            print(f"{label + ', OR-of-Q':<40} failed: {e}")
+            base = None
+        else:
+            assert legacy == flagged, "legacy and flagged results differ"
+            base = measure(lambda: legacy_quiz_stats(ids), args.repeat)
+            report(f"{label}, OR-of-Q", base)
+        report(f"{label}, is_first_attempt", measure(lambda: flagged_quiz_stats(ids), args.repeat), base)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: screen rendering (texts + keyboards), no database or network.
+
+Renders typical screens --renders times each, the way the handlers did it
+before the compiled text catalog and the cached keyboards (t() looking up
+TEXTS and formatting with **kwargs, menus built as new aiogram objects on
+every call, the quiz answer row rebuilt for every countdown edit) and the way
+they do now. The quiz question screen includes its 30 countdown edits. The
+materials page is built per request either way and serves as the control.
+
+Usage:
+    python scripts/bench_render.py [--renders 10000]
+"""
+import argparse
+import sys
+from collections import namedtuple
+
+from bench_common import ROOT, measure, report
+
+sys.path.insert(0, ROOT)
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup  # noqa: E402
+
+from bot.keyboards import menus  # noqa: E402
+from bot.texts import TEXTS, DEFAULT_LANG, CATALOG_PROBLEMS, t  # noqa: E402
+from bot.utils.pagination import Page  # noqa: E402
+
+COUNTDOWN_TICKS = 30
+Topic = namedtuple('Topic', ['pk', 'id', 'name'])
+Question = namedtuple('Question', ['id', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d'])
+
+
+def old_t(key: str, lang: str = None, **kwargs) -> str:
+    """t() before the compiled catalog"""
+    if lang is None:
+        lang = DEFAULT_LANG
+    text = TEXTS.get(lang, TEXTS[DEFAULT_LANG]).get(key, key)
+    return text.format(**kwargs) if kwargs else text
+
+
+def old_answer_keyboard(attempt_id: int, question_id: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text=letter, callback_data=f"ans_{attempt_id}_{question_id}_{letter}")
+        for letter in "ABCD"
+    ]])
+
+
+def screens(lang: str, old: bool) -> dict:
+    """Screen name -> function rendering it once"""
+    text = old_t if old else t
+    keyboard = (lambda build: build.__wrapped__) if old else (lambda build: build)
+    mentor_menu, student_menu, cancel_menu = (
+        keyboard(menus.mentor_menu), keyboard(menus.student_menu), keyboard(menus.cancel_menu)
+    )
+    page = Page([Topic(i, i, f"Topic {i}") for i in range(5)], 42, 2, 5)
+    counts = {i: i * 3 for i in range(5)}
+    question = Question(7, "What is 2 + 2?", "3", "4", "5", "22")
+
+    def main_menu():
+        return text("welcome_student", lang, name="Mentor"), student_menu(lang)
+
+    def mentor_home():
+        return text("welcome_mentor", lang, name="Mentor"), mentor_menu(lang)
+
+    def ask_question():
+        return text("write_question", lang), cancel_menu(lang)
+
+    def materials():
+        return text("lesson_materials", lang), menus.topics_for_view(page, counts, lang)
+
+    def quiz_question():
+        base = text("quiz_question", lang, current=3, total=20, text=question.question_text,
+                    a=question.option_a, b=question.option_b, c=question.option_c, d=question.option_d)
+        if old:
+            for remaining in range(COUNTDOWN_TICKS, 0, -1):
+                _ = (base + f"\n\n⏱ {remaining} {old_t('quiz_seconds', lang)}",
+                     old_answer_keyboard(1, question.id))
+        else:
+            markup = menus.quiz_answer_keyboard(1, question.id)
+            seconds = t('quiz_seconds', lang)
+            for remaining in range(COUNTDOWN_TICKS, 0, -1):
+                _ = (base + f"\n\n⏱ {remaining} {seconds}", markup)
+
+    return {
+        'student main menu': main_menu,
+        'mentor main menu': mentor_home,
+        'ask question (cancel menu)': ask_question,
+        'materials page': materials,
+        f'quiz question + {COUNTDOWN_TICKS} ticks': quiz_question,
+    }
+
+
+def repeated(render, times: int):
+    def run():
+        for _ in range(times):
+            render()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--renders', type=int, default=10000)
+    parser.add_argument('--lang', default='en')
+    args = parser.parse_args()
+
+    print(f"Text catalog problems: {len(CATALOG_PROBLEMS)}")
+    for problem in CATALOG_PROBLEMS:
+        print(f"  {problem}")
+    print(f"{args.renders} renders per screen, lang={args.lang}\n")
+
+    old_screens, new_screens = screens(args.lang, old=True), screens(args.lang, old=False)
+    for name in old_screens:
+        before = measure(repeated(old_screens[name], args.renders))
+        after = measure(repeated(new_screens[name], args.renders))
+        report(f"{name} (before)", before)
+        report(f"{name} (after)", after, baseline=before)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: mentor search over materials, quizzes and students.
+
+Fills the database with --rows objects (40% materials, 20% quizzes, 40%
+students) spread over --mentors mentors and compares unindexed icontains
+lookups with the indexed search (FTS5 on SQLite, pg_trgm on PostgreSQL via
+BENCH_DATABASE_URL). Also checks that both find the same objects.
+
+Usage:
+    python scripts/bench_search.py [--rows 100000] [--mentors 10]
+"""
+import argparse
+import random
+
+from bench_common import setup_django, measure, report
+
+WORDS = [
+    "html", "css", "python", "django", "algebra", "geometry", "physics", "history", "biology", "chemistry",
+    "введение", "основы", "практика", "лекция", "задачи", "экзамен", "повторение", "контрольная",
+    "tiykarları", "sabaq", "tapsırma", "imtixan",
+]
+FIRST_NAMES = ["Иван", "Алибек", "Нурлан", "Мария", "Aziz", "Dilnoza", "Timur", "Gulnara", "Bakhrom", "Elena"]
+LAST_NAMES = ["Петров", "Каримов", "Юсупов", "Smith", "Nazarova", "Rakhimov", "Sultanova", "Abdullaev"]
+
+
+def fill(rows: int, mentors: int):
+    from django.db import transaction
+    from backend.mentors.models import Mentor
+    from backend.materials.models import Topic, Material
+    from backend.quizzes.models import Quiz
+    from backend.students.models import Student
+
+    rnd = random.Random(42)
+
+    def title():
+        return " ".join(rnd.sample(WORDS, 3)) + f" {rnd.randint(1, 999)}"
+
+    with transaction.atomic():
+        mentor_objs = [Mentor.objects.create(telegram_id=i + 1, name=f"M{i}", group_chat_id=-i - 1)
+                       for i in range(mentors)]
+        topics = [Topic.objects.create(mentor=mentor, name=f"T{j}") for mentor in mentor_objs for j in range(10)]
+        Material.objects.bulk_create([
+            Material(topic=rnd.choice(topics), title=title(), file_id="x", file_name=f"f{i}.pdf")
+            for i in range(rows * 4 // 10)
+        ], batch_size=1000)
+        Quiz.objects.bulk_create([
+            Quiz(mentor=rnd.choice(mentor_objs), title=title(), topic=rnd.choice(WORDS))
+            for _ in range(rows * 2 // 10)
+        ], batch_size=1000)
+        Student.objects.bulk_create([
+            Student(telegram_id=1000 + i, mentor=rnd.choice(mentor_objs),
+                    first_name=rnd.choice(FIRST_NAMES), last_name=rnd.choice(LAST_NAMES),
+                    username=f"user{i}")
+            for i in range(rows * 4 // 10)
+        ], batch_size=1000)
+    return mentor_objs[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--mentors', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    from django.db import connection
+    from backend.search.index import search, _search_fallback
+    from backend.students.models import Student
+
+    print(f"Database: {database_url} ({connection.vendor})")
+    print(f"{args.rows} rows, {args.mentors} mentors\n")
+    mentor = fill(args.rows, args.mentors)
+
+    username = Student.objects.filter(mentor=mentor).order_by('-id').values_list('username', flat=True).first()
+    for query in ["python", "экзамен лекция", "Каримов", username, "nothinglikethis"]:
+        found = {(r.kind, r.id) for r in search(mentor.id, query, limit=1000)}
+        expected = {(r.kind, r.id) for r in _search_fallback(mentor.id, query, limit=100000)}
+        if ' ' not in query:
+            # Prefix/trigram match finds at least every substring match of a single word
+            assert expected <= found or connection.vendor not in ('sqlite', 'postgresql'), query
+        print(f"{query!r}: {len(found)} matches")
+        base = measure(lambda: _search_fallback(mentor.id, query, 10), args.repeat)
+        report("  icontains (3 queries, no index)", base)
+        report("  indexed search (1 query)", measure(lambda: search(mentor.id, query, 10), args.repeat), base)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: sharded update handling, throughput by number of workers.
+
+For each worker count in --workers, starts one ingest process and N worker
+processes (`python run_bot.py` with UPDATE_ROLE=ingest / worker, as
+run_workers.py does) against a fake Bot API server (see fake_bot_api.py).
+Then it queues --updates /start messages from --users users in the fake
+getUpdates queue and measures until every update got its answer. Reports
+updates per second and the speedup over one worker, and checks that every
+update was answered exactly once.
+
+Needs a Redis server: BENCH_REDIS_URL (default redis://localhost:6379/15).
+The update streams in that database are deleted before every run, so use a
+scratch database. Workers compete for CPU cores, and with SQLite for one
+database file: use BENCH_DATABASE_URL with PostgreSQL and at least as many
+cores as workers + 2 (ingest, this script) for meaningful scaling numbers.
+
+Usage:
+    python scripts/bench_sharding.py [--workers 1 2 4] [--updates 4000] [--users 500]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from bench_common import ROOT, setup_django
+from fake_bot_api import FakeBotAPI, text_update
+
+FIRST_USER = 800000
+
+
+def clear_streams(redis_url: str):
+    from redis import Redis
+    from redis.exceptions import ConnectionError
+    client = Redis.from_url(redis_url)
+    try:
+        client.ping()
+    except ConnectionError as e:
+        sys.exit(f"Redis at {redis_url} is not reachable ({e}); set BENCH_REDIS_URL")
+    keys = list(client.scan_iter('studymate:updates:*'))
+    if keys:
+        client.delete(*keys)
+    client.close()
+
+
+def replies(api: FakeBotAPI) -> Counter:
+    """sendMessage calls per benchmark user"""
+    return Counter(
+        int(params.get('chat_id') or 0) for _, method, params in api.calls
+        if method == 'sendMessage' and int(params.get('chat_id') or 0) >= FIRST_USER
+    )
+
+
+async def run_workers(count: int, args, env: dict, workdir: str) -> tuple[float, int]:
+    clear_streams(env['REDIS_URL'])
+    api = FakeBotAPI()
+    url = await api.start()
+    env = dict(env, TELEGRAM_API_URL=url, WORKERS=str(count))
+    roles = [('worker', index) for index in range(count)] + [('ingest', 0)]
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, os.path.join(ROOT, 'run_bot.py'), cwd=workdir,
+            env=dict(env, UPDATE_ROLE=role, WORKER_INDEX=str(index)),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        for role, index in roles
+    ]
+    try:
+        await api.wait_for('getUpdates', 120)
+        # Let the workers create their consumer groups and start reading
+        await asyncio.sleep(3)
+        updates = [text_update(i + 1, FIRST_USER + i % args.users, "/start") for i in range(args.updates)]
+        started = time.monotonic()
+        for update in updates:
+            api.push_update(update)
+        deadline = started + args.timeout
+        while sum(replies(api).values()) < len(updates):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{count} workers: not all updates answered within {args.timeout}s")
+            await asyncio.sleep(0.01)
+        elapsed = time.monotonic() - started
+        # Updates handled twice would show up now
+        await asyncio.sleep(0.5)
+    finally:
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        await asyncio.gather(*(process.wait() for process in processes))
+        await api.stop()
+    expected = Counter(FIRST_USER + i % args.users for i in range(args.updates))
+    wrong = sum(1 for user, count in expected.items() if replies(api)[user] != count)
+    return elapsed, wrong
+
+
+async def run(args, env: dict):
+    workdir = tempfile.mkdtemp(prefix='studymate-bench-')
+    baseline = None
+    for count in args.workers:
+        elapsed, wrong = await run_workers(count, args, env, workdir)
+        rate = args.updates / elapsed
+        baseline = baseline or rate
+        print(f"{count:>2} workers: {args.updates} updates in {elapsed:6.2f} s = {rate:7.1f} updates/s"
+              f"   x{rate / baseline:.2f}, users with a wrong number of answers: {wrong}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--updates', type=int, default=4000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    redis_url = os.getenv('BENCH_REDIS_URL', 'redis://localhost:6379/15')
+    print(f"Database: {database_url}\nRedis: {redis_url}\n")
+    env = dict(os.environ, DATABASE_URL=database_url, BOT_TOKEN='123456:bench',
+               USE_REDIS='true', REDIS_URL=redis_url, UPDATE_CONCURRENCY='50')
+    asyncio.run(run(args, env))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: bot cold start (time to first update).
+
+Starts `python run_bot.py` --runs times against a fake Bot API server (see
+fake_bot_api.py) with a /start message already waiting, and measures from
+process spawn to the first getUpdates call (polling started) and to the
+first sendMessage (first update answered). Python + `import aiogram` alone is
+measured the same way as the floor.
+
+With --profile the bot runs with STARTUP_PROFILE=1 and the startup report of
+the last run is printed.
+
+Usage:
+    python scripts/bench_startup.py [--runs 5] [--profile]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import sys
+import tempfile
+import time
+
+from bench_common import ROOT, setup_django, report
+from fake_bot_api import FakeBotAPI, text_update
+
+
+def stats(values: list) -> dict:
+    return {'best': min(values), 'median': statistics.median(values)}
+
+
+async def import_floor() -> float:
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_exec(sys.executable, '-c', 'import aiogram')
+    await process.wait()
+    return (time.monotonic() - started) * 1000
+
+
+async def cold_start(env: dict, workdir: str, profile: bool, timeout: float = 60.0):
+    """One bot start. Returns (ms to polling, ms to first reply, bot output)."""
+    api = FakeBotAPI()
+    url = await api.start()
+    api.push_update(text_update(1, 555000, "/start"))
+
+    env = dict(env, TELEGRAM_API_URL=url, STARTUP_PROFILE='1' if profile else '')
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(ROOT, 'run_bot.py'), cwd=workdir, env=env,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        polling = await api.wait_for('getUpdates', timeout)
+        replied = await api.wait_for('sendMessage', timeout)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        output, _ = await process.communicate()
+        await api.stop()
+    return (polling - started) * 1000, (replied - started) * 1000, output.decode(errors='replace')
+
+
+async def run(args, env: dict):
+    workdir = tempfile.mkdtemp(prefix='studymate-bench-')
+    floor = [await import_floor() for _ in range(args.runs)]
+    polling, replied = [], []
+    output = ''
+    for _ in range(args.runs):
+        to_polling, to_reply, output = await cold_start(env, workdir, args.profile)
+        polling.append(to_polling)
+        replied.append(to_reply)
+
+    report("python + import aiogram", stats(floor))
+    report("spawn -> polling started", stats(polling))
+    report("spawn -> first update answered", stats(replied))
+    if args.profile:
+        start = output.find("Startup profile")
+        print("\n" + (output[start:] if start >= 0 else output))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--profile', action='store_true', help="Print the bot's startup profile")
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    print(f"Database: {database_url}\n{args.runs} cold starts\n")
+    env = dict(os.environ, DATABASE_URL=database_url, BOT_TOKEN='123456:bench', USE_REDIS='false')
+    asyncio.run(run(args, env))
+
+
+if __name__ == '__main__':
+    main()
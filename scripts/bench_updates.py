@@ -0,0 +1,154 @@
+"""
+Benchmark: update ingestion, long polling vs webhook.
+
+Starts `python run_bot.py` against a fake Bot API server (see fake_bot_api.py)
+once per mode and feeds it --updates /start messages from different users:
+
+- polling: all updates wait in the fake getUpdates queue
+- webhook: updates are POSTed to the bot's webhook server with the secret
+  token, --connections at a time (Telegram's max_connections), plus
+  --duplicates % of them delivered a second time and one request with a wrong
+  secret. Deliveries refused with 503 (bot busy) are retried, as Telegram does
+
+Reports updates per second until every user got an answer, and checks that
+no user got two (duplicates were dropped).
+
+Usage:
+    python scripts/bench_updates.py [--updates 2000] [--connections 40] [--duplicates 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import aiohttp
+
+from bench_common import ROOT, setup_django
+from fake_bot_api import FakeBotAPI, text_update
+
+FIRST_USER = 700000
+SECRET = 'bench-secret'
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def replies(api: FakeBotAPI) -> Counter:
+    """sendMessage calls per benchmark user"""
+    return Counter(
+        int(params.get('chat_id') or 0) for _, method, params in api.calls
+        if method == 'sendMessage' and int(params.get('chat_id') or 0) >= FIRST_USER
+    )
+
+
+async def wait_for_replies(api: FakeBotAPI, count: int, timeout: float) -> float:
+    deadline = time.monotonic() + timeout
+    while len(replies(api)) < count:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{len(replies(api))}/{count} users answered within {timeout}s")
+        await asyncio.sleep(0.01)
+    return time.monotonic()
+
+
+async def post_updates(url: str, updates: list, connections: int) -> Counter:
+    """POST updates to the webhook, `connections` at a time. Returns response statuses."""
+    statuses = Counter()
+    queue = asyncio.Queue()
+    for update in updates:
+        queue.put_nowait(update)
+
+    async def sender(session):
+        while not queue.empty():
+            update = queue.get_nowait()
+            while True:
+                async with session.post(url, json=update, headers={'X-Telegram-Bot-Api-Secret-Token': SECRET}) as response:
+                    statuses[response.status] += 1
+                if response.status != 503:
+                    break
+                # Bot is busy: retry later, as Telegram does
+                await asyncio.sleep(0.1)
+
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(sender(session) for _ in range(connections)))
+        async with session.post(url, json=updates[0], headers={'X-Telegram-Bot-Api-Secret-Token': 'wrong'}) as response:
+            statuses[f'wrong secret: {response.status}'] += 1
+    return statuses
+
+
+async def run_mode(mode: str, args, env: dict, workdir: str):
+    api = FakeBotAPI()
+    url = await api.start()
+    updates = [text_update(i + 1, FIRST_USER + i, "/start") for i in range(args.updates)]
+
+    env = dict(env, TELEGRAM_API_URL=url, UPDATE_CONCURRENCY=str(args.connections))
+    if mode == 'webhook':
+        port = free_port()
+        env.update(WEBHOOK_URL=f"http://127.0.0.1:{port}", WEBHOOK_PORT=str(port), WEBHOOK_SECRET=SECRET,
+                   WEBHOOK_HOST='127.0.0.1')
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(ROOT, 'run_bot.py'), cwd=workdir, env=env,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    statuses = None
+    try:
+        if mode == 'webhook':
+            await api.wait_for('setWebhook', 60)
+            duplicates = random.Random(1).sample(updates, len(updates) * args.duplicates // 100)
+            started = time.monotonic()
+            post = asyncio.create_task(post_updates(f"{env['WEBHOOK_URL']}/telegram/webhook",
+                                                    updates + duplicates, args.connections))
+            finished = await wait_for_replies(api, len(updates), args.timeout)
+            statuses = await post
+        else:
+            await api.wait_for('getUpdates', 60)
+            started = time.monotonic()
+            for update in updates:
+                api.push_update(update)
+            finished = await wait_for_replies(api, len(updates), args.timeout)
+        # Late duplicates would show up now
+        await asyncio.sleep(0.5)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        await process.wait()
+        await api.stop()
+
+    elapsed = finished - started
+    answered = replies(api)
+    twice = sum(1 for count in answered.values() if count > 1)
+    print(f"{mode:<8} {len(updates)} updates in {elapsed:6.2f} s = {len(updates) / elapsed:7.1f} updates/s, "
+          f"users answered twice: {twice}")
+    if statuses:
+        print(f"         webhook responses: {dict(statuses)}")
+
+
+async def run(args, env: dict):
+    workdir = tempfile.mkdtemp(prefix='studymate-bench-')
+    for mode in ('polling', 'webhook'):
+        await run_mode(mode, args, env, workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--connections', type=int, default=40)
+    parser.add_argument('--duplicates', type=int, default=10, help="%% of updates the webhook gets twice")
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+    print(f"Database: {database_url}\n")
+    env = dict(os.environ, DATABASE_URL=database_url, BOT_TOKEN='123456:bench', USE_REDIS='false')
+    asyncio.run(run(args, env))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Minimal fake Telegram Bot API server for the benchmark scripts.
+
+Serves /bot<token>/<method> like api.telegram.org (point the bot at it with
+TELEGRAM_API_URL). getUpdates long-polls a queue filled with push_update();
+every other method returns a plausible result. Calls are recorded with their
+time, so a benchmark can tell when the bot started polling or answered.
+"""
+import asyncio
+import itertools
+import json
+import time
+
+from aiohttp import web
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+def text_update(update_id: int, user_id: int, text: str) -> dict:
+    """Update with a private text message from user_id"""
+    user = {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "language_code": "ru"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": user["first_name"]},
+            "from": user,
+            "text": text,
+            **({"entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]}
+               if text.startswith('/') else {}),
+        },
+    }
+
+
+class FakeBotAPI:
+    def __init__(self):
+        self.updates: asyncio.Queue | None = None
+        # (monotonic time, method, params)
+        self.calls: list[tuple[float, str, dict]] = []
+        self.first_call: dict[str, float] = {}
+        self._message_ids = itertools.count(1000)
+        self._runner: web.AppRunner | None = None
+        self.url = None
+
+    async def start(self, port: int = 0) -> str:
+        """Start serving on localhost, returns the base URL"""
+        self.updates = asyncio.Queue()
+        app = web.Application()
+        app.router.add_route('*', '/bot{token}/{method}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def push_update(self, update: dict):
+        self.updates.put_nowait(update)
+
+    async def wait_for(self, method: str, timeout: float) -> float:
+        """Monotonic time of the first call of method (waits for it)"""
+        deadline = time.monotonic() + timeout
+        while method not in self.first_call:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No {method} call within {timeout}s")
+            await asyncio.sleep(0.005)
+        return self.first_call[method]
+
+    # ==================== METHODS ====================
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        params = dict(await request.post())
+        if not params and request.can_read_body:
+            params = await request.json()
+        now = time.monotonic()
+        self.calls.append((now, method, params))
+        self.first_call.setdefault(method, now)
+
+        if method == 'getMe':
+            result = BOT_USER
+        elif method == 'getUpdates':
+            result = await self._get_updates(float(params.get('timeout') or 0))
+        elif method in ('sendMessage', 'sendDocument', 'editMessageText'):
+            chat_id = int(params.get('chat_id') or 0)
+            result = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get('text', ''),
+            }
+        else:
+            result = True
+        return web.Response(text=json.dumps({"ok": True, "result": result}), content_type='application/json')
+
+    async def _get_updates(self, timeout: float) -> list:
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self.updates.get(), min(timeout, 1.0) or 0.01))
+        except asyncio.TimeoutError:
+            return []
+        while not self.updates.empty() and len(updates) < 100:
+            updates.append(self.updates.get_nowait())
+        return updates